@@ -0,0 +1,162 @@
+# agents/article_store.py
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 기사 저장소 경로
+STORE_PATH = os.getenv("ARTICLE_STORE_PATH", "data/articles.db")
+
+# 링크 정규화 시 버리는 추적용 파라미터 (이름 정확히 일치, 접두어는 utm_만)
+# mode/model/modified/reference 같은 실제 파라미터는 유지해야 서로 다른 기사가 같은 키가 되지 않음
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "ref", "ref_src", "cmpid", "mod"})
+TRACKING_PREFIXES = ("utm_",)
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_link(link: str) -> str:
+    """스킴/호스트 소문자, 추적 파라미터·프래그먼트·끝 슬래시 제거"""
+    parts = urlsplit(link.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def article_key(article) -> str:
+    """기사 식별 키: 정규화 링크 해시 (링크 없으면 정규화 제목 해시)"""
+    link = (article.get("link") or "").strip()
+    if link:
+        basis = "link:" + normalize_link(link)
+    else:
+        title = re.sub(r"\s+", " ", (article.get("title") or "").lower()).strip()
+        basis = "title:" + title
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """
+    SQLite 기반 기사 저장소
+    - 실행 간 중복 제거: 처음 본 시각(first_seen) 기록, 새 기사만 골라내기
+    - 랭킹 점수와 NewsAnalystAgent.analyze 결과를 보관해 재사용
+    """
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")   # 앱/오케스트레이터 동시 접근
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                key TEXT PRIMARY KEY,
+                title TEXT,
+                link TEXT,
+                source TEXT,
+                published TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                score REAL,
+                article TEXT,
+                analysis TEXT,
+                analyzed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles(first_seen)")
+        self._conn.commit()
+
+    def add_articles(self, articles):
+        """기사들을 기록하고, 이번에 처음 본 기사만 반환 (입력 순서 유지)"""
+        now = time.time()
+        new_items, seen = [], set()
+        with self._lock:
+            keys = [article_key(a) for a in articles]
+            existing = self._existing_keys(keys)
+            for key, art in zip(keys, articles):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if key in existing:
+                    self._conn.execute("UPDATE articles SET last_seen=? WHERE key=?", (now, key))
+                    continue
+                self._conn.execute(
+                    "INSERT INTO articles (key,title,link,source,published,first_seen,last_seen,article) "
+                    "VALUES (?,?,?,?,?,?,?,?)",
+                    (key, art.get("title", ""), art.get("link", ""), art.get("source", ""),
+                     str(art.get("published", "")), now, now,
+                     json.dumps(art, ensure_ascii=False, default=str)),
+                )
+                new_items.append(art)
+            self._conn.commit()
+        return new_items
+
+    def _existing_keys(self, keys):
+        found = set()
+        for i in range(0, len(keys), 500):   # SQLite 파라미터 개수 제한
+            part = keys[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT key FROM articles WHERE key IN ({','.join('?' * len(part))})", part
+            ).fetchall()
+            found.update(r[0] for r in rows)
+        return found
+
+    def update_scores(self, ranked):
+        """ranked: [(score, article), ...]"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE articles SET score=? WHERE key=?",
+                [(float(score), article_key(art)) for score, art in ranked],
+            )
+            self._conn.commit()
+
+    def get_analyses(self, articles):
+        """저장된 분석 결과 {key: analysis}"""
+        keys = [article_key(a) for a in articles]
+        out = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, analysis FROM articles "
+                    f"WHERE analysis IS NOT NULL AND key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                out.update((k, json.loads(a)) for k, a in rows)
+        return out
+
+    def save_analysis(self, article, analysis):
+        key = article_key(article)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO articles (key,title,link,source,published,first_seen,last_seen,article) "
+                "VALUES (?,?,?,?,?,?,?,?) ON CONFLICT(key) DO NOTHING",
+                (key, article.get("title", ""), article.get("link", ""), article.get("source", ""),
+                 str(article.get("published", "")), time.time(), time.time(),
+                 json.dumps(article, ensure_ascii=False, default=str)),
+            )
+            self._conn.execute(
+                "UPDATE articles SET analysis=?, analyzed_at=? WHERE key=?",
+                (json.dumps(analysis, ensure_ascii=False), time.time(), key),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            total, analyzed = self._conn.execute(
+                "SELECT COUNT(*), COUNT(analysis) FROM articles"
+            ).fetchone()
+        return {"articles": total, "analyzed": analyzed}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    store = ArticleStore()
+    print("📦 기사 저장소:", store.path, store.stats())
@@ -1,53 +1,92 @@
-import feedparser
 import datetime
+from zoneinfo import ZoneInfo
+from agents.feed_fetcher import fetch_feeds, iter_feeds, FEED_WORKERS, FEED_TIMEOUT
+from agents.feed_cache import get_feed_cache
+from agents import metrics
+
+KST = ZoneInfo("Asia/Seoul")
+
+# 🔽 여기에 원하는 블로그/칼럼 RSS URL 추가
+# 네이버 블로그는 직접 RSS를 넣기 어렵고, 경제 전문 칼럼/매체 RSS를 넣는 게 안정적
+SOURCES = [
+    "https://seekingalpha.com/market_currents.xml",  # 시킹알파
+    "https://www.kiplinger.com/feeds/rss.xml",      # Kiplinger (경제/투자)
+    "https://rss.nytimes.com/services/xml/rss/nyt/Economy.xml", # NYT 경제 섹션
+]
 
 class BlogCrawlerAgent:
     """
     경제/주식 관련 블로그/칼럼 RSS에서 글 수집
     """
-    def __init__(self, horizon_days=3):
+    def __init__(self, horizon_days=3, max_workers=FEED_WORKERS, timeout=FEED_TIMEOUT,
+                 use_cache=True):
         self.horizon_days = horizon_days
-        self.sources = [
-            # 🔽 여기에 원하는 블로그/칼럼 RSS URL 추가
-            # 네이버 블로그는 직접 RSS를 넣기 어렵고, 경제 전문 칼럼/매체 RSS를 넣는 게 안정적
-            "https://seekingalpha.com/market_currents.xml",  # 시킹알파
-            "https://www.kiplinger.com/feeds/rss.xml",      # Kiplinger (경제/투자)
-            "https://rss.nytimes.com/services/xml/rss/nyt/Economy.xml", # NYT 경제 섹션
-        ]
+        self.max_workers = max_workers   # 동시에 내려받을 피드 수
+        self.timeout = timeout           # 피드 하나당 타임아웃(초)
+        self.use_cache = use_cache       # 조건부 GET 피드 캐시 사용
+        self.errors = {}                 # 마지막 수집에서 실패한 피드 {url: 사유}
+        self.sources = list(SOURCES)
+
+    def _to_item(self, entry, url, now, horizon):
+        """feedparser entry → 글 dict (기간 밖이면 None)"""
+        # pubDate 가져오기 (뉴스 기사와 같이 KST aware datetime → 랭커의 최신성 계산에 그대로 사용)
+        if hasattr(entry, "published_parsed") and entry.published_parsed:
+            published = datetime.datetime(*entry.published_parsed[:6], tzinfo=ZoneInfo("UTC")).astimezone(KST)
+        else:
+            published = now
+
+        if published < horizon:
+            return None
+
+        return {
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary", ""),
+            "link": entry.get("link", ""),
+            "published": published,
+            "source": url
+        }
 
     def collect_items(self):
-        """RSS 기반 블로그/칼럼 수집"""
-        now = datetime.datetime.utcnow()
+        """RSS 기반 블로그/칼럼 수집 (피드별 동시 수집)"""
+        now = datetime.datetime.now(KST)
         horizon = now - datetime.timedelta(days=self.horizon_days)
         results = []
+        self.errors = {}
 
-        for url in self.sources:
-            feed = feedparser.parse(url)
-            for entry in feed.entries:
-                # pubDate 가져오기
-                published = None
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    published = datetime.datetime(*entry.published_parsed[:6])
-                else:
-                    published = now
-
-                if published < horizon:
-                    continue
-
-                item = {
-                    "title": entry.get("title", ""),
-                    "summary": entry.get("summary", ""),
-                    "link": entry.get("link", ""),
-                    "published": published.isoformat(),
-                    "source": url
-                }
-                results.append(item)
+        for res in fetch_feeds(self.sources, max_workers=self.max_workers, timeout=self.timeout,
+                               cache=get_feed_cache() if self.use_cache else None):
+            if res["error"]:
+                self.errors[res["url"]] = res["error"]
+                continue
+            for entry in res["entries"]:
+                item = self._to_item(entry, res["url"], now, horizon)
+                if item:
+                    results.append(item)
+        metrics.incr("articles.fetched", len(results))
         return results
 
+    def iter_items(self):
+        """
+        피드가 도착하는 순서대로 글 묶음을 내보냄 (스트리밍 파이프라인용)
+        출력(generator): {"url","items","error","elapsed","cached"}
+        """
+        now = datetime.datetime.now(KST)
+        horizon = now - datetime.timedelta(days=self.horizon_days)
+        self.errors = {}
+        for res in iter_feeds(self.sources, max_workers=self.max_workers, timeout=self.timeout,
+                              cache=get_feed_cache() if self.use_cache else None):
+            if res["error"]:
+                self.errors[res["url"]] = res["error"]
+            items = [it for it in (self._to_item(e, res["url"], now, horizon) for e in res["entries"]) if it]
+            metrics.incr("articles.fetched", len(items))
+            yield {"url": res["url"], "items": items, "error": res["error"],
+                   "elapsed": res["elapsed"], "cached": res["cached"]}
 
 if __name__ == "__main__":
     crawler = BlogCrawlerAgent(horizon_days=3)
     blogs = crawler.collect_items()
     print(f"총 {len(blogs)}개 블로그/칼럼 수집됨")
+    for url, err in crawler.errors.items():
+        print(f"[!] 피드 실패: {url} ({err})")
     for b in blogs[:5]:
         print(f"- {b['title']} ({b['published']})\n  {b['link']}")
@@ -0,0 +1,153 @@
+# agents/bm25_index.py
+import os
+import re
+import json
+import math
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+# BM25 설정
+K1 = 1.5
+B = 0.75
+NGRAM = 2   # 한글 등 비ASCII 어절은 문자 2-gram으로 (조사/어미가 붙어도 어간이 겹치도록)
+
+_ASCII_WORD = re.compile(r"[a-z0-9]+")
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    BM25용 토큰
+    - 영문/숫자: 소문자 단어 그대로 (FOMC, CPI, 2024 …)
+    - 한글 등: 어절마다 문자 NGRAM-gram (한 글자 어절은 그대로)
+    """
+    tokens = []
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if word.isascii():
+            tokens.extend(_ASCII_WORD.findall(word))
+        elif len(word) <= NGRAM:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + NGRAM] for i in range(len(word) - NGRAM + 1))
+    return tokens
+
+
+class BM25Index:
+    """
+    PDF chunk용 로컬 BM25 역색인 (Chroma 컬렉션 옆에 JSON으로 저장)
+    - 저장: chunk id → (source, 본문) / 메모리: 토큰 → {chunk id: tf} 역색인
+    - ingest_pdfs가 chunk를 upsert/삭제할 때 같이 갱신
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self.docs = {}                     # id → (source, text)
+        self._postings = defaultdict(dict)  # token → {id: tf}
+        self._lengths = {}                 # id → 토큰 수
+        self._total_len = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _index(self, doc_id, text):
+        tf = Counter(tokenize(text))
+        for tok, n in tf.items():
+            self._postings[tok][doc_id] = n
+        length = sum(tf.values())
+        self._lengths[doc_id] = length
+        self._total_len += length
+
+    def _unindex(self, doc_id):
+        _, text = self.docs.pop(doc_id)
+        for tok in set(tokenize(text)):
+            post = self._postings.get(tok)
+            if post is not None:
+                post.pop(doc_id, None)
+                if not post:
+                    del self._postings[tok]
+        self._total_len -= self._lengths.pop(doc_id, 0)
+
+    def add(self, ids, texts, source):
+        """chunk 추가 (같은 id가 있으면 교체)"""
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                if doc_id in self.docs:
+                    self._unindex(doc_id)
+                self.docs[doc_id] = (source, text)
+                self._index(doc_id, text)
+
+    def remove(self, ids):
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self.docs:
+                    self._unindex(doc_id)
+
+    def remove_source(self, source):
+        with self._lock:
+            self.remove([i for i, (src, _) in self.docs.items() if src == source])
+
+    def sources(self):
+        """색인에 들어 있는 파일(source) 집합"""
+        with self._lock:
+            return {src for src, _ in self.docs.values()}
+
+    def search(self, query, n_results=3):
+        """출력: [(chunk id, 점수), ...] 점수 높은 순 (겹치는 토큰이 없으면 빈 리스트)"""
+        terms = Counter(tokenize(query))
+        with self._lock:
+            n_docs = len(self.docs)
+            if not n_docs or not terms:
+                return []
+            avg_len = self._total_len / n_docs or 1.0
+            scores = defaultdict(float)
+            for tok, qtf in terms.items():
+                post = self._postings.get(tok)
+                if not post:
+                    continue
+                idf = math.log(1 + (n_docs - len(post) + 0.5) / (len(post) + 0.5))
+                for doc_id, tf in post.items():
+                    norm = tf + K1 * (1 - B + B * self._lengths[doc_id] / avg_len)
+                    scores[doc_id] += qtf * idf * tf * (K1 + 1) / norm
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:n_results]
+
+    def text(self, doc_id):
+        entry = self.docs.get(doc_id)
+        return entry[1] if entry else None
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with self._lock:
+            data = {"docs": {i: [src, text] for i, (src, text) in self.docs.items()}}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """파일이 없거나 깨졌으면 빈 색인"""
+        index = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    docs = json.load(f).get("docs", {})
+            except Exception:
+                docs = {}
+            for doc_id, (src, text) in docs.items():
+                index.docs[doc_id] = (src, text)
+                index._index(doc_id, text)
+        return index
+
+
+def rrf(rankings, k=60):
+    """
+    Reciprocal Rank Fusion: 여러 순위 리스트(id 리스트)를 합침
+    출력: id 리스트 (합산 점수 높은 순)
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return [doc_id for doc_id, _ in sorted(scores.items(), key=lambda kv: kv[1], reverse=True)]
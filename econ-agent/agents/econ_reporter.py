@@ -2,17 +2,110 @@
 import os
 import datetime as dt
 from dotenv import load_dotenv
+from agents.llm import chat_completion, chat_completion_stream, estimate_tokens, LLM_CONCURRENCY
+from agents import metrics
 
 # LLM 사용 여부
 use_llm, client = False, None
 MODEL = os.getenv("MODEL", "gpt-4o-mini")
+REPORT_FIRST_TOKEN_TIMEOUT = float(os.getenv("REPORT_FIRST_TOKEN_TIMEOUT", "15"))   # 이 안에 첫 토큰 없으면 폴백
+SYSTEM_PROMPT = "You are a concise Korean economic editor who writes clean Markdown."
+
+# 프롬프트 토큰 예산 (환경변수로 조정 가능)
+REPORT_PROMPT_TOKENS = int(os.getenv("REPORT_PROMPT_TOKENS", "6000"))   # [분석 데이터] 부분 토큰 상한
+REPORT_RAG_CHARS = int(os.getenv("REPORT_RAG_CHARS", "300"))            # RAG 발췌 1건당 글자 수 상한
+REPORT_MAP_THRESHOLD = int(os.getenv("REPORT_MAP_THRESHOLD", "12"))     # 기사 수가 이보다 많으면 map-reduce
+REPORT_MAP_GROUP = int(os.getenv("REPORT_MAP_GROUP", "5"))              # map 단계 그룹당 기사 수
+
+# 예산 초과 시 단계적으로 줄이는 상세도: (요약/영향 글자 수, RAG 발췌 수, RAG 글자 수)
+DETAIL_LEVELS = [
+    (None, None, REPORT_RAG_CHARS),
+    (400, 2, 200),
+    (200, 1, 100),
+    (120, 0, 0),
+    (0, 0, 0),          # 제목/키워드/링크만
+]
+
+
+def _clip(text, n):
+    text = text or ""
+    if n is None or len(text) <= n:
+        return text
+    return text[:n].rstrip() + "…" if n else ""
+
+
+def _clip_tokens(text, max_tokens):
+    """
+    토큰 예산(estimate_tokens 기준)에 맞게 줄 단위로 자름 (bullet/링크 중간에서 끊지 않음)
+    첫 줄 하나가 예산을 넘을 때만 그 줄을 글자 단위로 줄임
+    """
+    text = text or ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if kept:
+        return "\n".join(kept).rstrip()
+    line = text.splitlines()[0]
+    while line and estimate_tokens(line) + 1 > max_tokens:
+        line = line[:int(len(line) * 0.8)]
+    return line.rstrip() + "…" if line else ""
+
+
+def _render_item(item, level):
+    """분석 항목 하나를 상세도 level로 프롬프트 텍스트화"""
+    text_chars, rag_n, rag_chars = DETAIL_LEVELS[level]
+    a = item["analysis"]; art = item["article"]
+    lines = [f"- 제목: {a.get('headline', art.get('title',''))}"]
+    if text_chars != 0:
+        lines += [f"  요약: {_clip(a.get('summary',''), text_chars)}",
+                  f"  영향: {_clip(a.get('impact',''), text_chars)}"]
+    lines += [f"  키워드: {', '.join(a.get('keywords', []))}",
+              f"  링크: {art.get('link','')}"]
+    rag = a.get("rag_context", [])[:rag_n]
+    if rag and rag_chars:
+        lines.append(f"  RAG: {' | '.join(_clip(r, rag_chars) for r in rag)}")
+    return "\n".join(lines) + "\n"
+
+
+def budget_body(items, budget=REPORT_PROMPT_TOKENS):
+    """
+    토큰 예산 안에 들어오도록 항목들을 렌더링
+    - 전체 상세도를 한 단계씩 낮춤 (RAG 발췌 → 요약/영향 순으로 축소)
+    - 가장 낮은 상세도로도 넘치면 뒤쪽(랭킹 낮은) 항목부터 생략
+    출력: (본문 텍스트, 사용한 상세도, 생략한 항목 수)
+    """
+    if not items:
+        return "(분석 없음)", 0, 0
+    for level in range(len(DETAIL_LEVELS)):
+        parts = [_render_item(it, level) for it in items]
+        body = "\n".join(parts)
+        if estimate_tokens(body) <= budget:
+            return body, level, 0
+    kept, used = [], 0
+    for part in parts:
+        cost = estimate_tokens(part) + 1
+        if kept and used + cost > budget:
+            break
+        kept.append(part)
+        used += cost
+    body = "\n".join(kept)
+    omitted = len(parts) - len(kept)
+    if omitted:
+        body += f"\n(외 {omitted}건 생략)\n"
+    return body, len(DETAIL_LEVELS) - 1, omitted
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if OPENAI_API_KEY:
     try:
         from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)   # 재시도는 agents.llm 담당
         use_llm = True
     except Exception:
         use_llm = False
@@ -24,8 +117,17 @@ class EconReporterAgent:
          각 analysis: {"headline","summary","impact","keywords","rag_context" (optional)}
     출력: Markdown 스트링 (일일 리포트)
     """
-    def __init__(self, model: str = MODEL):
+    def __init__(self, model: str = MODEL, prompt_tokens: int = REPORT_PROMPT_TOKENS,
+                 map_threshold: int = REPORT_MAP_THRESHOLD, map_group: int = REPORT_MAP_GROUP):
+        """
+        prompt_tokens: 리포트 프롬프트의 [분석 데이터] 토큰 예산
+        map_threshold: 기사 수가 이보다 많으면 그룹별 요약(map) 후 종합(reduce)
+        map_group: map 단계에서 한 번에 요약할 기사 수
+        """
         self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.map_threshold = map_threshold
+        self.map_group = map_group
 
     def _format_fallback(self, analyzed, date_str):
         # LLM이 없을 때의 단순 합성
@@ -74,20 +176,57 @@ class EconReporterAgent:
         ]
         return "\n".join(lines)
 
-    def _prompt(self, analyzed, date_str):
-        # LLM용 프롬프트 생성
-        bullets = []
-        for item in analyzed:
-            a = item["analysis"]; art = item["article"]
-            bullets.append(
-                f"- 제목: {a.get('headline', art.get('title',''))}\n"
-                f"  요약: {a.get('summary','')}\n"
-                f"  영향: {a.get('impact','')}\n"
-                f"  키워드: {', '.join(a.get('keywords', []))}\n"
-                f"  링크: {art.get('link','')}\n"
-                f"  RAG: {' | '.join(a.get('rag_context', []))}\n"
-            )
-        body = "\n".join(bullets) if bullets else "(분석 없음)"
+    def _map_group(self, items, max_tokens):
+        """map 단계: 기사 묶음 하나를 리포트 재료로 압축 (실패 시 LLM 없이 축소본)"""
+        body = budget_body(items, self.prompt_tokens)[0]
+        prompt = f"""
+아래 경제 기사 분석들을 일일 리포트의 재료로 압축하라.
+- 핵심 이슈별 bullet (중요 수치/기관/종목 유지), 산업·테마 포인트, 키워드, 대표 링크
+- 한국어, 과장 금지, {max_tokens} 토큰 이내
+
+[분석 데이터]
+{body}
+"""
+        try:
+            with metrics.span("report.map", articles=len(items)):
+                out = chat_completion(
+                    client,
+                    model=self.model,
+                    temperature=0.2,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                ).strip()
+            return _clip_tokens(out, max_tokens) if out else budget_body(items, max_tokens)[0]
+        except Exception:
+            return budget_body(items, max_tokens)[0]
+
+    def _data_body(self, analyzed):
+        """
+        리포트 프롬프트의 [분석 데이터]
+        - 기사 수가 map_threshold 이하: 토큰 예산에 맞게 축소한 항목 목록
+        - 초과(또는 최저 상세도로도 예산을 넘어 항목이 생략됨): map_group개씩 묶어 동시에 요약(map) → 그룹 요약들을 종합 재료로 사용(reduce)
+          → 기사 수가 늘어도 최종 프롬프트 크기와 지연이 일정 수준으로 유지됨
+        """
+        body, _, omitted = budget_body(analyzed, self.prompt_tokens)
+        # 기사 수가 적고 예산 안에 (항목 생략 없이) 들어오면 그대로 사용
+        if not use_llm or (len(analyzed) <= self.map_threshold and not omitted):
+            return body
+
+        groups = [analyzed[i:i + self.map_group] for i in range(0, len(analyzed), self.map_group)]
+        per_group = max(200, self.prompt_tokens // len(groups))
+        metrics.incr("report.map_groups", len(groups))
+        workers = max(1, min(LLM_CONCURRENCY, len(groups)))
+        with metrics.ContextThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-map") as ex:
+            summaries = list(ex.map(lambda g: self._map_group(g, per_group), groups))
+        return "\n".join(f"[그룹 {i} · 기사 {len(g)}건]\n{summary}\n"
+                         for i, (g, summary) in enumerate(zip(groups, summaries), 1))
+
+    def _prompt(self, analyzed, date_str, body=None):
+        # LLM용 프롬프트 생성 (본문은 토큰 예산 안으로 축소, 기사가 많으면 map-reduce)
+        if body is None:
+            body = self._data_body(analyzed)
 
         return f"""
 너는 경제 전문 에디터다. 아래 항목들을 종합해 **하루치 경제 리포트(Markdown)**를 작성하라.
@@ -104,19 +243,23 @@ class EconReporterAgent:
 """
 
     def build_report(self, analyzed, date: dt.date | None = None) -> str:
+        with metrics.span("report.build", articles=len(analyzed)):
+            return self._build_report(analyzed, date)
+
+    def _build_report(self, analyzed, date: dt.date | None = None) -> str:
         date_str = (date or dt.date.today()).isoformat()
 
         if use_llm and analyzed:
             try:
-                resp = client.chat.completions.create(
+                md = chat_completion(
+                    client,
                     model=self.model,
                     temperature=0.2,
                     messages=[
-                        {"role": "system", "content": "You are a concise Korean economic editor who writes clean Markdown."},
+                        {"role": "system", "content": SYSTEM_PROMPT},
                         {"role": "user", "content": self._prompt(analyzed, date_str)}
                     ],
-                )
-                md = resp.choices[0].message.content.strip()
+                ).strip()
                 # 안전장치: 마크다운 헤더 없으면 붙이기
                 if not md.lstrip().startswith("#"):
                     md = f"# 📊 일일 경제 리포트 — {date_str}\n\n" + md
@@ -126,14 +269,72 @@ class EconReporterAgent:
 
         return self._format_fallback(analyzed, date_str)
 
+    def build_report_stream(self, analyzed, date: dt.date | None = None,
+                            first_token_timeout: float = REPORT_FIRST_TOKEN_TIMEOUT):
+        """
+        build_report의 스트리밍 버전: Markdown 조각을 도착하는 대로 yield
+        - first_token_timeout 안에 첫 토큰이 없거나 시작 전에 실패하면 바로 폴백 리포트
+        - 작성 도중 끊기면 안내 문구 + 폴백 리포트를 이어서 내보냄
+        """
+        date_str = (date or dt.date.today()).isoformat()
+        if not (use_llm and analyzed):
+            yield self._format_fallback(analyzed, date_str)
+            return
+
+        started = False
+        try:
+            with metrics.span("report.build", articles=len(analyzed), stream=True):
+                for piece in chat_completion_stream(
+                    client,
+                    model=self.model,
+                    temperature=0.2,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": self._prompt(analyzed, date_str)}
+                    ],
+                    first_token_timeout=first_token_timeout,
+                ):
+                    if not started:
+                        if not piece.strip():
+                            continue
+                        started = True
+                        # 안전장치: 마크다운 헤더 없으면 붙이기
+                        piece = piece.lstrip()
+                        if not piece.startswith("#"):
+                            yield f"# 📊 일일 경제 리포트 — {date_str}\n\n"
+                    yield piece
+        except Exception as e:
+            metrics.incr("report.fallbacks")
+            if started:
+                yield f"\n\n---\n\n_리포트 생성이 중단되어 요약본으로 대체합니다 ({type(e).__name__})._\n\n"
+            yield self._format_fallback(analyzed, date_str)
+            return
+        if not started:   # 빈 응답
+            yield self._format_fallback(analyzed, date_str)
+
+    def report_path(self, out_dir: str = "out", date: dt.date | None = None) -> str:
+        date_str = (date or dt.date.today()).isoformat()
+        return os.path.join(out_dir, f"{date_str}.md")
+
     def save_report(self, markdown: str, out_dir: str = "out", date: dt.date | None = None) -> str:
         os.makedirs(out_dir, exist_ok=True)
-        date_str = (date or dt.date.today()).isoformat()
-        path = os.path.join(out_dir, f"{date_str}.md")
+        path = self.report_path(out_dir, date)
         with open(path, "w", encoding="utf-8") as f:
             f.write(markdown)
         return path
 
+    def save_report_stream(self, chunks, out_dir: str = "out", date: dt.date | None = None):
+        """
+        Markdown 조각을 받는 대로 파일에 이어 쓰면서 그대로 다시 yield (화면 표시와 저장을 동시에)
+        저장 경로는 report_path(out_dir, date)
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        with open(self.report_path(out_dir, date), "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                f.flush()
+                yield chunk
+
 
 if __name__ == "__main__":
     # 간단 테스트 (빈 입력 시 폴백 마크다운)
@@ -0,0 +1,195 @@
+# agents/embed_server.py
+"""
+로컬 공용 임베딩 서버 (MiniLM을 프로세스마다 따로 올리지 않도록)
+- localhost HTTP: POST /embed {"model", "texts"} → {"embeddings"} / GET /health / GET /stats
+- 여러 클라이언트 요청을 짧게(EMBED_SERVER_WAIT) 모아 CPU 배치 하나로 임베딩 (micro-batching)
+- pdf_rag는 서버가 떠 있으면 EmbeddingClient를, 없으면 프로세스 안에서 모델을 로드해 사용
+실행: python -m agents.embed_server --port 8903
+"""
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 임베딩 서버 설정 (환경변수로 조정 가능)
+EMBED_SERVER = os.getenv("EMBED_SERVER", "auto")    # auto: 서버가 있으면 사용 / 0: 항상 프로세스 안에서 임베딩
+EMBED_SERVER_URL = os.getenv("EMBED_SERVER_URL", "http://127.0.0.1:8903")
+EMBED_SERVER_TIMEOUT = float(os.getenv("EMBED_SERVER_TIMEOUT", "30"))     # 요청 하나 대기 상한(초)
+EMBED_SERVER_RECHECK = float(os.getenv("EMBED_SERVER_RECHECK", "60"))     # 서버를 못 쓸 때 다시 확인하는 간격(초)
+EMBED_SERVER_BATCH = int(os.getenv("EMBED_SERVER_BATCH", "64"))            # 모델 호출 하나에 넣을 최대 텍스트 수
+EMBED_SERVER_WAIT = float(os.getenv("EMBED_SERVER_WAIT", "0.005"))         # 배치를 채우려고 기다리는 시간(초)
+
+
+class _Batcher:
+    """
+    요청들을 모아서 임베딩 함수를 배치로 호출하는 스레드
+    submit(texts)는 자기 몫의 결과가 나올 때까지 블록
+    """
+    def __init__(self, embed_fn, max_batch=EMBED_SERVER_BATCH, wait=EMBED_SERVER_WAIT):
+        self.embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.wait = wait
+        self._q = queue.Queue()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._loop, daemon=True, name="embed-batcher").start()
+
+    def submit(self, texts, timeout=None):
+        job = {"texts": list(texts), "done": threading.Event(), "result": None, "error": None}
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["texts"] += len(job["texts"])
+        self._q.put(job)
+        if not job["done"].wait(timeout):
+            raise TimeoutError("embedding batch timed out")
+        if job["error"] is not None:
+            raise job["error"]
+        return job["result"]
+
+    def _loop(self):
+        while True:
+            jobs = [self._q.get()]
+            size = len(jobs[0]["texts"])
+            deadline = time.monotonic() + self.wait
+            while size < self.max_batch:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    job = self._q.get(timeout=left)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job["texts"])
+            self._run(jobs)
+
+    def _run(self, jobs):
+        texts = [t for job in jobs for t in job["texts"]]
+        try:
+            vectors = []
+            for i in range(0, len(texts), self.max_batch):
+                vectors.extend(_as_list(v) for v in self.embed_fn(texts[i:i + self.max_batch]))
+            with self._lock:
+                self.stats["batches"] += 1
+            pos = 0
+            for job in jobs:
+                job["result"] = vectors[pos:pos + len(job["texts"])]
+                pos += len(job["texts"])
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            for job in jobs:
+                job["error"] = e
+        for job in jobs:
+            job["done"].set()
+
+
+def _as_list(vec):
+    return vec.tolist() if hasattr(vec, "tolist") else list(vec)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        srv = self.server
+        if self.path == "/health":
+            return self._send(200, {"ok": True, "model": srv.model_name})
+        if self.path == "/stats":
+            stats = dict(srv.batcher.stats)
+            stats["avg_batch_texts"] = round(stats["texts"] / stats["batches"], 1) if stats["batches"] else 0.0
+            return self._send(200, stats)
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        srv = self.server
+        if self.path != "/embed":
+            return self._send(404, {"error": "not found"})
+        try:
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "invalid JSON"})
+        if req.get("model", srv.model_name) != srv.model_name:
+            # 다른 모델 벡터가 섞이면 검색이 망가지므로 거절 → 클라이언트는 로컬 임베딩으로
+            return self._send(400, {"error": f"model mismatch: server has {srv.model_name}"})
+        try:
+            vectors = srv.batcher.submit(req.get("texts") or [], timeout=EMBED_SERVER_TIMEOUT)
+        except Exception as e:
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(200, {"model": srv.model_name, "embeddings": vectors})
+
+
+def start_embed_server(port=8903, model_name=None, embed_fn=None, max_batch=EMBED_SERVER_BATCH,
+                       wait=EMBED_SERVER_WAIT):
+    """
+    백그라운드 스레드로 임베딩 서버 시작 → (server, base_url)
+    embed_fn: 텍스트 리스트 → 벡터 리스트 (기본: pdf_rag의 SentenceTransformer 임베딩, 첫 요청 전에 로드)
+    """
+    from agents.pdf_rag import EMBED_MODEL, local_embedding_function
+
+    model_name = model_name or EMBED_MODEL
+    if embed_fn is None:
+        embed_fn = local_embedding_function(model_name)
+        embed_fn(["warmup"])   # 모델 로드를 서버 시작 시점에
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.model_name = model_name
+    server.batcher = _Batcher(embed_fn, max_batch, wait)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class EmbeddingClient:
+    """임베딩 서버 클라이언트 (Chroma embedding_function 호환: __call__(input) → 벡터 리스트)"""
+    def __init__(self, url=EMBED_SERVER_URL, model_name=None, timeout=EMBED_SERVER_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def available(self, timeout=0.5):
+        """서버가 떠 있고 같은 모델을 쓰는지 (짧은 타임아웃)"""
+        try:
+            with urllib.request.urlopen(f"{self.url}/health", timeout=timeout) as resp:
+                info = json.loads(resp.read())
+            return bool(info.get("ok")) and (self.model_name is None or info.get("model") == self.model_name)
+        except Exception:
+            return False
+
+    def __call__(self, input):
+        body = json.dumps({"model": self.model_name, "texts": list(input)}).encode("utf-8")
+        req = urllib.request.Request(f"{self.url}/embed", data=body,
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())["embeddings"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=int(EMBED_SERVER_URL.rsplit(":", 1)[-1]))
+    ap.add_argument("--batch", type=int, default=EMBED_SERVER_BATCH)
+    ap.add_argument("--wait", type=float, default=EMBED_SERVER_WAIT, help="배치를 모으는 대기 시간(초)")
+    args = ap.parse_args()
+    server, url = start_embed_server(args.port, max_batch=args.batch, wait=args.wait)
+    print(f"임베딩 서버: {url} (모델 {server.model_name}, Ctrl+C 종료)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
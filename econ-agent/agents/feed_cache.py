@@ -0,0 +1,103 @@
+# agents/feed_cache.py
+import os
+import json
+import time
+import threading
+import feedparser
+
+# 피드 캐시 저장 경로
+CACHE_PATH = os.getenv("FEED_CACHE_PATH", "data/feed_cache.json")
+
+# 캐시에 남길 entry 필드 (크롤러가 실제로 쓰는 것만)
+ENTRY_FIELDS = ("title", "link", "summary", "published", "published_parsed")
+
+
+def _slim_entry(e):
+    """feedparser entry → JSON 저장 가능한 dict"""
+    out = {}
+    for k in ENTRY_FIELDS:
+        v = e.get(k)
+        if v is None:
+            continue
+        if k == "published_parsed":
+            v = list(v)[:6]   # time.struct_time → list
+        out[k] = v
+    return out
+
+
+class FeedCache:
+    """
+    피드별 ETag / Last-Modified / 파싱된 entries를 디스크에 보관
+    - 조건부 GET 헤더를 만들고, 304 응답이면 캐시된 entries를 돌려준다
+    - 본문이 바뀌지 않았으면(해시 동일) 재파싱도 생략
+    """
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception:
+                return {}
+        return {}
+
+    def request_headers(self, url):
+        """조건부 GET 헤더 (If-None-Match / If-Modified-Since)"""
+        rec = self._data.get(url) or {}
+        headers = {}
+        if rec.get("etag"):
+            headers["If-None-Match"] = rec["etag"]
+        if rec.get("modified"):
+            headers["If-Modified-Since"] = rec["modified"]
+        return headers
+
+    def get(self, url, body_hash=None):
+        """캐시된 entries (body_hash가 주어지면 본문이 같을 때만)"""
+        rec = self._data.get(url)
+        if not rec:
+            return None
+        if body_hash is not None and rec.get("hash") != body_hash:
+            return None
+        return [feedparser.FeedParserDict(e) for e in rec.get("entries", [])]
+
+    def put(self, url, entries, etag=None, modified=None, body_hash=None):
+        with self._lock:
+            self._data[url] = {
+                "etag": etag,
+                "modified": modified,
+                "hash": body_hash,
+                "fetched_at": time.time(),
+                "entries": [_slim_entry(e) for e in entries],
+            }
+
+    def touch(self, url):
+        """304 응답 시 확인 시각만 갱신"""
+        with self._lock:
+            if url in self._data:
+                self._data[url]["fetched_at"] = time.time()
+
+    def save(self):
+        """임시 파일에 쓰고 교체 (동시 실행 중 깨진 파일 방지)"""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_feed_cache():
+    """프로세스 공용 피드 캐시 (뉴스/블로그 크롤러가 같이 사용)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FeedCache()
+        return _cache
@@ -0,0 +1,144 @@
+# agents/feed_fetcher.py
+import os
+import time
+import hashlib
+import urllib.error
+import urllib.request
+from concurrent.futures import as_completed
+import feedparser
+from agents import metrics
+
+# 동시 수집 설정 (환경변수로 조정 가능)
+FEED_WORKERS = int(os.getenv("FEED_WORKERS", "8"))
+FEED_TIMEOUT = float(os.getenv("FEED_TIMEOUT", "10"))   # 피드 하나 전체(연결~본문 수신) 시간 상한(초)
+READ_CHUNK = 64 * 1024
+USER_AGENT = "Mozilla/5.0 (econ-agent feed fetcher)"
+
+
+def _read_body(resp, deadline):
+    """
+    응답 본문을 조각(read1)으로 읽으면서 전체 마감 시각을 확인
+    urlopen의 timeout은 소켓 연산 하나에만 걸려서, 바이트를 조금씩 흘려보내는 서버는 그것만으로 못 끊음
+    """
+    chunks = []
+    while True:
+        if time.monotonic() > deadline:
+            raise TimeoutError("feed download exceeded total timeout")
+        chunk = resp.read1(READ_CHUNK)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def fetch_feed(url, timeout=FEED_TIMEOUT, cache=None):
+    """
+    피드 하나를 타임아웃을 걸고 내려받아 파싱
+    - timeout: 피드 하나 전체 상한 (본문을 조금씩 보내는 느린 서버도 끊음, 초과분은 소켓 대기 한 번 이내)
+    - cache(FeedCache)가 있으면 조건부 GET, 304/동일 본문이면 캐시 entries 재사용
+    출력: {"url","entries","error","elapsed","cached"}
+    """
+    start = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    headers = {"User-Agent": USER_AGENT}
+    if cache is not None:
+        headers.update(cache.request_headers(url))
+
+    def result(entries, error=None, cached=False):
+        elapsed = time.perf_counter() - start
+        metrics.observe("feed.fetch", elapsed)
+        metrics.incr("feed.errors" if error else ("feed.cached" if cached else "feed.downloaded"))
+        metrics.incr("feed.entries", len(entries))
+        return {
+            "url": url,
+            "entries": entries,
+            "error": error,
+            "elapsed": elapsed,
+            "cached": cached,
+        }
+
+    try:
+        req = urllib.request.Request(url, headers=headers)
+        # feedparser.parse(url)는 타임아웃이 없어서 직접 받아서 파싱
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            raw = _read_body(resp, deadline)
+            etag = resp.headers.get("ETag")
+            modified = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cache is not None:
+            entries = cache.get(url)
+            if entries is not None:
+                cache.touch(url)
+                return result(entries, cached=True)
+        return result([], f"HTTPError: {e.code} {e.reason}")
+    except Exception as e:
+        return result([], f"{type(e).__name__}: {e}")
+
+    try:
+        body_hash = hashlib.sha1(raw).hexdigest()
+        if cache is not None:
+            # 서버가 조건부 GET을 지원하지 않아도 본문이 같으면 재파싱 생략
+            entries = cache.get(url, body_hash=body_hash)
+            if entries is not None:
+                cache.put(url, entries, etag=etag, modified=modified, body_hash=body_hash)
+                return result(entries, cached=True)
+
+        with metrics.span("feed.parse", url=url, bytes=len(raw)):
+            feed = feedparser.parse(raw)
+        if feed.bozo and not feed.entries:
+            raise ValueError(f"피드 파싱 실패: {feed.get('bozo_exception')}")
+        if cache is not None:
+            cache.put(url, feed.entries, etag=etag, modified=modified, body_hash=body_hash)
+        return result(feed.entries)
+    except Exception as e:
+        return result([], f"{type(e).__name__}: {e}")
+
+
+def fetch_feeds(urls, max_workers=FEED_WORKERS, timeout=FEED_TIMEOUT, cache=None):
+    """
+    여러 피드를 스레드풀로 동시에 수집
+    - 전체 소요 시간 ≈ 가장 느린 피드 하나의 시간
+    - 실패한 피드는 error에 사유를 남기고 나머지는 계속 진행
+    - cache가 있으면 수집 후 디스크에 저장
+    출력: 입력 순서대로 [{"url","entries","error","elapsed","cached"}, ...]
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    workers = max(1, min(max_workers or 1, len(urls)))
+    with metrics.ContextThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed") as ex:
+        results = list(ex.map(lambda u: fetch_feed(u, timeout=timeout, cache=cache), urls))
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def iter_feeds(urls, max_workers=FEED_WORKERS, timeout=FEED_TIMEOUT, cache=None):
+    """
+    fetch_feeds의 스트리밍 버전: 먼저 끝난 피드부터 결과를 내보냄
+    - 느린 피드를 기다리는 동안 앞선 결과를 다음 단계(랭킹/분석)로 넘길 수 있음
+    출력(generator): 완료 순서대로 {"url","entries","error","elapsed","cached"}
+    """
+    urls = list(urls)
+    if not urls:
+        return
+    workers = max(1, min(max_workers or 1, len(urls)))
+    try:
+        with metrics.ContextThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed") as ex:
+            futures = [ex.submit(fetch_feed, u, timeout=timeout, cache=cache) for u in urls]
+            for fut in as_completed(futures):
+                yield fut.result()
+    finally:
+        if cache is not None:
+            cache.save()
+
+
+if __name__ == "__main__":
+    from agents.news_crawler import FEEDS
+    from agents.feed_cache import get_feed_cache
+
+    t0 = time.perf_counter()
+    results = fetch_feeds(FEEDS, cache=get_feed_cache())
+    for r in results:
+        status = r["error"] or f"{len(r['entries'])}개" + (" (캐시)" if r["cached"] else "")
+        print(f"- {r['url'][:60]} → {status} ({r['elapsed']:.2f}s)")
+    print(f"총 소요: {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,194 @@
+# agents/llm.py
+import os
+import time
+import random
+import threading
+from agents.llm_cache import get_llm_cache, cache_key
+from agents import metrics
+
+# 호출 제한/재시도 설정 (환경변수로 조정 가능)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))      # 동시 요청 수
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))                    # 분당 요청 수
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))                 # 분당 토큰 수
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))   # 첫 재시도 대기(초)
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+OUTPUT_TOKENS_GUESS = 500   # 응답 토큰 예상치 (TPM 예약용)
+FIRST_TOKEN_TIMEOUT = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "20"))   # 스트리밍 첫 토큰 대기(초)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 대략 추정 (영문 ≈ 4자/토큰, 한글 등 비ASCII ≈ 1자/토큰)"""
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
+
+
+def messages_tokens(messages) -> int:
+    return sum(estimate_tokens(m.get("content", "")) + 4 for m in messages)
+
+
+class RateLimiter:
+    """
+    요청 수(RPM) + 토큰 수(TPM) 토큰 버킷
+    - acquire()는 두 버킷 모두 여유가 생길 때까지 대기
+    - 여러 스레드가 같은 인스턴스를 공유
+    """
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM):
+        self.rpm, self.tpm = rpm, tpm
+        self._req = float(rpm)
+        self._tok = float(tpm)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        dt = now - self._last
+        self._last = now
+        self._req = min(self.rpm, self._req + dt * self.rpm / 60.0)
+        self._tok = min(self.tpm, self._tok + dt * self.tpm / 60.0)
+
+    def acquire(self, tokens=0):
+        tokens = min(tokens, self.tpm)   # 한 요청이 버킷보다 크면 가득 찰 때까지만 대기
+        while True:
+            with self._lock:
+                self._refill()
+                if self._req >= 1 and self._tok >= tokens:
+                    self._req -= 1
+                    self._tok -= tokens
+                    return
+                wait = max((1 - self._req) * 60.0 / self.rpm,
+                           (tokens - self._tok) * 60.0 / self.tpm, 0.01)
+            time.sleep(min(wait, 1.0))
+
+
+RATE_LIMITER = RateLimiter()
+
+
+def is_retryable(e) -> bool:
+    """429 / 5xx / 연결·타임아웃 오류만 재시도"""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError", "InternalServerError")
+
+
+def _retry_after(e):
+    resp = getattr(e, "response", None)
+    try:
+        return float(resp.headers.get("retry-after"))
+    except Exception:
+        return None
+
+
+def chat_completion(client, model, messages, temperature=0.2,
+                    limiter=RATE_LIMITER, max_retries=LLM_MAX_RETRIES, use_cache=True, validate=None) -> str:
+    """
+    client.chat.completions.create 공용 래퍼
+    - 같은 (model, temperature, messages)면 디스크 캐시 응답을 즉시 반환
+    - RPM/TPM 제한, 429/5xx 지수 백오프(+지터, Retry-After 우선)
+    - validate(content) -> bool: False인 응답은 캐시에 넣지 않음 (캐시된 응답이 False면 적중으로 치지 않음)
+    출력: 응답 메시지 본문
+    """
+    cache = get_llm_cache() if use_cache else None
+    key = cache_key(model, temperature, messages) if cache else None
+    if cache:
+        hit = cache.get(key)
+        if hit is not None and (validate is None or validate(hit)):
+            metrics.incr("llm.cache_hits")
+            return hit
+        metrics.incr("llm.cache_misses")
+
+    tokens = messages_tokens(messages) + OUTPUT_TOKENS_GUESS
+    for attempt in range(max_retries + 1):
+        with metrics.span("llm.wait", model=model):
+            limiter.acquire(tokens)
+        try:
+            with metrics.span("llm.call", model=model, attempt=attempt):
+                resp = client.chat.completions.create(
+                    model=model,
+                    temperature=temperature,
+                    messages=messages,
+                )
+            usage = getattr(resp, "usage", None)
+            metrics.incr("llm.tokens.prompt", getattr(usage, "prompt_tokens", None) or messages_tokens(messages))
+            metrics.incr("llm.tokens.completion", getattr(usage, "completion_tokens", None) or 0)
+            content = resp.choices[0].message.content or ""
+            if cache and content and (validate is None or validate(content)):
+                cache.put(key, content, model=model)
+            return content
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                metrics.incr("llm.errors")
+                raise
+            metrics.incr("llm.retries")
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random() / 2)
+            time.sleep(delay)
+
+
+def chat_completion_stream(client, model, messages, temperature=0.2, limiter=RATE_LIMITER,
+                           max_retries=LLM_MAX_RETRIES, use_cache=True,
+                           first_token_timeout=FIRST_TOKEN_TIMEOUT, validate=None):
+    """
+    chat_completion의 스트리밍 버전: 응답 텍스트 조각을 도착하는 대로 yield
+    - 캐시 적중이면 저장된 응답 전체를 한 번에 yield
+    - 첫 토큰 전의 429/5xx만 재시도 (이미 내보낸 조각은 되돌릴 수 없으므로 이후 오류는 그대로 raise)
+    - first_token_timeout: 요청 후 이 시간 안에 응답이 없으면 APITimeoutError
+      (읽기 타임아웃으로 적용되므로 토큰 사이가 이만큼 멈춰도 중단)
+    - validate: chat_completion과 같음 (전체 응답 기준)
+    """
+    cache = get_llm_cache() if use_cache else None
+    key = cache_key(model, temperature, messages) if cache else None
+    if cache:
+        hit = cache.get(key)
+        if hit is not None and (validate is None or validate(hit)):
+            metrics.incr("llm.cache_hits")
+            yield hit
+            return
+        metrics.incr("llm.cache_misses")
+
+    tokens = messages_tokens(messages) + OUTPUT_TOKENS_GUESS
+    for attempt in range(max_retries + 1):
+        with metrics.span("llm.wait", model=model):
+            limiter.acquire(tokens)
+        start = time.perf_counter()
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                messages=messages,
+                stream=True,
+                timeout=first_token_timeout,
+            )
+            break
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e) or type(e).__name__ == "APITimeoutError":
+                metrics.incr("llm.errors")
+                raise
+            metrics.incr("llm.retries")
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random() / 2)
+            time.sleep(delay)
+
+    parts = []
+    with metrics.span("llm.stream", model=model) as attrs:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if not parts:
+                attrs["first_token"] = round(time.perf_counter() - start, 3)
+                metrics.observe("llm.first_token", time.perf_counter() - start)
+            parts.append(delta)
+            yield delta
+    content = "".join(parts)
+    metrics.incr("llm.tokens.prompt", messages_tokens(messages))
+    metrics.incr("llm.tokens.completion", estimate_tokens(content))
+    if cache and content and (validate is None or validate(content)):
+        cache.put(key, content, model=model)
@@ -0,0 +1,135 @@
+# agents/llm_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# LLM 응답 캐시 설정 (환경변수로 조정 가능)
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))          # 초
+CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+
+def cache_key(model, temperature, messages) -> str:
+    """모델 + temperature + messages 내용 해시"""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    디스크(SQLite) 기반 LLM 응답 캐시
+    - TTL이 지난 항목은 무시하고 삭제
+    - 전체 크기가 상한을 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+    - hit/miss/evict 카운터 제공
+    """
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                value TEXT,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key=?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key=?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed=? WHERE key=?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, value, model=""):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created, accessed) "
+                "VALUES (?,?,?,?,?,?)",
+                (key, model, value, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 상한의 90%까지 오래된 항목부터 제거
+        target = total - int(self.max_bytes * 0.9)
+        freed, victims = 0, []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key=?", victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": count,
+            "bytes": size,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """프로세스 공용 LLM 캐시 (비활성화 시 None)"""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+if __name__ == "__main__":
+    cache = get_llm_cache()
+    print("🗄 LLM 캐시:", cache.path if cache else "비활성화", cache.stats() if cache else "")
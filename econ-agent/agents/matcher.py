@@ -0,0 +1,98 @@
+# agents/matcher.py
+from collections import Counter, deque
+from functools import lru_cache
+
+
+def _is_word_char(ch: str) -> bool:
+    """ASCII 영숫자만 단어 문자로 취급 (한글 뒤 조사는 경계로 보지 않음)"""
+    return ch.isascii() and ch.isalnum()
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 기반 다중 패턴 매처
+    - 텍스트를 한 번만 훑어서 모든 키워드/티커의 등장 횟수를 센다
+    - 대소문자 무시
+    - ASCII 영숫자로 시작/끝나는 패턴(AAPL, AI, 005930.KS)은 단어 경계 필요
+      (예: "AI"는 "said"에 매칭되지 않음, "AI반도체"에는 매칭)
+    - 한글 키워드는 조사가 붙어도 매칭 ("금리가", "반도체주")
+    """
+    def __init__(self, patterns):
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        self._goto = [{}]      # 상태별 전이
+        self._fail = [0]
+        self._out = [[]]       # 상태별 매칭 패턴 번호
+        for idx, p in enumerate(self.patterns):
+            self._insert(p.lower(), idx)
+        self._build()
+        self._lens = [len(p) for p in self.patterns]
+        self._left = [_is_word_char(p[0]) for p in self.patterns]
+        self._right = [_is_word_char(p[-1]) for p in self.patterns]
+
+    def _insert(self, word, idx):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(idx)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def counts(self, text: str) -> Counter:
+        """{패턴(원문 표기): 등장 횟수}"""
+        found = Counter()
+        if not text or not self.patterns:
+            return found
+        low = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        n = len(low)
+        for i, ch in enumerate(low):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                start = i - self._lens[idx] + 1
+                if self._left[idx] and start > 0 and _is_word_char(low[start - 1]):
+                    continue
+                if self._right[idx] and i + 1 < n and _is_word_char(low[i + 1]):
+                    continue
+                found[self.patterns[idx]] += 1
+        return found
+
+    def matches(self, text: str):
+        """텍스트에 등장한 패턴 목록 (패턴 등록 순서)"""
+        c = self.counts(text)
+        return [p for p in self.patterns if c[p]]
+
+
+@lru_cache(maxsize=64)
+def _cached(patterns: tuple):
+    return KeywordMatcher(patterns)
+
+
+def get_matcher(patterns) -> KeywordMatcher:
+    """같은 키워드/티커 집합이면 한 번 만든 매처를 재사용"""
+    return _cached(tuple(patterns))
+
+
+if __name__ == "__main__":
+    m = get_matcher(["AI", "금리", "AAPL", "005930.KS", "FOMC"])
+    print(m.counts("FOMC 이후 금리가 오르자 AAPL·005930.KS 하락, AI 반도체는 said 강세 (aapl)"))
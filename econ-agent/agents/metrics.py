@@ -0,0 +1,229 @@
+# agents/metrics.py
+import os
+import re
+import glob
+import json
+import time
+import threading
+import contextvars
+from concurrent import futures
+from contextlib import contextmanager
+from collections import Counter
+from datetime import datetime
+
+# 계측 설정 (환경변수로 조정 가능)
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+METRICS_PROM = os.getenv("METRICS_PROM", "0") == "1"         # 실행마다 Prometheus 텍스트 파일도 저장
+MAX_SPANS = int(os.getenv("METRICS_MAX_SPANS", "5000"))       # 트레이스에 남길 span 수 상한
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)   # 히스토그램 경계(초)
+PROM_PREFIX = "econ_agent_"
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸 = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6),
+                "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts))}
+
+
+class Recorder:
+    """
+    한 번의 파이프라인 실행 동안의 계측값
+    - span: 이름 있는 구간 시간 (같은 스레드 안에서는 parent로 중첩 관계 기록)
+    - counter: 누적 개수 (수집 기사, 중복 제거, 캐시 적중, 토큰 등)
+    - histogram: 값 분포 (span 시간은 "<이름>" 히스토그램에 자동 기록)
+    """
+    def __init__(self):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans = []
+        self.dropped_spans = 0
+        self.counters = Counter()
+        self.histograms = {}
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs   # 구간 안에서 attrs에 값을 추가할 수 있음
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            rec = {"name": name, "start": round(start - self._t0, 6), "seconds": round(seconds, 6),
+                   "thread": threading.current_thread().name, "parent": parent}
+            if attrs:
+                rec["attrs"] = attrs
+            if error:
+                rec["error"] = error
+            with self._lock:
+                if len(self.spans) < MAX_SPANS:
+                    self.spans.append(rec)
+                else:
+                    self.dropped_spans += 1
+                self._observe(name, seconds)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name, value):
+        with self._lock:
+            self._observe(name, value)
+
+    def _observe(self, name, value):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        hist.observe(value)
+
+    def span_summary(self):
+        """span 이름별 {count, total, max} (총 시간 큰 순)"""
+        with self._lock:
+            hists = dict(self.histograms)
+            names = {s["name"] for s in self.spans}
+        rows = {n: {"count": h.count, "total": round(h.sum, 3), "max": round(h.max, 3)}
+                for n, h in hists.items() if n in names}
+        return dict(sorted(rows.items(), key=lambda kv: kv[1]["total"], reverse=True))
+
+    def to_dict(self, **extra):
+        with self._lock:
+            data = {
+                "started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "wall_seconds": round(time.perf_counter() - self._t0, 3),
+                **extra,
+                "span_summary": None,
+                "counters": dict(self.counters),
+                "histograms": {n: h.to_dict() for n, h in self.histograms.items()},
+                "spans": list(self.spans),
+                "dropped_spans": self.dropped_spans,
+            }
+        data["span_summary"] = self.span_summary()
+        return data
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 포맷 (node_exporter textfile collector 등에서 읽을 수 있음)"""
+        def metric(name):
+            return PROM_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                m = metric(name) + "_total"
+                lines += [f"# TYPE {m} counter", f"{m} {value}"]
+            for name, h in sorted(self.histograms.items()):
+                m = metric(name)
+                lines.append(f"# TYPE {m} histogram")
+                acc = 0
+                for le, c in zip([*map(str, h.buckets), "+Inf"], h.counts):
+                    acc += c
+                    lines.append(f'{m}_bucket{{le="{le}"}} {acc}')
+                lines += [f"{m}_sum {h.sum:.6f}", f"{m}_count {h.count}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, base_path, prometheus=None, **extra):
+        """
+        base_path(확장자 제외)에 트레이스 저장: <base>.trace.json (+ <base>.prom)
+        출력: 트레이스 JSON 경로
+        """
+        os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+        path = f"{base_path}.trace.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(**extra), f, ensure_ascii=False, indent=2, default=str)
+        if METRICS_PROM if prometheus is None else prometheus:
+            with open(f"{base_path}.prom", "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+        return path
+
+
+class _NullRecorder(Recorder):
+    """METRICS=0일 때: 호출은 받되 아무것도 기록하지 않음"""
+    @contextmanager
+    def span(self, name, **attrs):
+        yield attrs
+
+    def incr(self, name, n=1):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+
+# 실행(run)마다 Recorder를 contextvar로 들고 다님 → 동시에 도는 실행(예: Streamlit 세션 두 개)끼리 섞이지 않음
+# start_run() 밖에서 기록된 값은 프로세스 기본 Recorder로
+_default = Recorder() if METRICS_ENABLED else _NullRecorder()
+_current = contextvars.ContextVar("metrics_recorder", default=_default)
+
+
+def start_run():
+    """
+    새 실행용 Recorder를 현재 컨텍스트에 설정 (이 스레드와, 여기서 ContextThreadPoolExecutor/
+    run_in_context로 넘긴 작업의 계측이 여기에 쌓임)
+    """
+    recorder = Recorder() if METRICS_ENABLED else _NullRecorder()
+    _current.set(recorder)
+    return recorder
+
+
+def get_recorder():
+    return _current.get()
+
+
+def run_in_context(fn):
+    """
+    fn을 지금 컨텍스트(현재 Recorder 포함)에서 실행하는 함수로 감쌈 — threading.Thread target용
+    (새 스레드는 빈 컨텍스트로 시작해서 기본 Recorder에 기록하게 됨)
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+class ContextThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """제출한 쪽의 컨텍스트(현재 Recorder 포함)로 작업을 실행하는 ThreadPoolExecutor (map도 submit을 거침)"""
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# 에이전트에서 쓰는 단축 함수 (현재 Recorder에 기록)
+def span(name, **attrs):
+    return _current.get().span(name, **attrs)
+
+
+def incr(name, n=1):
+    _current.get().incr(name, n)
+
+
+def observe(name, value):
+    _current.get().observe(name, value)
+
+
+def latest_trace(out_dir="out"):
+    """가장 최근 실행 트레이스 (없으면 None)"""
+    paths = glob.glob(os.path.join(out_dir, "*.trace.json"))
+    if not paths:
+        return None
+    with open(max(paths, key=os.path.getmtime), "r", encoding="utf-8") as f:
+        return json.load(f)
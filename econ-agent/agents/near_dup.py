@@ -0,0 +1,145 @@
+# agents/near_dup.py
+import re
+import hashlib
+from functools import lru_cache
+from collections import defaultdict
+
+# SimHash 설정
+BITS = 64
+SHINGLE = 3                 # 문자 n-gram 크기 (한국어/영어 공통)
+DEFAULT_THRESHOLD = 0.85    # 유사도(1 - 해밍거리/64) 이 값 이상이면 같은 기사로 간주
+MIN_BAND_BITS = 8           # 밴드 폭 하한 (버킷이 너무 잘게 쪼개져 후보가 폭증하는 것 방지)
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"<[^>]+>", " ", text or "")
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _shingles(text: str, n: int = SHINGLE):
+    if len(text) <= n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def _hash64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# 바이트 값 → 비트별 16bit 레인으로 펼친 정수 (64개 비트 카운터를 큰 정수 하나로 누적)
+_LANE = 16
+_SPREAD = [
+    [sum(1 << ((pos * 8 + j) * _LANE) for j in range(8) if (v >> j) & 1) for v in range(256)]
+    for pos in range(BITS // 8)
+]
+
+
+@lru_cache(maxsize=1 << 17)
+def _gram_spread(g: str) -> int:
+    """n-gram 해시를 레인으로 펼친 값 (n-gram 어휘는 한정적이라 캐시 효과가 큼)"""
+    h = _hash64(g)
+    return sum(_SPREAD[pos][(h >> (pos * 8)) & 0xFF] for pos in range(BITS // 8))
+
+
+def simhash(text: str) -> int:
+    """
+    정규화한 텍스트의 문자 n-gram SimHash (64bit)
+    - n-gram은 빈도 대신 집합으로 사용 (자주 나오는 조사/관사가 서명을 지배하지 않도록)
+    """
+    grams = set(_shingles(_normalize(text)[:1000]))   # 레인 오버플로 방지용 길이 제한
+    acc = 0
+    for g in grams:
+        acc += _gram_spread(g)
+    total = len(grams)
+    # 비트 b의 가중치 = (set 개수) - (unset 개수) > 0 이면 1
+    mask = (1 << _LANE) - 1
+    sig = 0
+    for b in range(BITS):
+        if 2 * ((acc >> (b * _LANE)) & mask) > total:
+            sig |= 1 << b
+    return sig
+
+
+def similarity(a: int, b: int) -> float:
+    return 1.0 - bin(a ^ b).count("1") / BITS
+
+
+def item_text(item) -> str:
+    """서명에 쓰는 텍스트: 제목 + 요약 앞부분"""
+    return f"{item.get('title', '')} {(item.get('summary') or '')[:500]}"
+
+
+class NearDupIndex:
+    """
+    SimHash + 밴딩(LSH) 인덱스
+    - 해밍거리 k 이하인 서명은 (k+1)개 밴드 중 최소 하나가 반드시 일치(비둘기집)
+    - 밴드 폭은 MIN_BAND_BITS 이상으로 제한 → k가 크면 일부 중복을 놓칠 수 있는 대신
+      후보 수가 n/2^폭 수준으로 유지됨
+    - 같은 밴드 버킷에 걸린 후보만 비교하므로 전체 쌍 비교를 피함
+    """
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.max_distance = int((1.0 - threshold) * BITS)
+        n_bands = min(self.max_distance + 1, BITS // MIN_BAND_BITS)
+        width = BITS // n_bands
+        # 밴드 경계 (마지막 밴드가 나머지 비트를 가져감)
+        self._bands = [(i * width, BITS if i == n_bands - 1 else (i + 1) * width) for i in range(n_bands)]
+        self._buckets = defaultdict(list)
+        self.signatures = []
+
+    def _band_keys(self, sig):
+        for i, (lo, hi) in enumerate(self._bands):
+            yield i, (sig >> lo) & ((1 << (hi - lo)) - 1)
+
+    def find(self, sig):
+        """가장 가까운 기존 항목 번호 (없으면 None)"""
+        best, best_dist = None, self.max_distance + 1
+        checked = set()
+        for key in self._band_keys(sig):
+            for idx in self._buckets.get(key, ()):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                d = bin(sig ^ self.signatures[idx]).count("1")
+                if d < best_dist:
+                    best, best_dist = idx, d
+        return best
+
+    def add(self, sig):
+        idx = len(self.signatures)
+        self.signatures.append(sig)
+        for key in self._band_keys(sig):
+            self._buckets[key].append(idx)
+        return idx
+
+
+def dedupe(items, threshold=DEFAULT_THRESHOLD):
+    """
+    유사 기사 묶기
+    - 각 묶음의 첫 기사를 대표로 남기고, 나머지는 대표의 "alternates"에
+      {"title","link","source"}로 기록 (대표는 얕은 복사본)
+    출력: (대표 기사 리스트, 제거된 기사 수)
+    """
+    index = NearDupIndex(threshold)
+    reps, members = [], []
+    for it in items:
+        sig = simhash(item_text(it))
+        hit = index.find(sig)
+        if hit is not None:
+            members[hit].append(it)
+            continue
+        index.add(sig)
+        reps.append(it)
+        members.append([])
+
+    out = []
+    for rep, dups in zip(reps, members):
+        if dups:
+            rep = dict(rep)
+            rep["alternates"] = list(rep.get("alternates", [])) + [
+                {"title": d.get("title", ""), "link": d.get("link", ""), "source": d.get("source", "")}
+                for d in dups
+            ]
+        out.append(rep)
+    return out, len(items) - len(reps)
@@ -1,11 +1,22 @@
 import os, re, json
 from dotenv import load_dotenv
-from agents.pdf_rag import query_pdf_knowledge   # 🔥 PDF RAG 연결
+from agents.pdf_rag import query_pdf_knowledge_many   # 🔥 PDF RAG 연결
+from agents.llm import chat_completion, estimate_tokens, LLM_CONCURRENCY, is_retryable
+from agents.article_store import article_key
+from agents import metrics
 
 # OpenAI SDK
 use_llm = False
 client = None
 MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = "너는 경제 뉴스를 잘 요약하는 분석가야. JSON만 출력해."
+
+# 묶음 분석 설정 (환경변수로 조정 가능)
+# 묶음 요청의 LLM 캐시 키는 묶인 기사 조합 전체 → 같은 기사라도 다른 조합으로 묶이면 캐시 적중 안 됨
+# (기사 id는 article_key 기반, 묶는 순서도 id 순이라 같은 기사 집합이면 같은 묶음이 나옴)
+ANALYST_PACK_SIZE = int(os.getenv("ANALYST_PACK_SIZE", "1"))          # 요청 하나에 넣을 기사 수 K (1 = 기사별 요청)
+ANALYST_PACK_TOKENS = int(os.getenv("ANALYST_PACK_TOKENS", "3000"))   # 묶음 요청 하나의 기사 입력 토큰 상한
+ANALYST_SUMMARY_CHARS = int(os.getenv("ANALYST_SUMMARY_CHARS", "1200"))   # 묶음 프롬프트의 기사 요약 글자 수 상한
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -13,29 +24,103 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if OPENAI_API_KEY:
     try:
         from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        # 재시도/백오프는 agents.llm.chat_completion이 담당
+        client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
         use_llm = True
     except Exception:
         use_llm = False
 
 
+def _valid_analysis(obj):
+    """LLM이 돌려준 분석 하나가 쓸 만한 형태인지 검사"""
+    return (isinstance(obj, dict)
+            and all(isinstance(obj.get(k), str) and obj.get(k).strip() for k in ("headline", "summary", "impact"))
+            and isinstance(obj.get("keywords"), list) and obj["keywords"]
+            and all(isinstance(k, str) for k in obj["keywords"]))
+
+
+def _parse_analysis(content):
+    """기사 1건 응답 → 분석 dict (형식이 틀리면 None)"""
+    m = re.search(r"\{.*\}", content or "", re.S)
+    try:
+        data = json.loads(m.group(0)) if m else None
+    except ValueError:
+        return None
+    return data if _valid_analysis(data) else None
+
+
+def _parse_pack(content, wanted):
+    """묶음 응답 → {id: 분석} (wanted에 없는 id, 중복, 형식이 틀린 원소는 버림)"""
+    out = {}
+    for obj in _json_objects(content or ""):
+        aid = str(obj.get("id", "")) if isinstance(obj, dict) else ""
+        if aid in wanted and aid not in out and _valid_analysis(obj):
+            out[aid] = {"headline": obj["headline"], "summary": obj["summary"], "impact": obj["impact"],
+                        "keywords": [k for k in obj["keywords"] if k][:3], "rag_context": []}
+    return out
+
+
+def _json_objects(text):
+    """
+    응답에서 JSON 객체들을 최대한 건져냄
+    - 배열 전체가 올바르면 그대로, 아니면 '{' 위치마다 개별 객체 파싱 (깨진 원소만 버림)
+    """
+    m = re.search(r"\[.*\]", text, re.S)
+    if m:
+        try:
+            data = json.loads(m.group(0))
+            if isinstance(data, list):
+                return data
+        except ValueError:
+            pass
+    decoder, out, i = json.JSONDecoder(), [], text.find("{")
+    while i != -1:
+        try:
+            obj, end = decoder.raw_decode(text, i)
+            out.append(obj)
+            i = text.find("{", end)
+        except ValueError:
+            i = text.find("{", i + 1)
+    return out
+
+
 class NewsAnalystAgent:
-    def __init__(self, model=MODEL):
+    def __init__(self, model=MODEL, max_workers=LLM_CONCURRENCY, pack_size=ANALYST_PACK_SIZE,
+                 pack_tokens=ANALYST_PACK_TOKENS):
+        """
+        pack_size: analyze_many에서 요청 하나에 묶을 기사 수 (1이면 기사별 요청)
+        pack_tokens: 묶음 요청 하나의 기사 입력 토큰 상한 (넘으면 K보다 적게 묶음)
+        """
         self.model = model
+        self.max_workers = max_workers   # analyze_many 동시 요청 수
+        self.pack_size = pack_size
+        self.pack_tokens = pack_tokens
+
+    def _fallback(self, article, impact):
+        metrics.incr("analyze.fallbacks")
+        return {
+            "headline": article["title"],
+            "summary": (article["summary"] or "기사 본문 없음")[:200],
+            "impact": impact,
+            "keywords": [],
+            "rag_context": []
+        }
 
     def analyze(self, article):
         """
         입력: {title, summary, link, published, source}
         출력: {"headline","summary","impact","keywords","rag_context"}
         """
+        return self._attach_rag([self._analyze_llm(article)])[0]
+
+    def _analyze_llm(self, article):
+        """LLM 분석만 수행 (RAG 보강은 _attach_rag에서 묶어서)"""
+        with metrics.span("analyze.article"):
+            return self._analyze_llm_inner(article)
+
+    def _analyze_llm_inner(self, article):
         if not use_llm:
-            return {
-                "headline": article["title"],
-                "summary": (article["summary"] or "기사 본문 없음")[:200],
-                "impact": "LLM 비활성화 상태 (영향 분석 생략)",
-                "keywords": [],
-                "rag_context": []
-            }
+            return self._fallback(article, "LLM 비활성화 상태 (영향 분석 생략)")
 
         prompt = f"""
 역할: 경제/증시 전문 기자
@@ -53,37 +138,162 @@ class NewsAnalystAgent:
 """
 
         try:
-            resp = client.chat.completions.create(
+            content = chat_completion(
+                client,
                 model=self.model,
                 temperature=0.2,
                 messages=[
-                    {"role": "system", "content": "너는 경제 뉴스를 잘 요약하는 분석가야. JSON만 출력해."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                validate=lambda c: _parse_analysis(c) is not None,   # 형식이 틀린 응답은 캐시하지 않음
             )
-            content = resp.choices[0].message.content.strip()
-            m = re.search(r"\{.*\}", content, re.S)
-            data = json.loads(m.group(0)) if m else {}
-
-            # 🔥 PDF RAG 지식 보강
-            rag_context = []
-            for kw in data.get("keywords", []):
-                if kw:
-                    docs = query_pdf_knowledge(kw, n_results=1)
-                    if docs:
-                        rag_context.append(f"{kw}: {docs[0]}")
-
-            data["rag_context"] = rag_context
+            data = _parse_analysis(content)
+            if data is None:
+                return self._fallback(article, "분석 실패: 응답 형식 오류")
+            data["rag_context"] = []
             return data
 
         except Exception as e:
-            return {
-                "headline": article["title"],
-                "summary": (article["summary"] or "기사 본문 없음")[:200],
-                "impact": f"분석 실패: {e}",
-                "keywords": [],
-                "rag_context": []
-            }
+            return self._fallback(article, f"분석 실패: {e}")
+
+    def _attach_rag(self, results):
+        """
+        🔥 PDF RAG 지식 보강
+        - 모든 결과의 키워드를 모아 한 번의 배치 검색으로 처리
+        """
+        keywords = [kw for r in results for kw in r.get("keywords", []) if kw]
+        if not keywords:
+            return results
+        try:
+            with metrics.span("analyze.rag", keywords=len(keywords)):
+                docs = dict(zip(keywords, query_pdf_knowledge_many(keywords, n_results=1)))
+        except Exception:
+            return results   # RAG 실패는 분석 결과에 영향 주지 않음
+        for r in results:
+            r["rag_context"] = [f"{kw}: {docs[kw][0]}" for kw in r.get("keywords", []) if kw and docs.get(kw)]
+        return results
+
+    def _article_block(self, aid, article):
+        summary = (article.get("summary") or "")[:ANALYST_SUMMARY_CHARS]
+        return f"[기사 {aid}]\n제목: {article['title']}\n요약(원문 제공): {summary}\n"
+
+    def _packs(self, articles, pack_size):
+        """(id, 기사) 목록을 K개 / 토큰 상한 기준으로 묶음"""
+        packs, cur, used = [], [], 0
+        for aid, art in articles:
+            cost = estimate_tokens(self._article_block(aid, art))
+            if cur and (len(cur) >= pack_size or used + cost > self.pack_tokens):
+                packs.append(cur)
+                cur, used = [], 0
+            cur.append((aid, art))
+            used += cost
+        if cur:
+            packs.append(cur)
+        return packs
+
+    def _analyze_pack(self, pack):
+        """
+        기사 여러 건을 요청 하나로 분석 (역할/지시문은 한 번만)
+        출력: {id: 분석} — 파싱/검증에 실패한 원소는 빠짐 (재요청 대상)
+        재시도해도 소용없는 오류(인증/잘못된 요청 등)는 묶음 전체를 바로 폴백으로 채움
+        """
+        blocks = "\n".join(self._article_block(aid, art) for aid, art in pack)
+        ids = ", ".join(aid for aid, _ in pack)
+        prompt = f"""
+역할: 경제/증시 전문 기자
+아래 기사 {len(pack)}건을 각각 분석하라.
+
+{blocks}
+기사마다 요청:
+1) 한줄 핵심 요약 (<=20자, 한국어)
+2) 기사 핵심 내용 요약 (3문장 이내)
+3) 영향 분석: 거시/산업/종목에 어떤 메커니즘으로 영향을 줄지
+4) 키워드 3개 (영문 약어 가능)
+
+출력은 반드시 JSON 배열만 (기사마다 원소 하나, id는 그대로: {ids}):
+[{{"id":"","headline":"","summary":"","impact":"","keywords":["","",""]}}]
+"""
+        wanted = {aid for aid, _ in pack}
+        try:
+            with metrics.span("analyze.pack", articles=len(pack)):
+                content = chat_completion(
+                    client,
+                    model=self.model,
+                    temperature=0.2,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    # 원소가 하나라도 틀린 응답은 캐시하지 않음 (재요청이 같은 응답을 다시 받지 않도록)
+                    validate=lambda c: len(_parse_pack(c, wanted)) == len(wanted),
+                )
+        except Exception as e:
+            if is_retryable(e):
+                return {}   # 일시 오류: 다음 묶음/기사별 요청에서 다시 시도
+            metrics.incr("analyze.pack_failed", len(pack))
+            return {aid: self._fallback(art, f"분석 실패: {e}") for aid, art in pack}
+        out = _parse_pack(content, wanted)
+        metrics.incr("analyze.pack_invalid", len(wanted) - len(out))
+        return out
+
+    def _safe(self, article):
+        try:
+            return self._analyze_llm(article)
+        except Exception as e:
+            return self._fallback(article, f"분석 실패: {e}")
+
+    def _analyze_packed(self, articles, workers, pack_size):
+        """
+        묶음 분석: K개씩 묶어 동시 요청 → 실패한 원소만 한 번 더 묶어서 재요청
+        → 그래도 실패한 기사는 기사별 요청 (실패 시 폴백)
+        - 재시도 불가 오류가 난 묶음은 재요청 없이 폴백으로 끝냄
+        """
+        # id는 위치가 아니라 기사 키로, 묶음도 id 순서로 → 입력 순서가 달라도 같은 기사 집합이면 같은 프롬프트
+        ids = [article_key(art)[:12] for art in articles]
+        todo = sorted(dict(zip(ids, articles)).items())
+        done = {}
+        for _ in range(2):
+            packs = self._packs([(aid, art) for aid, art in todo if aid not in done], pack_size)
+            if not packs:
+                break
+            with metrics.ContextThreadPoolExecutor(max_workers=max(1, min(workers, len(packs))),
+                                                   thread_name_prefix="analyst-pack") as ex:
+                for res in ex.map(self._analyze_pack, packs):
+                    done.update(res)
+        rest = [(aid, art) for aid, art in todo if aid not in done]
+        metrics.incr("analyze.pack_singles", len(rest))
+        if rest:
+            with metrics.ContextThreadPoolExecutor(max_workers=max(1, min(workers, len(rest))),
+                                                   thread_name_prefix="analyst") as ex:
+                for (aid, _), res in zip(rest, ex.map(self._safe, [art for _, art in rest])):
+                    done[aid] = res
+        return [done[aid] for aid in ids]
+
+    def analyze_many(self, articles, max_workers=None, pack_size=None):
+        """
+        여러 기사를 동시에 분석 (동시 요청 수 제한, RPM/TPM 제한·백오프는 agents.llm)
+        - pack_size(K) > 1: 기사 K건을 요청 하나로 묶어 분석 (JSON 배열, 원소별 검증 후 실패분만 재요청)
+        - RAG 검색은 전체 키워드를 모아 배치 1회
+        - 결과는 입력 순서 그대로
+        - 기사 하나가 실패해도 나머지에 영향 없음 (실패 항목은 폴백 결과)
+        """
+        articles = list(articles)
+        if not articles:
+            return []
+        pack_size = pack_size or self.pack_size
+        if use_llm and pack_size > 1 and len(articles) > 1:
+            results = self._analyze_packed(articles, max_workers or self.max_workers, pack_size)
+            return self._attach_rag(results)
+
+        workers = max(1, min(max_workers or self.max_workers, len(articles)))
+        if not use_llm or workers == 1:
+            results = [self._safe(a) for a in articles]
+        else:
+            with metrics.ContextThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyst") as ex:
+                results = list(ex.map(self._safe, articles))
+        # 이번 배치의 키워드 전체를 RAG 한 번으로 조회
+        return self._attach_rag(results)
 
 
 # === 직접 실행 (테스트) ===
@@ -99,8 +309,7 @@ if __name__ == "__main__":
     ranked = ranker.rank_items(articles)
 
     analyst = NewsAnalystAgent()
-    for score, art in ranked:
-        result = analyst.analyze(art)
+    for result in analyst.analyze_many([art for _, art in ranked]):
         print("\n----")
         print("제목:", result["headline"])
         print("요약:", result["summary"])
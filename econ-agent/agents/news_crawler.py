@@ -2,7 +2,10 @@ import re
 import hashlib
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-import feedparser
+from agents.feed_fetcher import fetch_feeds, iter_feeds, FEED_WORKERS, FEED_TIMEOUT
+from agents.feed_cache import get_feed_cache
+from agents import metrics
+from agents.matcher import get_matcher
 
 # 설정
 KST = ZoneInfo("Asia/Seoul")
@@ -20,45 +23,81 @@ KEYWORDS = [
 ]
 
 class NewsCrawlerAgent:
-    def __init__(self, horizon_hours=18):
+    def __init__(self, horizon_hours=18, max_workers=FEED_WORKERS, timeout=FEED_TIMEOUT,
+                 use_cache=True):
         """
         horizon_hours: 최근 몇 시간 이내의 뉴스를 가져올지 (기본 18시간)
+        max_workers: 동시에 내려받을 피드 수 (1이면 순차 수집)
+        timeout: 피드 하나당 타임아웃(초)
+        use_cache: data/ 피드 캐시로 조건부 GET (변경 없는 피드는 재다운로드/재파싱 생략)
         """
         self.horizon_hours = horizon_hours
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self.errors = {}   # 마지막 수집에서 실패한 피드 {url: 사유}
+
+    def _to_item(self, e, url, since):
+        """feedparser entry → 기사 dict (기간 밖이면 None)"""
+        # 발행 시간
+        if hasattr(e, "published_parsed") and e.published_parsed:
+            pub = datetime(*e.published_parsed[:6], tzinfo=ZoneInfo("UTC")).astimezone(KST)
+        else:
+            pub = datetime.now(KST)
+
+        if pub < since:
+            return None
+
+        title = e.get("title", "").strip()
+        link = getattr(e, "link", "").strip()
+        summary = re.sub(r"<[^>]+>", "", getattr(e, "summary", "")).strip()
+
+        return {
+            "title": title,
+            "link": link,
+            "summary": summary,
+            "published": pub,
+            "source": url
+        }
 
     def collect_items(self):
-        """RSS 피드에서 뉴스 기사 수집"""
+        """RSS 피드에서 뉴스 기사 수집 (피드별 동시 수집)"""
         since = datetime.now(KST) - timedelta(hours=self.horizon_hours)
         items = []
-        for url in FEEDS:
-            feed = feedparser.parse(url)
-            for e in feed.entries:
-                # 발행 시간
-                if hasattr(e, "published_parsed") and e.published_parsed:
-                    pub = datetime(*e.published_parsed[:6], tzinfo=ZoneInfo("UTC")).astimezone(KST)
-                else:
-                    pub = datetime.now(KST)
-
-                if pub < since:
-                    continue
-
-                title = e.title.strip()
-                link = getattr(e, "link", "").strip()
-                summary = re.sub(r"<[^>]+>", "", getattr(e, "summary", "")).strip()
-
-                items.append({
-                    "title": title,
-                    "link": link,
-                    "summary": summary,
-                    "published": pub,
-                    "source": url
-                })
+        self.errors = {}
+        for res in fetch_feeds(FEEDS, max_workers=self.max_workers, timeout=self.timeout,
+                               cache=get_feed_cache() if self.use_cache else None):
+            if res["error"]:
+                self.errors[res["url"]] = res["error"]
+                continue
+            for e in res["entries"]:
+                item = self._to_item(e, res["url"], since)
+                if item:
+                    items.append(item)
+        metrics.incr("articles.fetched", len(items))
         return items
 
+    def iter_items(self):
+        """
+        피드가 도착하는 순서대로 기사 묶음을 내보냄 (스트리밍 파이프라인용)
+        출력(generator): {"url","items","error","elapsed","cached"}
+        """
+        since = datetime.now(KST) - timedelta(hours=self.horizon_hours)
+        self.errors = {}
+        for res in iter_feeds(FEEDS, max_workers=self.max_workers, timeout=self.timeout,
+                              cache=get_feed_cache() if self.use_cache else None):
+            if res["error"]:
+                self.errors[res["url"]] = res["error"]
+            items = [it for it in (self._to_item(e, res["url"], since) for e in res["entries"]) if it]
+            metrics.incr("articles.fetched", len(items))
+            yield {"url": res["url"], "items": items, "error": res["error"],
+                   "elapsed": res["elapsed"], "cached": res["cached"]}
+
     def rank_items(self, items, topk=10):
         """키워드 매칭 + 최신성 기반 점수로 정렬"""
         seen = set()
         scored = []
+        matcher = get_matcher(KEYWORDS)
 
         for it in items:
             # 중복 제거 (제목 기준)
@@ -68,8 +107,8 @@ class NewsCrawlerAgent:
             seen.add(key)
 
             # 키워드 매칭 점수
-            txt = (it["title"] + " " + it["summary"]).lower()
-            kw_score = sum(1 for kw in KEYWORDS if kw.lower() in txt) * 1.0
+            txt = it["title"] + " " + it["summary"]
+            kw_score = len(matcher.counts(txt)) * 1.0
 
             # 최신성 가중치 (최근일수록 높음)
             hours_ago = (datetime.now(KST) - it["published"]).total_seconds() / 3600
@@ -88,6 +127,8 @@ if __name__ == "__main__":
     crawler = NewsCrawlerAgent()
     articles = crawler.collect_items()
     print(f"총 {len(articles)}개 기사 크롤링됨")
+    for url, err in crawler.errors.items():
+        print(f"[!] 피드 실패: {url} ({err})")
 
     ranked = crawler.rank_items(articles, topk=10)
     print("\n📌 상위 10개 기사:")
@@ -2,6 +2,9 @@ import hashlib
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from agents.news_crawler import NewsCrawlerAgent
+from agents.near_dup import dedupe, simhash, item_text, NearDupIndex, DEFAULT_THRESHOLD
+from agents.matcher import get_matcher
+from agents import metrics
 
 # 중요 키워드 (랭킹 점수 반영)
 KEYWORDS = [
@@ -12,36 +15,97 @@ KEYWORDS = [
 KST = ZoneInfo("Asia/Seoul")
 
 class NewsRankerAgent:
-    def __init__(self, topk=10):
+    def __init__(self, topk=10, near_dup_threshold=DEFAULT_THRESHOLD):
+        """
+        near_dup_threshold: SimHash 유사도(0~1) 이 값 이상이면 같은 기사로 묶음 (None이면 비활성)
+        """
         self.topk = topk
+        self.near_dup_threshold = near_dup_threshold
+        self.dup_drops = 0   # 마지막 랭킹에서 제거된 중복 기사 수
 
     def rank_items(self, items):
         """뉴스 기사 리스트를 받아서 점수 매기고 상위 topk 반환"""
-        seen = set()
-        scored = []
+        with metrics.span("rank", items=len(items)):
+            ranked = self._rank(items)
+        metrics.incr("rank.dup_drops", self.dup_drops)
+        return ranked
 
+    def _rank(self, items):
+        seen = set()
+        unique = []
         for it in items:
             # 중복 제거 (제목 해시 기준)
             key = hashlib.md5(it["title"].lower().encode()).hexdigest()
             if key in seen:
                 continue
             seen.add(key)
+            unique.append(it)
 
-            # 키워드 매칭 점수
-            txt = (it["title"] + " " + it["summary"]).lower()
-            kw_score = sum(1 for kw in KEYWORDS if kw.lower() in txt) * 1.0
+        # 유사 중복 제거 (제목만 조금 바뀐 재배포 기사 → 대표 1건 + alternates)
+        if self.near_dup_threshold is not None:
+            unique, _ = dedupe(unique, self.near_dup_threshold)
+        self.dup_drops = len(items) - len(unique)
 
-            # 최신성 가중치 (최근 기사일수록 점수 ↑)
-            hours_ago = (datetime.now(KST) - it["published"]).total_seconds() / 3600
-            recency = max(0, 24 - hours_ago) * 0.3
-
-            score = kw_score + recency
-            scored.append((score, it))
+        scored = [(self.score(it), it) for it in unique]
 
         # 점수순 정렬 후 상위 topk 반환
         scored.sort(key=lambda x: x[0], reverse=True)
         return scored[:self.topk]
 
+    def score(self, it):
+        # 키워드 매칭 점수
+        txt = it["title"] + " " + it["summary"]
+        kw_score = len(get_matcher(KEYWORDS).counts(txt)) * 1.0
+
+        # 최신성 가중치 (최근 기사일수록 점수 ↑)
+        hours_ago = (datetime.now(KST) - it["published"]).total_seconds() / 3600
+        recency = max(0, 24 - hours_ago) * 0.3
+
+        return kw_score + recency
+
+
+class IncrementalRanker:
+    """
+    기사가 피드 단위로 도착할 때마다 누적 랭킹 (스트리밍 파이프라인용)
+    - 중복/유사 중복은 먼저 도착한 기사를 대표로 유지하고 나머지는 alternates에 기록
+    - top()은 지금까지 도착한 기사 기준 상위 topk
+    """
+    def __init__(self, topk=10, near_dup_threshold=DEFAULT_THRESHOLD):
+        self.ranker = NewsRankerAgent(topk, near_dup_threshold)
+        self.topk = topk
+        self._seen = set()
+        self._index = NearDupIndex(near_dup_threshold) if near_dup_threshold is not None else None
+        self._scored = []   # [(score, item)] — _index 번호와 같은 순서
+        self.dup_drops = 0
+
+    def __len__(self):
+        return len(self._scored)
+
+    def add(self, items):
+        for it in items:
+            key = hashlib.md5(it["title"].lower().encode()).hexdigest()
+            if key in self._seen:
+                self.dup_drops += 1
+                metrics.incr("rank.dup_drops")
+                continue
+            self._seen.add(key)
+
+            if self._index is not None:
+                sig = simhash(item_text(it))
+                hit = self._index.find(sig)
+                if hit is not None:
+                    rep = self._scored[hit][1]
+                    rep.setdefault("alternates", []).append(
+                        {"title": it.get("title", ""), "link": it.get("link", ""), "source": it.get("source", "")})
+                    self.dup_drops += 1
+                    metrics.incr("rank.dup_drops")
+                    continue
+                self._index.add(sig)
+            self._scored.append((self.ranker.score(it), dict(it)))
+
+    def top(self):
+        return sorted(self._scored, key=lambda x: x[0], reverse=True)[:self.topk]
+
 
 # === 직접 실행 ===
 if __name__ == "__main__":
@@ -60,4 +124,6 @@ if __name__ == "__main__":
         print("시간:", art["published"])
         print("요약:", art['summary'][:120], "...")
         print("출처:", art["source"])
+        for alt in art.get("alternates", []):
+            print("  ↳ 유사 기사:", alt["title"], f"({alt['source']})")
         
\ No newline at end of file
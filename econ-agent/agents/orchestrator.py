@@ -1,71 +1,353 @@
+import os
+import time
+import queue
+import threading
 from agents.news_crawler import NewsCrawlerAgent
 from agents.blog_crawler import BlogCrawlerAgent
-from agents.news_ranker import NewsRankerAgent
+from agents.news_ranker import NewsRankerAgent, IncrementalRanker
 from agents.news_analyst import NewsAnalystAgent
 from agents.portfolio_agent import PortfolioAgent
 from agents.signal_agent import SignalAgent   # 👈 추가
 from agents.econ_reporter import EconReporterAgent
+from agents.article_store import ArticleStore, article_key
+from agents.stage_graph import StageGraph, critical_path
+from agents import metrics
 
 class OrchestratorAgent:
-    def __init__(self, tickers=None, topk=6, horizon_hours=18, horizon_days=3):
+    def __init__(self, tickers=None, topk=6, horizon_hours=18, horizon_days=3, store=None, use_store=True):
         self.tickers = tickers or []
         self.topk = topk
         self.horizon_hours = horizon_hours
         self.horizon_days = horizon_days
+        # 실행 간 기사/분석 결과 보관 (같은 기사를 두 번 분석하지 않도록)
+        self.store = store or (ArticleStore() if use_store else None)
+        self.feed_errors = {}   # 마지막 수집에서 실패한 피드 {url: 사유}
 
-    def _collect(self, source: str):
-        if source == "news":
-            return NewsCrawlerAgent(self.horizon_hours).collect_items()
-        elif source == "blog":
-            return BlogCrawlerAgent(self.horizon_days).collect_items()
-        elif source == "both":
-            n = NewsCrawlerAgent(self.horizon_hours).collect_items()
-            b = BlogCrawlerAgent(self.horizon_days).collect_items()
-            return n + b
-        else:
+    def _crawlers(self, source: str):
+        if source not in ("news", "blog", "both"):
             raise ValueError("source must be 'news', 'blog' or 'both'")
 
-    def run(self, source="news"):
-        # 1) 수집
-        articles = self._collect(source)
+        crawlers = []
+        if source in ("news", "both"):
+            crawlers.append(NewsCrawlerAgent(self.horizon_hours))
+        if source in ("blog", "both"):
+            crawlers.append(BlogCrawlerAgent(self.horizon_days))
+        return crawlers
+
+    def _collect(self, source: str):
+        crawlers = self._crawlers(source)
 
-        # 2) 랭킹
-        ranked = NewsRankerAgent(self.topk).rank_items(articles)
+        # 뉴스/블로그 소스를 동시에 수집 (각 크롤러 내부도 피드별 동시 수집)
+        with metrics.ContextThreadPoolExecutor(max_workers=len(crawlers)) as ex:
+            batches = list(ex.map(lambda c: c.collect_items(), crawlers))
 
-        # 3) 분석 (+RAG)
-        analyst = NewsAnalystAgent()
-        analyzed = [{"article": a, "analysis": analyst.analyze(a)} for _, a in ranked]
+        self.feed_errors = {}
+        for c in crawlers:
+            self.feed_errors.update(c.errors)
+        return [it for batch in batches for it in batch]
 
-        # 4) 포트폴리오
-        prices = PortfolioAgent(self.tickers).get_prices() if self.tickers else {}
+    def _analyze(self, ranked):
+        """상위 기사 분석 — 저장소에 분석 결과가 있으면 재사용, 나머지는 동시 분석"""
+        arts = [a for _, a in ranked]
+        cached = self.store.get_analyses(arts) if self.store else {}
+        todo = [a for a in arts if article_key(a) not in cached]
+        fresh = dict(zip(map(article_key, todo), NewsAnalystAgent().analyze_many(todo)))
+        for art in todo:
+            analysis = fresh[article_key(art)]
+            # 키워드가 없는 결과는 LLM 비활성/실패 폴백이므로 저장하지 않음
+            if self.store and analysis.get("keywords"):
+                self.store.save_analysis(art, analysis)
+        analyzed = [{"article": a, "analysis": cached.get(article_key(a)) or fresh[article_key(a)]}
+                    for a in arts]
+        return analyzed, len(arts) - len(todo)
 
-        # 5) 시그널 (언급 빈도 + 시세 변동)
-        signals = []
-        if self.tickers:
-            sig = SignalAgent(self.tickers)
-            signals = sig.rank_signals(analyzed, prices)
+    def _prices(self):
+        return PortfolioAgent(self.tickers).get_prices() if self.tickers else {}
 
-        # 6) 리포트 작성
-        reporter = EconReporterAgent()
-        md = reporter.build_report(analyzed)
+    def _signals(self, analyzed, prices):
+        """시그널 (언급 빈도 + 시세 변동)"""
+        if not self.tickers:
+            return []
+        return SignalAgent(self.tickers).rank_signals(analyzed, prices)
+
+    def _save_report(self, md, signals):
+        """리포트 본문에 시그널 섹션을 붙여 저장 → (markdown, 경로)"""
         if signals:
             md += "\n\n---\n\n## 🚀 오늘의 주목 종목\n"
             for s in signals[:5]:
                 md += f"- **{s['ticker']}**: score={s['score']} / 언급 {s['mentions']}회 / 변화율 {s['change']}%\n"
-        path = reporter.save_report(md)
+        return md, EconReporterAgent().save_report(md)
+
+    def stage_graph(self, source="news", only_new=False, report=True):
+        """
+        run()의 단계 의존 그래프
+          collect → rank → analyze ─┬→ report (본문)
+          prices ───────────────────┴→ signals
+        - prices는 수집/분석과 무관하므로 처음부터 동시에 실행
+        - 리포트 본문(LLM)은 시그널을 기다리지 않음 (시그널 섹션은 저장 직전에 붙임)
+        - report=False: collect → rank → analyze만 (crawl()용)
+        """
+        def collect():
+            articles = self._collect(source)
+            return articles, (self.store.add_articles(articles) if self.store else articles)
+
+        def rank(collect):
+            articles, new_articles = collect
+            ranked = NewsRankerAgent(self.topk).rank_items(new_articles if only_new else articles)
+            if self.store:
+                self.store.update_scores(ranked)
+            return ranked
+
+        graph = StageGraph()
+        graph.add("collect", collect)
+        graph.add("rank", rank, deps=("collect",))
+        graph.add("analyze", lambda rank: self._analyze(rank), deps=("rank",))
+        if report:
+            graph.add("prices", self._prices)
+            graph.add("signals", lambda analyze, prices: self._signals(analyze[0], prices),
+                      deps=("analyze", "prices"))
+            graph.add("report", lambda analyze: EconReporterAgent().build_report(analyze[0]), deps=("analyze",))
+        return graph
+
+    def crawl(self, source="news", only_new=True):
+        """
+        리포트 없이 수집 → 랭킹 → 분석만 실행 (상주 스케줄러의 크롤링 주기용)
+        - 분석 결과는 저장소에 보관되어 다음 run()에서 재사용
+        - 트레이스는 오늘 리포트 옆 out/<날짜>.crawl.trace.json (주기마다 덮어씀)
+        출력: run()과 같은 키 중 수집/랭킹/분석 관련 항목 + timings/trace_path
+        """
+        graph = self.stage_graph(source, only_new, report=False)
+        recorder = metrics.start_run()
+        start = time.perf_counter()
+        out, timings = graph.run()
+        articles, new_articles = out["collect"]
+        analyzed, reused = out["analyze"]
+        wall = round(time.perf_counter() - start, 3)
+        base = os.path.splitext(EconReporterAgent().report_path())[0] + ".crawl"
+        trace_path = recorder.export(base, mode="crawl", source=source, only_new=only_new, stages=timings)
+        return {
+            "source": source,
+            "articles": articles,
+            "feed_errors": self.feed_errors,
+            "new_articles": len(new_articles),
+            "reused_analyses": reused,
+            "ranked": out["rank"],
+            "analyzed": analyzed,
+            "timings": timings,
+            "wall_seconds": wall,
+            "trace_path": trace_path,
+        }
+
+    def run(self, source="news", only_new=False, stream=False):
+        """
+        only_new=True: 지난 실행 이후 처음 본 기사만 랭킹/분석 대상으로 사용
+        stream=True: run_stream 파이프라인으로 실행하고 최종 결과만 반환
+        """
+        if stream:
+            for ev in self.run_stream(source, only_new):
+                if ev["stage"] == "done":
+                    return ev["item"]
+
+        # 수집 → 랭킹 → 분석(+RAG) → 리포트, 시세/시그널은 의존 관계에 따라 동시 실행
+        # 실패 시 남은 단계는 취소되고 StageFailed(.stage, .timings) 발생
+        graph = self.stage_graph(source, only_new)
+        recorder = metrics.start_run()   # 이번 실행의 span/카운터를 새로 모음
+        start = time.perf_counter()
+        out, timings = graph.run()
+        articles, new_articles = out["collect"]
+        ranked = out["rank"]
+        analyzed, reused = out["analyze"]
+        prices, signals = out["prices"], out["signals"]
+        md, path = self._save_report(out["report"], signals)
+        path_names, path_seconds = critical_path(graph, timings)
+        wall = round(time.perf_counter() - start, 3)
+        # 리포트 옆에 실행 트레이스 저장 (out/<날짜>.trace.json, METRICS_PROM=1이면 .prom도)
+        trace_path = recorder.export(os.path.splitext(path)[0], mode="batch", source=source,
+                                     stages=timings, critical_path=path_names,
+                                     critical_path_seconds=path_seconds, report_path=path)
 
         return {
             "source": source,
             "articles": articles,
+            "feed_errors": self.feed_errors,
+            "new_articles": len(new_articles),
+            "reused_analyses": reused,
             "ranked": ranked,
             "analyzed": analyzed,
             "portfolio_prices": prices,
             "signals": signals,
             "report_md": md,
             "report_path": path,
+            "timings": timings,
+            "critical_path": path_names,
+            "critical_path_seconds": path_seconds,
+            "wall_seconds": wall,
+            "trace_path": trace_path,
         }
 
 
+    def run_stream(self, source="news", only_new=False):
+        """
+        스트리밍 파이프라인: 피드가 도착하는 대로 누적 랭킹하고, 현재 상위 topk에 든 기사는
+        느린 피드를 기다리지 않고 바로 분석을 시작
+        - 나중에 도착한 기사에 밀려난 기사의 분석은 버려지지만 저장소에는 남아 다음 실행에서 재사용
+        - 모든 피드가 끝난 뒤의 최종 상위 topk만 리포트/시그널에 사용
+        출력(generator): 진행 이벤트 {"stage","item","elapsed"} (elapsed = 실행 시작 후 초)
+          - "collect": {"url","count","error","cached"}  피드 하나 수집 완료
+          - "rank":    {"candidates","top"}              누적 랭킹 갱신 (top = 현재 상위 제목)
+          - "analyze": {"article","analysis","reused"}   기사 하나 분석 완료 (현재 상위 기사만)
+          - "prices" / "signals" / "report": 각 단계 결과
+          - "done":    run()과 같은 형태의 최종 결과 (+ "speculative_dropped")
+        """
+        recorder = metrics.start_run()
+        start = time.perf_counter()
+        # 시세 조회는 뉴스와 무관하므로 처음부터 따로 실행
+        price_pool = metrics.ContextThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-prices")
+        prices_future = price_pool.submit(self._prices)
+        analyst = NewsAnalystAgent()
+        ex = metrics.ContextThreadPoolExecutor(max_workers=analyst.max_workers, thread_name_prefix="stream-analyst")
+        try:
+            def event(stage, item=None):
+                return {"stage": stage, "item": item, "elapsed": round(time.perf_counter() - start, 3)}
+
+            crawlers = self._crawlers(source)
+            ranker = IncrementalRanker(self.topk)
+            events = queue.Queue()   # 피드 결과와 분석 완료를 한 줄로 받음
+
+            def feed(crawler):
+                try:
+                    for res in crawler.iter_items():
+                        events.put(("collect", res))
+                except Exception as e:
+                    events.put(("collect", {"url": type(crawler).__name__, "items": [],
+                                            "error": f"{type(e).__name__}: {e}", "cached": False}))
+                finally:
+                    events.put(("crawler_done", crawler))
+
+            def analyze(art):
+                analysis = analyst.analyze(art)
+                # 키워드가 없는 결과는 LLM 비활성/실패 폴백이므로 저장하지 않음
+                if self.store and analysis.get("keywords"):
+                    self.store.save_analysis(art, analysis)
+                return analysis
+
+            articles, new_count = [], 0
+            self.feed_errors = {}
+            futures, done = {}, {}   # 기사 키 → Future / 분석 결과
+            from_store = set()       # 저장소에서 재사용한 분석의 기사 키
+
+            def schedule(top):
+                todo = [a for _, a in top if article_key(a) not in futures and article_key(a) not in done]
+                cached = self.store.get_analyses(todo) if self.store and todo else {}
+                for art in todo:
+                    key = article_key(art)
+                    if cached.get(key):
+                        done[key] = cached[key]
+                        from_store.add(key)
+                        events.put(("analyzed", (art, cached[key], True)))
+                        continue
+                    fut = ex.submit(analyze, art)
+                    futures[key] = fut
+                    fut.add_done_callback(lambda f, art=art: events.put(("analyzed", (art, f, False))))
+
+            def analyzed_event(payload, top_keys):
+                art, res, was_reused = payload
+                key = article_key(art)
+                if not was_reused:
+                    futures.pop(key, None)
+                    if res.cancelled():
+                        return None
+                    try:
+                        res = res.result()
+                    except Exception as e:
+                        res = analyst._fallback(art, f"분석 실패: {e}")
+                    done[key] = res
+                if key not in top_keys:
+                    return None   # 그새 상위권에서 밀려난 기사
+                return event("analyze", {"article": art, "analysis": res, "reused": was_reused})
+
+            # 크롤러 스레드도 이번 실행의 Recorder에 기록하도록 컨텍스트를 넘김
+            threads = [threading.Thread(target=metrics.run_in_context(feed), args=(c,), daemon=True)
+                       for c in crawlers]
+            for t in threads:
+                t.start()
+
+            crawling, top = len(threads), []
+            # 저장소 재사용 결과는 futures 없이 events에만 들어가므로 큐가 빌 때까지 계속 꺼냄
+            while crawling or futures or not events.empty():
+                kind, payload = events.get()
+                if kind == "crawler_done":
+                    crawling -= 1
+                    if crawling == 0:
+                        # 모든 피드 도착 → 최종 랭킹, 밀려난 기사 중 아직 시작 안 한 분석은 취소
+                        top = ranker.top()
+                        top_keys = {article_key(a) for _, a in top}
+                        for key, fut in list(futures.items()):
+                            if key not in top_keys and fut.cancel():
+                                futures.pop(key)
+                        schedule(top)
+                    continue
+                if kind == "collect":
+                    items = payload["items"]
+                    if payload["error"]:
+                        self.feed_errors[payload["url"]] = payload["error"]
+                    articles.extend(items)
+                    fresh = self.store.add_articles(items) if self.store else items
+                    new_count += len(fresh)
+                    ranker.add(fresh if only_new else items)
+                    top = ranker.top()
+                    yield event("collect", {"url": payload["url"], "count": len(items),
+                                            "error": payload["error"], "cached": payload.get("cached", False)})
+                    yield event("rank", {"candidates": len(ranker), "top": [a["title"] for _, a in top]})
+                    schedule(top)
+                    continue
+                ev = analyzed_event(payload, {article_key(a) for _, a in top})
+                if ev:
+                    yield ev
+
+            for t in threads:
+                t.join()
+
+            ranked = top
+            if self.store:
+                self.store.update_scores(ranked)
+            analyzed = [{"article": a, "analysis": done[article_key(a)]} for _, a in ranked]
+            reused = sum(1 for _, a in ranked if article_key(a) in from_store)
+            dropped = len(done) - len(analyzed)
+
+            prices = prices_future.result()
+            yield event("prices", prices)
+            signals = self._signals(analyzed, prices)
+            yield event("signals", signals)
+            md, path = self._save_report(EconReporterAgent().build_report(analyzed), signals)
+            yield event("report", path)
+            first = min((s["start"] for s in recorder.spans if s["name"] == "analyze.article"), default=None)
+            trace_path = recorder.export(os.path.splitext(path)[0], mode="stream", source=source,
+                                         report_path=path, first_analysis_started=first,
+                                         speculative_dropped=dropped)
+
+            yield event("done", {
+                "source": source,
+                "articles": articles,
+                "feed_errors": self.feed_errors,
+                "new_articles": new_count,
+                "reused_analyses": reused,
+                "speculative_dropped": dropped,
+                "ranked": ranked,
+                "analyzed": analyzed,
+                "portfolio_prices": prices,
+                "signals": signals,
+                "report_md": md,
+                "report_path": path,
+                "trace_path": trace_path,
+            })
+        finally:
+            # 소비자가 중간에 멈추거나(Streamlit rerun 등) 예외가 나도 풀을 정리
+            # 진행 중인 분석을 기다리지 않고, 아직 시작 안 한 분석/시세 조회는 취소
+            price_pool.shutdown(wait=False, cancel_futures=True)
+            ex.shutdown(wait=False, cancel_futures=True)
+
+
 if __name__ == "__main__":
     orch = OrchestratorAgent(
         tickers=["AAPL","TSLA","005930.KS"],
@@ -74,4 +356,10 @@ if __name__ == "__main__":
     )
     res = orch.run(source="both")
     print("리포트 생성 완료:", res["report_path"])
+    print(f"새 기사 {res['new_articles']}개 / 저장된 분석 재사용 {res['reused_analyses']}건")
+    for name, t in res["timings"].items():
+        print(f"  - {name:8s} {t['start']:6.2f}s → {t['end']:6.2f}s ({t['seconds']:.2f}s)")
+    print(f"전체 {res['wall_seconds']}s / 임계 경로 {' → '.join(res['critical_path'])} {res['critical_path_seconds']}s")
+    for url, err in res["feed_errors"].items():
+        print(f"[!] 피드 실패: {url} ({err})")
     print("\n미리보기:\n", res["report_md"][:500])
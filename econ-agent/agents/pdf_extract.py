@@ -0,0 +1,20 @@
+# agents/pdf_extract.py
+# 프로세스 풀 워커용 PDF 텍스트 추출 (가벼운 모듈: 임베딩 모델/Chroma를 import하지 않음)
+import fitz  # PyMuPDF
+
+
+def page_count(path: str) -> int:
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def extract_pages(path: str, start: int, end: int):
+    """
+    [start, end) 페이지 텍스트 추출
+    출력: (페이지별 텍스트 리스트, 오류 메시지 또는 None)
+    """
+    try:
+        with fitz.open(path) as doc:
+            return [doc[i].get_text("text") for i in range(start, min(end, doc.page_count))], None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
@@ -1,83 +1,634 @@
 import os
-import chromadb
-from chromadb.utils import embedding_functions
-import fitz  # PyMuPDF
-from tqdm import tqdm
+import json
+import time
+import queue
+import hashlib
+import threading
+import unicodedata
+from itertools import groupby
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from agents import metrics
+from agents.bm25_index import BM25Index, rrf
+# chromadb / sentence-transformers / PyMuPDF는 무거워서 실제로 필요할 때 import
 
 # 벡터DB 저장 경로
 DB_DIR = "data/chroma"
 
-embedding_func = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2"
-)
+# 인덱싱 파이프라인 설정 (환경변수로 조정 가능)
+INGEST_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))   # 텍스트 추출 프로세스 수
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "32"))               # 작업 하나당 페이지 수
+EMBED_BATCH = int(os.getenv("PDF_EMBED_BATCH", "64"))                     # 임베딩 배치 크기 (chunk 수)
+WRITE_QUEUE = 4                                                           # 임베딩 → 쓰기 대기 배치 수
 
-client = chromadb.PersistentClient(path=DB_DIR)
-collection = client.get_or_create_collection(
-    "pdf_knowledge",
-    embedding_function=embedding_func
-)
+# 인덱싱 매니페스트 (파일별 내용 해시/chunk 수) — 바뀐 파일만 다시 인덱싱
+MANIFEST_PATH = os.path.join(DB_DIR, "ingest_manifest.json")
+
+# 어휘(BM25) 색인 — 인덱싱 때 Chroma와 같이 갱신
+BM25_PATH = os.path.join(DB_DIR, "bm25_index.json")
+
+# 검색 방식 (환경변수로 조정 가능)
+# vector: 임베딩 검색 / lexical: BM25만 / hybrid: 둘을 RRF로 합침
+# auto: 짧은 키워드(RAG_LEXICAL_MAX_WORDS 단어 이하)는 lexical (결과 없으면 vector), 나머지는 hybrid
+RAG_MODE = os.getenv("RAG_MODE", "auto")
+RAG_MODES = ("auto", "vector", "lexical", "hybrid")
+LEXICAL_MAX_WORDS = int(os.getenv("RAG_LEXICAL_MAX_WORDS", "2"))
+HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))   # hybrid에서 방식별로 가져올 후보 수
+
+# 검색 캐시 크기 (환경변수로 조정 가능, 0이면 끔)
+QUERY_EMBED_CACHE = int(os.getenv("RAG_EMBED_CACHE", "1024"))     # 정규화된 검색어 → 임베딩 (메모리 LRU)
+QUERY_RESULT_CACHE = int(os.getenv("RAG_RESULT_CACHE", "2048"))   # (검색어, n_results, 컬렉션 버전) → 결과
+
+EMBED_MODEL = "all-MiniLM-L6-v2"
+COLLECTION_NAME = "pdf_knowledge"
+
+# 프로세스 공용 싱글톤 (첫 검색/인덱싱 때 생성)
+_init_lock = threading.RLock()
+_embedding_func = None
+_client = None
+_collection = None
+_bm25 = {"index": None, "mtime": None}
+
+
+def local_embedding_function(model_name=EMBED_MODEL):
+    """프로세스 안에서 SentenceTransformer 모델을 로드하는 임베딩 함수"""
+    from chromadb.utils import embedding_functions
+    return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+
+
+class _LazyEmbeddingFunction:
+    """
+    임베딩 함수를 첫 임베딩 호출 때 결정 (collection.count() 등은 모델 없이 동작)
+    - 공용 임베딩 서버(agents.embed_server)가 떠 있으면 서버 사용
+    - 없거나 도중에 실패하면 프로세스 안에서 모델 로드
+    - 서버를 못 쓰는 동안에도 EMBED_SERVER_RECHECK초마다 다시 확인 (앱보다 서버가 늦게 떠도 전환)
+    """
+    def __init__(self, model_name=EMBED_MODEL):
+        self.model_name = model_name
+        self._fn = None
+        self._remote = None       # 사용 중인 EmbeddingClient (없으면 None)
+        self._checked_at = None   # 마지막 서버 확인 시각 (monotonic)
+
+    def _load(self):
+        with _init_lock:
+            if self._fn is None:
+                self._fn = local_embedding_function(self.model_name)
+        return self._fn
+
+    def _server(self):
+        from agents.embed_server import EMBED_SERVER, EMBED_SERVER_RECHECK, EmbeddingClient
+        if EMBED_SERVER == "0":
+            return None
+        with _init_lock:
+            now = time.monotonic()
+            if self._remote is None and (self._checked_at is None
+                                         or now - self._checked_at >= EMBED_SERVER_RECHECK):
+                self._checked_at = now
+                client = EmbeddingClient(model_name=self.model_name)
+                if client.available():
+                    self._remote = client
+        return self._remote
+
+    def state(self):
+        """현재 임베딩 경로 {"mode": "server" | "local" | "idle", "url", "checked_at"(초 전)}"""
+        from agents.embed_server import EMBED_SERVER_URL
+        remote = self._remote
+        mode = "server" if remote is not None else ("local" if self._fn is not None else "idle")
+        ago = round(time.monotonic() - self._checked_at, 1) if self._checked_at is not None else None
+        return {"mode": mode, "url": remote.url if remote is not None else EMBED_SERVER_URL, "checked_at": ago}
+
+    def __call__(self, input):
+        remote = self._server()
+        if remote is not None:
+            try:
+                return remote(input)
+            except Exception as e:
+                print(f"[!] 임베딩 서버 실패 → 프로세스 안에서 임베딩 ({type(e).__name__}: {e})")
+                metrics.incr("rag.embed_server_fallbacks")
+                with _init_lock:
+                    self._remote = None
+                    self._checked_at = time.monotonic()   # 쿨다운 후 다시 확인
+        return self._load()(input)
+
+
+def get_embedding_function():
+    global _embedding_func
+    with _init_lock:
+        if _embedding_func is None:
+            _embedding_func = _LazyEmbeddingFunction()
+        return _embedding_func
+
+
+def get_client():
+    global _client
+    with _init_lock:
+        if _client is None:
+            import chromadb
+            _client = chromadb.PersistentClient(path=DB_DIR)
+        return _client
+
+
+def get_collection():
+    global _collection
+    with _init_lock:
+        if _collection is None:
+            _collection = get_client().get_or_create_collection(
+                COLLECTION_NAME,
+                embedding_function=get_embedding_function()
+            )
+        return _collection
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_bm25_index(path=BM25_PATH):
+    """BM25 색인 싱글톤 (파일이 바뀌면 다시 읽음 → 다른 프로세스의 인덱싱도 반영)"""
+    with _init_lock:
+        mtime = _mtime(path)
+        if _bm25["index"] is None or mtime != _bm25["mtime"]:
+            _bm25.update(index=BM25Index.load(path), mtime=mtime)
+        return _bm25["index"]
+
+
+def _save_bm25_index(index, path=BM25_PATH):
+    with _init_lock:
+        index.save(path)
+        _bm25.update(index=index, mtime=_mtime(path))
+
+
+def _reset_bm25_index():
+    """메모리 색인을 버림 → 다음 get_bm25_index()에서 디스크 상태로 다시 읽음"""
+    with _init_lock:
+        _bm25.update(index=None, mtime=None)
+
+
+def _rebuild_bm25_index(index):
+    """BM25 색인이 없거나 매니페스트와 어긋날 때: Chroma에 저장된 chunk로 색인을 채움"""
+    data = get_collection().get(include=["documents", "metadatas"])
+    by_source = {}
+    for doc_id, doc, meta in zip(data.get("ids", []), data.get("documents") or [], data.get("metadatas") or []):
+        by_source.setdefault((meta or {}).get("source", ""), []).append((doc_id, doc or ""))
+    for source, rows in by_source.items():
+        index.add([r[0] for r in rows], [r[1] for r in rows], source)
+    return sum(len(rows) for rows in by_source.values())
+
+
+def __getattr__(name):
+    """예전 코드 호환: pdf_rag.collection / client / embedding_func 접근 시 지연 생성"""
+    if name == "collection":
+        return get_collection()
+    if name == "client":
+        return get_client()
+    if name == "embedding_func":
+        return get_embedding_function()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LRU:
+    """스레드 안전 LRU (적중률 집계 포함)"""
+    _MISS = object()
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """없으면 _LRU._MISS"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return self._MISS
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                    "entries": len(self._data), "maxsize": self.maxsize}
+
+
+_embed_cache = _LRU(QUERY_EMBED_CACHE)
+_result_cache = _LRU(QUERY_RESULT_CACHE)
+_version = {"mtime": None, "version": 0}
+
+
+def normalize_query(text):
+    """캐시 키용 검색어 정규화 (NFKC, 소문자, 공백 정리) — 임베딩 모델도 대소문자 구분 없음"""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+def collection_version(path=MANIFEST_PATH):
+    """
+    인덱싱 매니페스트의 version (ingest_pdfs가 컬렉션을 바꿀 때마다 +1)
+    - 매니페스트 수정시각이 같으면 다시 읽지 않음 → 다른 프로세스의 인덱싱도 반영
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+    if mtime != _version["mtime"]:
+        _version.update(mtime=mtime, version=load_manifest(path).get("version", 0))
+    return _version["version"]
+
+
+def embed_queries(texts):
+    """
+    정규화된 검색어 리스트 → 임베딩 리스트 (캐시에 없는 검색어만 한 번에 배치 임베딩)
+    """
+    out = [_embed_cache.get(t) for t in texts]
+    missing = list(dict.fromkeys(t for t, e in zip(texts, out) if e is _LRU._MISS))
+    metrics.incr("rag.embed_cache_hits", len(texts) - sum(e is _LRU._MISS for e in out))
+    metrics.incr("rag.embed_cache_misses", len(missing))
+    if missing:
+        with metrics.span("rag.embed", queries=len(missing)):
+            fresh = dict(zip(missing, get_embedding_function()(missing)))
+        for t, e in fresh.items():
+            _embed_cache.put(t, e)
+        out = [fresh[t] if e is _LRU._MISS else e for t, e in zip(texts, out)]
+    return out
+
+
+def query_cache_stats():
+    """검색 캐시 적중률 {"embeddings": {...}, "results": {...}, "version": 컬렉션 버전}"""
+    return {"embeddings": _embed_cache.stats(), "results": _result_cache.stats(), "version": collection_version()}
+
+
+def clear_query_cache():
+    _embed_cache.clear()
+    _result_cache.clear()
 
 
 def extract_text_from_pdf(path: str) -> str:
-    """PyMuPDF 기반 PDF 텍스트 추출 (진행률 표시)"""
-    doc = fitz.open(path)
-    text = ""
-    for page in tqdm(doc, desc=f"읽는 중: {os.path.basename(path)}", unit="page"):
-        text += page.get_text("text") + "\n"
-    return text
+    """PyMuPDF 기반 PDF 텍스트 추출"""
+    from agents.pdf_extract import page_count, extract_pages
+    pages, err = extract_pages(path, 0, page_count(path))
+    if err:
+        raise RuntimeError(err)
+    return "\n".join(pages)
+
+
+def iter_chunks(texts, max_len: int = 800):
+    """텍스트(페이지) 스트림을 일정 길이 chunk로 쪼개며 바로 내보내는 제너레이터"""
+    current, length = [], 0
+    for text in texts:
+        for word in text.split():
+            current.append(word)
+            length += len(word) + 1
+            if length >= max_len:
+                yield " ".join(current)
+                current, length = [], 0
+    if current:
+        yield " ".join(current)
 
 
 def chunk_text(text: str, max_len: int = 800):
     """텍스트를 일정 길이 단위로 쪼개기"""
-    chunks, current, length = [], [], 0
-    for word in text.split():
-        current.append(word)
-        length += len(word) + 1
-        if length >= max_len:
-            chunks.append(" ".join(current))
-            current, length = [], 0
-    if current:
-        chunks.append(" ".join(current))
-    return chunks
+    return list(iter_chunks([text], max_len))
+
+
+def _batched(iterable, size):
+    batch = []
+    for x in iterable:
+        batch.append(x)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ordered_results(executor, tasks, window):
+    """
+    작업을 최대 window개까지만 미리 제출하고 제출 순서대로 결과를 내보냄
+    (executor.map은 전부 한꺼번에 제출해서 결과가 메모리에 쌓임)
+    """
+    from agents.pdf_extract import extract_pages
+    pending = deque()
+    it = iter(tasks)
+    for task in it:
+        pending.append((task, executor.submit(extract_pages, task[1], task[2], task[3])))
+        if len(pending) >= window:
+            break
+    while pending:
+        task, fut = pending.popleft()
+        nxt = next(it, None)
+        if nxt is not None:
+            pending.append((nxt, executor.submit(extract_pages, nxt[1], nxt[2], nxt[3])))
+        yield task, fut.result()
 
 
-def ingest_pdfs(pdf_dir="data/pdfs"):
-    """PDF 폴더 안의 모든 파일을 읽어서 VectorDB에 저장"""
+def _writer(q, errors):
+    """
+    Chroma 쓰기 전용 스레드 (다음 배치 임베딩과 겹쳐서 진행)
+    q 항목: ("upsert", kwargs) / ("delete", kwargs) / None(종료)
+    """
+    collection = get_collection()
+    while True:
+        item = q.get()
+        if item is None:
+            return
+        op, kwargs = item
+        try:
+            if op == "upsert":
+                collection.upsert(**kwargs)
+            else:
+                collection.delete(**kwargs)
+        except Exception as e:
+            errors.append(e)
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {"version": 0, "files": {}}
+
+
+def _save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _stale_ids(fname, n_chunks, entry):
+    """새 chunk 수보다 뒤에 남아 있는 예전 chunk id"""
+    if entry is not None:
+        return [f"{fname}_{i}" for i in range(n_chunks, entry.get("chunks", 0))]
+    # 매니페스트 이전에 인덱싱된 파일: 저장된 id를 직접 확인
+    keep = {f"{fname}_{i}" for i in range(n_chunks)}
+    existing = get_collection().get(where={"source": fname}, include=[]).get("ids", [])
+    return [i for i in existing if i not in keep]
+
+
+def ingest_pdfs(pdf_dir="data/pdfs", workers=None, force=False):
+    """
+    PDF 폴더 안의 모든 파일을 읽어서 VectorDB에 저장 (증분 + 스트리밍 파이프라인)
+    - 매니페스트의 내용 해시가 같은 파일은 건너뜀 (크기/수정시각이 같으면 해시 계산도 생략)
+    - 바뀐 파일은 chunk를 upsert하고 줄어든 만큼 예전 뒤쪽 chunk 삭제
+    - 폴더에서 사라진 파일은 chunk 전체 삭제
+    - 파일/페이지 구간 단위 텍스트 추출을 프로세스 풀로 병렬 처리
+    - 페이지 → chunk 제너레이터 → 고정 크기 임베딩 배치 → 쓰기 스레드
+      (메모리에는 최대 window개 페이지 구간 + WRITE_QUEUE개 배치만 존재)
+    force=True: 매니페스트를 무시하고 전부 다시 인덱싱
+    출력: 처리량 통계 {"files","skipped","removed","pages","chunks","seconds","pages_per_s","chunks_per_s"}
+    """
     if not os.path.exists(pdf_dir):
         print(f"[!] {pdf_dir} 폴더가 없습니다. 먼저 폴더를 만들어주세요.")
         return
 
-    for fname in os.listdir(pdf_dir):
-        if not fname.endswith(".pdf"):
-            continue
+    from agents.pdf_extract import page_count
 
-        path = os.path.join(pdf_dir, fname)
-        print(f"\n[+] {fname} 텍스트 추출 시작...")
+    start = time.perf_counter()
+    workers = max(1, workers or INGEST_WORKERS)
+    embedding_func = get_embedding_function()
+    stats = {"files": 0, "skipped": 0, "removed": 0, "pages": 0, "chunks": 0}
+    manifest = load_manifest()
+    entries = manifest["files"]
+    changed = False
 
-        full_text = extract_text_from_pdf(path)
-        chunks = chunk_text(full_text)
+    # BM25 색인 점검은 upsert 전에: 색인 파일이 없거나 색인된 파일 목록이 매니페스트와 다르면
+    # Chroma의 기존 chunk로 다시 만듦 (이번에 바뀐 파일만 색인되고 예전 파일이 빠지는 일 방지)
+    bm25_missing = not os.path.exists(BM25_PATH)
+    bm25 = get_bm25_index()
+    indexed = {f for f, e in entries.items() if e.get("chunks", 0) > 0}
+    if bm25_missing or bm25.sources() != indexed:
+        bm25 = BM25Index(BM25_PATH)
+        print(f"[+] BM25 색인 재생성: 기존 chunk {_rebuild_bm25_index(bm25)}개")
+        changed = True
 
-        if chunks:
-            collection.add(
-                documents=chunks,
-                metadatas=[{"source": fname}] * len(chunks),
-                ids=[f"{fname}_{i}" for i in range(len(chunks))]
-            )
-            print(f"[+] {fname} → {len(chunks)} chunks 저장 완료")
+    q = queue.Queue(maxsize=WRITE_QUEUE)
+    write_errors = []
+    writer = threading.Thread(target=_writer, args=(q, write_errors), daemon=True)
+    writer.start()
+
+    # 폴더에서 사라진 파일 → chunk 삭제
+    on_disk = {f for f in os.listdir(pdf_dir) if f.endswith(".pdf")}
+    for fname in [f for f in entries if f not in on_disk]:
+        q.put(("delete", {"where": {"source": fname}}))
+        bm25.remove_source(fname)
+        del entries[fname]
+        stats["removed"] += 1
+        changed = True
+        print(f"[-] {fname} → 삭제된 파일, chunk 제거")
+
+    # (파일명, 경로, 시작 페이지, 끝 페이지) 작업 목록 — 바뀐 파일만
+    tasks, pending = [], {}
+    for fname in sorted(on_disk):
+        path = os.path.join(pdf_dir, fname)
+        st_ = os.stat(path)
+        entry = entries.get(fname)
+        if entry and not force:
+            if entry.get("size") == st_.st_size and entry.get("mtime") == st_.st_mtime:
+                stats["skipped"] += 1
+                continue
+            digest = _file_sha256(path)
+            if entry.get("sha256") == digest:
+                entry["mtime"] = st_.st_mtime   # 내용은 같고 수정시각만 바뀜
+                stats["skipped"] += 1
+                continue
         else:
-            print(f"[!] {fname} → 텍스트 추출 실패 (스캔본일 가능성)")
+            digest = _file_sha256(path)
+        try:
+            n_pages = page_count(path)
+        except Exception as e:
+            print(f"[!] {fname} → 열기 실패 ({e})")
+            continue
+        stats["files"] += 1
+        pending[fname] = {"sha256": digest, "size": st_.st_size, "mtime": st_.st_mtime}
+        for p in range(0, max(n_pages, 1), PAGES_PER_TASK):
+            tasks.append((fname, path, p, p + PAGES_PER_TASK))
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = _ordered_results(ex, tasks, window=workers * 2)
+            for fname, group in groupby(results, key=lambda r: r[0][0]):
+                failed = []
+
+                def pages():
+                    for _, (texts, err) in group:
+                        if err:
+                            failed.append(err)
+                            continue
+                        stats["pages"] += len(texts)
+                        yield from texts
+
+                n_chunks = 0
+                for batch in _batched(iter_chunks(pages()), EMBED_BATCH):
+                    ids = [f"{fname}_{n_chunks + i}" for i in range(len(batch))]
+                    q.put(("upsert", {
+                        "documents": batch,
+                        "embeddings": embedding_func(batch),
+                        "metadatas": [{"source": fname, "chunk": n_chunks + i} for i in range(len(batch))],
+                        "ids": ids,
+                    }))
+                    bm25.add(ids, batch, fname)
+                    n_chunks += len(batch)
+                stats["chunks"] += n_chunks
+
+                if failed:
+                    # 다음 실행에서 다시 시도하도록 매니페스트는 갱신하지 않음
+                    print(f"[!] {fname} → 텍스트 추출 오류: {failed[0]}")
+                    continue
+
+                stale = _stale_ids(fname, n_chunks, entries.get(fname))
+                if stale:
+                    q.put(("delete", {"ids": stale}))
+                    bm25.remove(stale)
+                entries[fname] = dict(pending[fname], chunks=n_chunks)
+                changed = True
+                if n_chunks:
+                    print(f"[+] {fname} → {n_chunks} chunks 저장" + (f" (이전 chunk {len(stale)}개 삭제)" if stale else ""))
+                else:
+                    print(f"[!] {fname} → 텍스트 추출 실패 (스캔본일 가능성)")
+    except BaseException:
+        _reset_bm25_index()
+        raise
+    finally:
+        q.put(None)
+        writer.join()
+
+    if write_errors:
+        _reset_bm25_index()   # Chroma에 반영되지 않은 변경이 메모리 색인에만 남지 않도록
+        raise write_errors[0]
 
+    if changed or stats["files"]:
+        _save_bm25_index(bm25)
 
-def query_pdf_knowledge(query_text, n_results=3):
-    """PDF 지식 DB에서 관련 내용 검색"""
-    result = collection.query(query_texts=[query_text], n_results=n_results)
-    docs = result.get("documents", [[]])[0]
-    return docs
+    if changed:
+        manifest["version"] = manifest.get("version", 0) + 1
+    _save_manifest(manifest)
+    if changed:
+        _result_cache.clear()   # 버전이 바뀌어 어차피 적중하지 않는 예전 결과 정리
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("rag.ingest", elapsed)
+    metrics.incr("rag.ingest.pages", stats["pages"])
+    metrics.incr("rag.ingest.chunks", stats["chunks"])
+    stats["seconds"] = round(elapsed, 2)
+    stats["pages_per_s"] = round(stats["pages"] / elapsed, 1) if elapsed else 0.0
+    stats["chunks_per_s"] = round(stats["chunks"] / elapsed, 1) if elapsed else 0.0
+    print(f"[+] 인덱싱 완료: 파일 {stats['files']}개 (변경 없음 {stats['skipped']}개, 삭제 {stats['removed']}개) "
+          f"/ {stats['pages']} pages / {stats['chunks']} chunks / {stats['seconds']}s "
+          f"({stats['pages_per_s']} pages/s, {stats['chunks_per_s']} chunks/s)")
+    return stats
+
+
+def query_pdf_knowledge(query_text, n_results=3, mode=None):
+    """PDF 지식 DB에서 관련 내용 검색 (mode: RAG_MODES 중 하나, 기본 RAG_MODE)"""
+    return query_pdf_knowledge_many([query_text], n_results=n_results, mode=mode)[0]
+
+
+def _vector_search(queries, n_results):
+    """임베딩 검색 → 검색어별 (id 리스트, 문서 리스트)"""
+    with metrics.span("rag.query", queries=len(queries), n_results=n_results):
+        result = get_collection().query(query_embeddings=embed_queries(queries), n_results=n_results)
+    empty = [[] for _ in queries]
+    return list(zip(result.get("ids") or empty, result.get("documents") or empty))
+
+
+def query_pdf_knowledge_many(query_texts, n_results=3, mode=None):
+    """
+    여러 검색어를 한 번에 검색 (임베딩이 필요한 검색어만 모아 배치 1회 + collection.query 1회)
+    - mode: vector / lexical(BM25) / hybrid(RRF) / auto (기본 RAG_MODE)
+    - 결과 캐시: (정규화 검색어, n_results, 컬렉션 버전, mode) — 인덱싱으로 버전이 바뀌면 자동 무효화
+    - 임베딩 캐시: 결과 캐시에 없는 검색어도 임베딩은 재사용
+    출력: 입력 순서대로 [[문서, ...], ...]
+    """
+    mode = mode or RAG_MODE
+    if mode not in RAG_MODES:
+        raise ValueError(f"unknown RAG mode: {mode} (choose from {', '.join(RAG_MODES)})")
+    norm = [normalize_query(q) if q else "" for q in query_texts]
+    unique = list(dict.fromkeys(q for q in norm if q))
+    if not unique:
+        return [[] for _ in query_texts]
+    version = collection_version()
+    docs = {}
+    for q in unique:
+        hit = _result_cache.get((q, n_results, version, mode))
+        if hit is not _LRU._MISS:
+            docs[q] = hit
+    missing = [q for q in unique if q not in docs]
+    metrics.incr("rag.result_cache_hits", len(unique) - len(missing))
+    metrics.incr("rag.result_cache_misses", len(missing))
+    if not missing:
+        return [list(docs[q]) if q else [] for q in norm]
+
+    # 검색어별 실제 방식 결정 (auto: 짧은 키워드는 BM25만, 나머지는 hybrid)
+    plan = {q: ("lexical" if len(q.split()) <= LEXICAL_MAX_WORDS else "hybrid") if mode == "auto" else mode
+            for q in missing}
+    index = get_bm25_index() if any(m != "vector" for m in plan.values()) else None
+    lexical = {}
+    if index is not None:
+        with metrics.span("rag.lexical", queries=sum(m != "vector" for m in plan.values())):
+            for q, m in plan.items():
+                if m != "vector":
+                    lexical[q] = index.search(q, n_results if m == "lexical" else max(n_results, HYBRID_CANDIDATES))
+    for q, m in plan.items():
+        if m == "lexical" and not lexical[q] and mode == "auto":
+            plan[q] = "vector"   # 겹치는 토큰이 없으면 임베딩 검색으로
+    metrics.incr("rag.lexical_only", sum(m == "lexical" for m in plan.values()))
+
+    need_vector = [q for q in missing if plan[q] != "lexical"]
+    vector = {}
+    if need_vector:
+        n_vec = max(n_results, HYBRID_CANDIDATES) if any(plan[q] == "hybrid" for q in need_vector) else n_results
+        vector = dict(zip(need_vector, _vector_search(need_vector, n_vec)))
+
+    for q in missing:
+        if plan[q] == "lexical":
+            found = [index.text(doc_id) for doc_id, _ in lexical[q]]
+        elif plan[q] == "vector":
+            found = list(vector[q][1][:n_results])
+        else:
+            vec_ids, vec_docs = vector[q]
+            texts = dict(zip(vec_ids, vec_docs))
+            fused = rrf([[doc_id for doc_id, _ in lexical[q]], list(vec_ids)])[:n_results]
+            found = [texts[i] if i in texts else index.text(i) for i in fused]
+        found = [d for d in found if d]
+        docs[q] = found
+        _result_cache.put((q, n_results, version, mode), found)
+    return [list(docs[q]) if q else [] for q in norm]
 
 
 def check_collection_stats():
     """현재 벡터DB에 몇 개의 문서가 저장됐는지 확인"""
-    count = collection.count()
+    count = get_collection().count()
     print(f"📚 현재 저장된 chunk 수: {count}")
     return count
 
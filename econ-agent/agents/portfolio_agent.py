@@ -1,13 +1,101 @@
 import json, os
 import pandas as pd
 import yfinance as yf
+from agents.matcher import get_matcher
+from agents.price_cache import get_price_cache
+from agents import metrics
+
+# 녹화된 종가 CSV (설정 시 Yahoo 대신 사용: 오프라인 테스트/벤치마크용)
+PRICE_CSV = os.getenv("PRICE_CSV")
+
+
+def yahoo_price_source(tickers):
+    """
+    Yahoo에서 모든 티커를 한 번에 내려받음 (yf.download 배치)
+    출력: (종가 wide DataFrame [날짜 × 티커], {티커: 오류 메시지})
+    """
+    df = yf.download(tickers, period="5d", auto_adjust=False, group_by="column",
+                     threads=True, progress=False)
+    errors = dict(getattr(getattr(yf, "shared", None), "_ERRORS", {}) or {})
+    if df is None or df.empty:
+        return pd.DataFrame(columns=tickers), errors
+    if isinstance(df.columns, pd.MultiIndex):
+        close = df["Close"]
+    else:   # 티커 1개면 컬럼이 평평하게 옴
+        close = df[["Close"]].rename(columns={"Close": tickers[0]})
+    return close, errors
+
+
+yahoo_price_source.cache_key = "yahoo"
+
+
+def csv_price_source(path):
+    """녹화된 wide CSV(Date + 티커별 종가 컬럼)를 읽는 가격 소스"""
+    def source(tickers):
+        close = pd.read_csv(path, index_col=0, parse_dates=True)
+        return close[[t for t in tickers if t in close.columns]], {}
+    source.cache_key = f"csv:{os.path.abspath(path)}"
+    return source
+
+
+def price_source_key(source) -> str:
+    """시세 캐시 키에 쓰는 가격 소스 이름 (cache_key가 없으면 함수 이름)"""
+    return getattr(source, "cache_key", None) or f"{source.__module__}.{source.__qualname__}"
+
+
+def record_prices(tickers, path):
+    """현재 Yahoo 종가를 CSV로 녹화 (csv_price_source용 데이터셋 만들기)"""
+    close, _ = yahoo_price_source(list(tickers))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    close.to_csv(path)
+    return path
+
+
+def compute_changes(close, tickers):
+    """
+    종가 wide DataFrame에서 티커별 마지막 종가/전일 대비 변화율을 한 번에 계산
+    - 날짜별 마지막 값 기준, 티커마다 결측일이 달라도 각자 마지막 두 거래일 사용
+    출력: {ticker: {"price","change", ("note"|"error")}}
+    """
+    close = close.reindex(columns=tickers)
+    close.index = pd.to_datetime(close.index)
+    daily = close.groupby(close.index.date).last()
+
+    valid = daily.notna()
+    from_end = valid[::-1].cumsum()[::-1]            # 각 행 이후(포함) 유효값 개수
+    last = daily.where(valid & (from_end == 1)).max()
+    prev = daily.where(valid & (from_end == 2)).max()
+    n_days = valid.sum()
+    chg = ((last / prev - 1.0) * 100.0).where(prev != 0, 0.0)
+
+    data = {}
+    for t in tickers:
+        n = int(n_days.get(t, 0))
+        if n == 0:
+            data[t] = {"price": None, "change": None, "error": "no data"}
+        elif n == 1:
+            data[t] = {"price": round(float(last[t]), 2), "change": None, "note": "only 1 day available"}
+        else:
+            data[t] = {"price": round(float(last[t]), 2), "change": round(float(chg[t]), 2)}
+    return data
+
 
 class PortfolioAgent:
-    def __init__(self, tickers=None, config_path="portfolio.json"):
+    def __init__(self, tickers=None, config_path="portfolio.json", price_source=None, bulk=True,
+                 use_cache=True):
+        """
+        price_source: tickers → (종가 wide DataFrame, {티커: 오류}) 함수
+                      (기본: PRICE_CSV가 있으면 녹화 데이터, 없으면 Yahoo 배치 다운로드)
+        bulk: False면 예전처럼 티커별로 하나씩 조회
+        use_cache: 거래 시간 기반 디스크 시세 캐시 사용 (장 마감 후에는 다음 개장까지 재사용)
+        """
         if tickers is not None:
             self.tickers = tickers
         else:
             self.tickers = self._load_from_file(config_path)
+        self.price_source = price_source or (csv_price_source(PRICE_CSV) if PRICE_CSV else yahoo_price_source)
+        self.bulk = bulk
+        self.cache = get_price_cache() if use_cache else None
 
     def _load_from_file(self, path):
         if os.path.exists(path):
@@ -17,8 +105,44 @@ class PortfolioAgent:
         return []
 
     def get_prices(self):
+        if self.cache is None:
+            return self._fetch(self.tickers)
+        symbols = list(dict.fromkeys(t for t in self.tickers if t))
+        source = price_source_key(self.price_source)
+        hits, missing = self.cache.get_many(symbols, source)
+        metrics.incr("prices.cache_hits", len(hits))
+        metrics.incr("prices.cache_misses", len(missing))
+        fetched = self._fetch(missing) if missing else {}
+        if fetched:
+            self.cache.put_many(fetched, source)
+        else:
+            self.cache.flush()
+        return {t: hits[t] if t in hits else fetched[t] for t in symbols}
+
+    def _fetch(self, tickers):
+        with metrics.span("prices.fetch", tickers=len(tickers), bulk=self.bulk):
+            if self.bulk:
+                return self._get_prices_bulk(tickers)
+            return self._get_prices_each(tickers)
+
+    def _get_prices_bulk(self, tickers):
+        """전체 티커 한 번에 다운로드 + 벡터화 계산 (티커별 오류는 error에 기록)"""
+        symbols = list(dict.fromkeys(t for t in tickers if t))
+        if not symbols:
+            return {}
+        try:
+            close, errors = self.price_source(symbols)
+        except Exception as e:
+            return {t: {"price": None, "change": None, "error": str(e)} for t in symbols}
+        data = compute_changes(close, symbols)
+        for t, msg in errors.items():
+            if t in data and data[t]["price"] is None:
+                data[t]["error"] = str(msg)
+        return data
+
+    def _get_prices_each(self, tickers):
         data = {}
-        for t in self.tickers:
+        for t in tickers:
             try:
                 stk = yf.Ticker(t)
                 hist = stk.history(period="5d", auto_adjust=False).dropna(subset=["Close"])
@@ -45,9 +169,10 @@ class PortfolioAgent:
         뉴스(랭킹 Agent 상위 기사)와 종목 키워드 매칭
         news_list: [{"title":..., "summary":...}, ...]
         """
+        matcher = get_matcher(self.tickers)
         results = []
         for art in news_list:
-            matched = [t for t in self.tickers if t.lower() in (art["title"]+art["summary"]).lower()]
+            matched = matcher.matches(art["title"] + " " + art["summary"])
             results.append({"article": art, "related": matched})
         return results
 
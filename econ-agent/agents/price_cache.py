@@ -0,0 +1,179 @@
+# agents/price_cache.py
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta, time as dtime
+from zoneinfo import ZoneInfo
+
+# 시세 캐시 설정 (환경변수로 조정 가능)
+CACHE_PATH = os.getenv("PRICE_CACHE_PATH", "data/price_cache.json")
+LIVE_TTL = float(os.getenv("PRICE_LIVE_TTL", "60"))     # 장중 시세 TTL(초)
+ERROR_TTL = float(os.getenv("PRICE_ERROR_TTL", "300"))  # 오류/데이터 없음 결과 TTL(초)
+
+# 거래소별 (시간대, 개장, 마감) — 공휴일·점심 휴장은 반영하지 않음
+MARKETS = {
+    "KR": ("Asia/Seoul", dtime(9, 0), dtime(15, 30)),
+    "US": ("America/New_York", dtime(9, 30), dtime(16, 0)),
+    "JP": ("Asia/Tokyo", dtime(9, 0), dtime(15, 0)),
+    "HK": ("Asia/Hong_Kong", dtime(9, 30), dtime(16, 0)),
+}
+SUFFIX_MARKET = {".KS": "KR", ".KQ": "KR", ".T": "JP", ".HK": "HK"}
+INDEX_MARKET = {"^KS11": "KR", "^KQ11": "KR", "^N225": "JP", "^HSI": "HK"}
+
+DEFAULT_SOURCE = "yahoo"   # 캐시 키의 가격 소스 (녹화 CSV는 "csv:<절대경로>")
+SOURCE_SEP = "|"
+
+
+def market_of(ticker: str) -> str:
+    """티커 → 거래소 코드 (접미사 없는 티커/지수는 미국 장 기준)"""
+    t = ticker.upper()
+    if t in INDEX_MARKET:
+        return INDEX_MARKET[t]
+    for suffix, market in SUFFIX_MARKET.items():
+        if t.endswith(suffix):
+            return market
+    return "US"
+
+
+def is_open(market: str, now: datetime | None = None) -> bool:
+    tz, open_t, close_t = MARKETS[market]
+    local = (now or datetime.now(ZoneInfo("UTC"))).astimezone(ZoneInfo(tz))
+    return local.weekday() < 5 and open_t <= local.time() < close_t
+
+
+def next_open(market: str, now: datetime | None = None) -> datetime:
+    """다음 개장 시각 (현재 장중이면 다음 거래일 개장)"""
+    tz, open_t, _ = MARKETS[market]
+    local = (now or datetime.now(ZoneInfo("UTC"))).astimezone(ZoneInfo(tz))
+    day = local.date()
+    while True:
+        cand = datetime.combine(day, open_t, tzinfo=ZoneInfo(tz))
+        if cand > local and cand.weekday() < 5:
+            return cand
+        day += timedelta(days=1)
+
+
+def expires_at(ticker: str, now: datetime | None = None) -> float:
+    """장중이면 짧은 TTL, 장 마감 후에는 다음 개장까지 유효"""
+    now = now or datetime.now(ZoneInfo("UTC"))
+    market = market_of(ticker)
+    if is_open(market, now):
+        return now.timestamp() + LIVE_TTL
+    return next_open(market, now).timestamp()
+
+
+def _key(source: str, ticker: str) -> str:
+    return f"{source}{SOURCE_SEP}{ticker}"
+
+
+class PriceCache:
+    """
+    거래 시간 기반 TTL 시세 캐시 (디스크 공유: 앱/오케스트레이터/시그널 에이전트)
+    항목: {"소스|ticker": {"data": {...}, "fetched": ts, "expires": ts}}
+    - 소스(yahoo / 녹화 CSV 경로 등)별로 따로 보관 → PRICE_CSV 실행과 Yahoo 실행이 시세를 섞지 않음
+    """
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.session = {"hits": 0, "misses": 0}   # 이 프로세스 기준
+        self._pending = {"hits": 0, "misses": 0}  # 아직 디스크에 반영 안 된 카운트
+        self._data = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                # 예전 형식(티커만 키) 항목은 소스를 알 수 없으므로 버림
+                data["entries"] = {k: v for k, v in data.get("entries", {}).items() if SOURCE_SEP in k}
+                data.setdefault("stats", {"hits": 0, "misses": 0})
+                return data
+            except Exception:
+                pass
+        return {"entries": {}, "stats": {"hits": 0, "misses": 0}}
+
+    def get_many(self, tickers, source=DEFAULT_SOURCE):
+        """출력: (캐시 적중 {ticker: data}, 다시 조회할 티커 리스트) — source: 가격 소스 키"""
+        now = time.time()
+        hits, missing = {}, []
+        with self._lock:
+            # 다른 프로세스가 저장한 최신 시세 반영
+            self._data["entries"].update(self._load()["entries"])
+            for t in tickers:
+                rec = self._data["entries"].get(_key(source, t))
+                if rec and rec.get("expires", 0) > now:
+                    hits[t] = rec["data"]
+                else:
+                    missing.append(t)
+            self._count(len(hits), len(missing))
+        return hits, missing
+
+    def _count(self, hits, misses):
+        for k, n in (("hits", hits), ("misses", misses)):
+            self.session[k] += n
+            self._pending[k] += n
+
+    def put_many(self, data, source=DEFAULT_SOURCE):
+        now = datetime.now(ZoneInfo("UTC"))
+        with self._lock:
+            for t, info in data.items():
+                exp = expires_at(t, now)
+                if info.get("price") is None:   # 오류/데이터 없음은 잠깐만 보관
+                    exp = min(exp, now.timestamp() + ERROR_TTL)
+                self._data["entries"][_key(source, t)] = {"data": info, "fetched": now.timestamp(), "expires": exp}
+            self._save()
+
+    def _save(self):
+        # 저장 직전 디스크 내용과 합쳐서 다른 프로세스의 항목/통계를 덮어쓰지 않음
+        disk = self._load()
+        for t, rec in disk["entries"].items():
+            mine = self._data["entries"].get(t)
+            if mine is None or rec.get("fetched", 0) > mine.get("fetched", 0):
+                self._data["entries"][t] = rec
+        self._data["stats"] = {k: disk["stats"].get(k, 0) + self._pending[k] for k in ("hits", "misses")}
+        self._pending = {"hits": 0, "misses": 0}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def flush(self):
+        """적중만 있었던 조회의 통계도 디스크에 반영"""
+        with self._lock:
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._data = {"entries": {}, "stats": {"hits": 0, "misses": 0}}
+            self._pending = {"hits": 0, "misses": 0}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self):
+        with self._lock:
+            hits = self._data["stats"].get("hits", 0) + self._pending["hits"]
+            misses = self._data["stats"].get("misses", 0) + self._pending["misses"]
+            n = hits + misses
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / n, 3) if n else 0.0,
+                "session_hits": self.session["hits"],
+                "session_misses": self.session["misses"],
+                "entries": len(self._data["entries"]),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_price_cache():
+    """프로세스 공용 시세 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PriceCache()
+        return _cache
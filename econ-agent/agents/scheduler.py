@@ -0,0 +1,208 @@
+# agents/scheduler.py
+"""
+상주 스케줄러 모드 (에이전트/클라이언트/모델을 한 번만 띄워 두고 반복 실행)
+- 크롤링 주기(SCHEDULE_INTERVAL)마다 새 기사만 랭킹/분석해서 기사 저장소에 보관
+- 지정 시각(SCHEDULE_REPORT_AT)마다 out/ 에 일일 리포트 재생성 (저장된 분석 재사용)
+- 이전 작업이 길어지면 겹쳐 실행하지 않음 (크롤링은 건너뛰고, 리포트는 끝날 때까지 대기)
+- SIGINT/SIGTERM: 진행 중인 작업을 마치고 종료
+- 작업마다 단계별 시간을 출력하고 out/scheduler.jsonl 에 한 줄씩 기록
+실행: python -m agents.scheduler --interval 900 --report-at 07:30,18:00 --source both
+"""
+import os
+import json
+import time
+import signal
+import argparse
+import threading
+import datetime as dt
+from agents.orchestrator import OrchestratorAgent
+from agents.portfolio_agent import PortfolioAgent
+
+# 스케줄 설정 (환경변수로 조정 가능)
+SCHEDULE_INTERVAL = float(os.getenv("SCHEDULE_INTERVAL", "900"))         # 크롤링 주기(초)
+SCHEDULE_REPORT_AT = os.getenv("SCHEDULE_REPORT_AT", "07:30,18:00")      # 리포트 생성 시각 (쉼표 구분 HH:MM)
+SCHEDULE_SOURCE = os.getenv("SCHEDULE_SOURCE", "both")
+SCHEDULE_LOG = os.getenv("SCHEDULE_LOG", os.path.join("out", "scheduler.jsonl"))
+TICK = 1.0   # 스케줄 확인 간격(초)
+
+
+def parse_times(spec):
+    """"07:30,18:00" → [time(7,30), time(18,0)] (정렬)"""
+    times = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if part:
+            h, m = part.split(":")
+            times.append(dt.time(int(h), int(m)))
+    return sorted(times)
+
+
+class Scheduler:
+    def __init__(self, tickers=None, interval=SCHEDULE_INTERVAL, report_at=SCHEDULE_REPORT_AT,
+                 source=SCHEDULE_SOURCE, topk=6, horizon_hours=18, log_path=SCHEDULE_LOG):
+        self.interval = interval
+        self.report_times = parse_times(report_at) if isinstance(report_at, str) else sorted(report_at)
+        self.source = source
+        self.log_path = log_path
+        tickers = PortfolioAgent().tickers if tickers is None else tickers
+        # 오케스트레이터(기사 저장소 연결 포함)는 계속 재사용
+        self.orch = OrchestratorAgent(tickers=tickers, topk=topk, horizon_hours=horizon_hours)
+        self.stop = threading.Event()
+        self._busy = threading.Lock()   # 크롤링/리포트 작업은 한 번에 하나
+        self._worker = None
+        self._cycle = 0
+        self._reports_done = set()      # 이미 처리한 (날짜, 시각)
+        self._report_pending = None
+
+    # --- 작업 ---
+    def warm_up(self):
+        """첫 작업 전에 무거운 자원을 미리 로드 (벡터DB/BM25 색인, 가능하면 임베딩 모델)"""
+        t0 = time.perf_counter()
+        try:
+            from agents.pdf_rag import get_collection, get_bm25_index, get_embedding_function
+            get_collection().count()
+            get_bm25_index()
+            get_embedding_function()(["warmup"])
+        except Exception as e:
+            print(f"[!] RAG 준비 실패 (분석은 RAG 없이 진행): {type(e).__name__}: {e}")
+        print(f"[scheduler] 준비 완료 ({time.perf_counter() - t0:.1f}s)")
+
+    def crawl_cycle(self):
+        """수집 → 새 기사만 랭킹 → 분석(저장소에 보관) — 리포트는 만들지 않음"""
+        return self._summary(self.orch.crawl(source=self.source, only_new=True))
+
+    def report_cycle(self):
+        """오늘자 리포트 재생성 (오늘 수집된 기사 전체 기준, 저장된 분석은 재사용)"""
+        res = self.orch.run(source=self.source)
+        return dict(self._summary(res), report_path=res["report_path"])
+
+    @staticmethod
+    def _summary(res):
+        """오케스트레이터 결과 → 로그 한 줄에 남길 항목"""
+        return {"articles": len(res["articles"]), "new_articles": res["new_articles"],
+                "analyzed": len(res["analyzed"]) - res["reused_analyses"],
+                "reused_analyses": res["reused_analyses"], "feed_errors": len(res["feed_errors"]),
+                "trace_path": res["trace_path"],
+                "stages": {n: t["seconds"] for n, t in res["timings"].items()}}
+
+    def _run(self, kind):
+        """작업 하나 실행 + 시간 기록 (_busy를 잡은 상태에서 호출됨)"""
+        self._cycle += 1
+        entry = {"cycle": self._cycle, "kind": kind, "started_at": dt.datetime.now().isoformat(timespec="seconds")}
+        t0 = time.perf_counter()
+        try:
+            entry.update(self.crawl_cycle() if kind == "crawl" else self.report_cycle())
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            entry["seconds"] = round(time.perf_counter() - t0, 3)
+            if "stages" in entry:
+                entry["stages"] = {n: round(s or 0.0, 3) for n, s in entry["stages"].items()}
+            self._log(entry)
+            self._busy.release()
+
+    def _log(self, entry):
+        stages = " / ".join(f"{n} {s:.2f}s" for n, s in (entry.get("stages") or {}).items())
+        status = f"오류: {entry['error']}" if "error" in entry else \
+            f"새 기사 {entry.get('new_articles', 0)}건, 분석 {entry.get('analyzed', 0)}건"
+        print(f"[scheduler #{entry['cycle']} {entry['kind']}] {entry['seconds']:.2f}s ({stages}) {status}"
+              + (f" → {entry['report_path']}" if entry.get("report_path") else ""))
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def _launch(self, kind):
+        """실행 중인 작업이 없으면 백그라운드로 시작 → 시작 여부"""
+        if not self._busy.acquire(blocking=False):
+            return False
+        self._worker = threading.Thread(target=self._run, args=(kind,), name=f"scheduler-{kind}")
+        self._worker.start()
+        return True
+
+    # --- 스케줄 ---
+    def _due_report(self, now):
+        """지금 실행해야 할 리포트 시각 (이미 지난 시각 중 처리 안 한 가장 늦은 것) 또는 None"""
+        due = [(now.date(), t) for t in self.report_times
+               if t <= now.time() and (now.date(), t) not in self._reports_done]
+        if not due:
+            return None
+        self._reports_done.update(due)   # 여러 시각이 밀려 있으면 한 번만 생성
+        return due[-1]
+
+    def _skip_done_reports(self, now):
+        """시작 시점에 이미 지난 시각 중, 그 시각 이후에 만들어진 리포트가 있는 것은 처리한 것으로 간주"""
+        from agents.econ_reporter import EconReporterAgent
+        path = EconReporterAgent().report_path(date=now.date())
+        mtime = dt.datetime.fromtimestamp(os.path.getmtime(path)) if os.path.exists(path) else None
+        for t in self.report_times:
+            if mtime is not None and mtime >= dt.datetime.combine(now.date(), t):
+                self._reports_done.add((now.date(), t))
+
+    def _handle_signal(self, signum, frame):
+        print(f"\n[scheduler] 종료 신호({signal.Signals(signum).name}) — 진행 중인 작업을 마치고 종료합니다")
+        self.stop.set()
+        # 두 번째 신호는 기본 동작 (강제 종료)
+        signal.signal(signum, signal.SIG_DFL)
+
+    def run_forever(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._handle_signal)
+        times = ", ".join(t.strftime("%H:%M") for t in self.report_times) or "없음"
+        print(f"[scheduler] 시작: 크롤링 {self.interval:.0f}s마다 / 리포트 {times} / 소스 {self.source}")
+        self.warm_up()
+        self._skip_done_reports(dt.datetime.now())
+        next_crawl = time.monotonic()
+        try:
+            while not self.stop.is_set():
+                now = dt.datetime.now()
+                due = self._due_report(now)
+                if due is not None:
+                    self._report_pending = due
+                if self._report_pending is not None and self._launch("report"):
+                    self._report_pending = None
+                elif time.monotonic() >= next_crawl:
+                    if not self._launch("crawl"):
+                        print("[scheduler] 이전 작업이 아직 실행 중 → 이번 크롤링 건너뜀")
+                    # 밀린 주기는 몰아서 실행하지 않음 (새 기사만 보므로 다음 주기에 따라잡음)
+                    next_crawl = max(next_crawl + self.interval, time.monotonic())
+                self.stop.wait(TICK)
+        finally:
+            if self._worker is not None:
+                self._worker.join()
+            if self.orch.store:
+                self.orch.store.close()
+            print("[scheduler] 종료")
+
+    def run_once(self, report=False):
+        """크롤링 1회 (report=True면 리포트까지) 실행 후 종료 — cron 등에서 사용"""
+        for kind in ("crawl", "report") if report else ("crawl",):
+            self._busy.acquire()
+            self._run(kind)
+        if self.orch.store:
+            self.orch.store.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--interval", type=float, default=SCHEDULE_INTERVAL, help="크롤링 주기(초)")
+    ap.add_argument("--report-at", default=SCHEDULE_REPORT_AT, help="리포트 생성 시각 (쉼표 구분 HH:MM)")
+    ap.add_argument("--source", default=SCHEDULE_SOURCE, choices=["news", "blog", "both"])
+    ap.add_argument("--tickers", help="쉼표 구분 종목 (기본: portfolio.json)")
+    ap.add_argument("--topk", type=int, default=6)
+    ap.add_argument("--horizon-hours", type=int, default=18)
+    ap.add_argument("--once", action="store_true", help="크롤링 1회 실행 후 종료")
+    ap.add_argument("--once-report", action="store_true", help="크롤링 + 리포트 1회 실행 후 종료")
+    args = ap.parse_args()
+
+    tickers = [t.strip() for t in args.tickers.split(",") if t.strip()] if args.tickers else None
+    sched = Scheduler(tickers=tickers, interval=args.interval, report_at=args.report_at,
+                      source=args.source, topk=args.topk, horizon_hours=args.horizon_hours)
+    if args.once or args.once_report:
+        sched.run_once(report=args.once_report)
+    else:
+        sched.run_forever()
+
+
+if __name__ == "__main__":
+    main()
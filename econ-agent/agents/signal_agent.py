@@ -1,6 +1,5 @@
 # agents/signal_agent.py
-import re
-from collections import Counter
+from agents.matcher import get_matcher
 
 class SignalAgent:
     """
@@ -16,17 +15,11 @@ class SignalAgent:
         for item in analyzed:
             a = item["analysis"]
             text_corpus.append(a.get("summary","") + " " + a.get("impact",""))
-        full_text = " ".join(text_corpus).lower()
+        full_text = " ".join(text_corpus)
 
-        counts = Counter()
-        for t in self.tickers:
-            if not t: continue
-            # 단순히 ticker 문자열 기반 체크 (개선: 회사명 사전 매핑)
-            pattern = r"\b" + re.escape(t.lower()) + r"\b"
-            hits = len(re.findall(pattern, full_text))
-            if hits > 0:
-                counts[t] += hits
-        return counts
+        # 단순히 ticker 문자열 기반 체크 (개선: 회사명 사전 매핑)
+        # 티커 전체를 한 번에 훑는 매처 (티커 집합별로 한 번만 생성)
+        return get_matcher(self.tickers).counts(full_text)
 
     def rank_signals(self, analyzed, prices):
         """
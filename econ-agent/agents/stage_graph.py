@@ -0,0 +1,116 @@
+# agents/stage_graph.py
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+from agents import metrics
+
+
+class StageFailed(RuntimeError):
+    """단계 하나가 실패해서 실행이 중단됨 (.stage: 실패 단계, .timings: 그때까지의 단계별 시간)"""
+    def __init__(self, stage, error, timings):
+        super().__init__(f"stage '{stage}' failed: {type(error).__name__}: {error}")
+        self.stage = stage
+        self.error = error
+        self.timings = timings
+
+
+class StageGraph:
+    """
+    의존 관계가 있는 파이프라인 단계를 공용 스레드풀에서 실행
+    - 선행 단계가 모두 끝난 단계는 바로 시작 → 서로 독립인 단계는 동시에 실행
+    - 단계 함수는 선행 단계 결과를 이름으로 받음: fn(**{dep: result})
+    - 한 단계가 실패하면 아직 시작하지 않은 단계는 취소하고 StageFailed 발생
+    """
+    def __init__(self):
+        self.stages = {}   # 이름 → (fn, deps) (추가 순서 유지)
+
+    def add(self, name, fn, deps=()):
+        if name in self.stages:
+            raise ValueError(f"duplicate stage: {name}")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            # 선행 단계를 먼저 추가하도록 강제 → 순환 의존이 생길 수 없음
+            raise ValueError(f"stage '{name}' depends on unknown stage(s): {', '.join(missing)}")
+        self.stages[name] = (fn, tuple(deps))
+        return self
+
+    def run(self, executor=None, max_workers=None):
+        """
+        출력: (단계별 결과 {이름: 값}, 단계별 시간 {이름: {"start","end","seconds","status"}})
+          start/end는 실행 시작 기준 초, status는 "ok" / "failed" / "cancelled"
+        """
+        own = executor is None
+        if own:
+            executor = metrics.ContextThreadPoolExecutor(max_workers=max_workers or len(self.stages) or 1,
+                                                         thread_name_prefix="stage")
+        start = time.perf_counter()
+        results, timings = {}, {}
+        lock = threading.Lock()
+
+        def call(name, fn, deps):
+            t0 = time.perf_counter() - start
+            with lock:
+                timings[name] = {"start": round(t0, 3), "end": None, "seconds": None, "status": "running"}
+            try:
+                with metrics.span(f"stage.{name}"):
+                    return fn(**{d: results[d] for d in deps})
+            finally:
+                t1 = time.perf_counter() - start
+                with lock:
+                    timings[name].update(end=round(t1, 3), seconds=round(t1 - t0, 3))
+
+        pending = dict(self.stages)
+        running = {}   # Future → 이름
+        failure = None
+        try:
+            while pending or running:
+                if failure is None:
+                    for name, (fn, deps) in list(pending.items()):
+                        if all(d in results for d in deps):
+                            running[executor.submit(call, name, fn, deps)] = name
+                            del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    try:
+                        results[name] = fut.result()
+                        timings[name]["status"] = "ok"
+                    except Exception as e:
+                        if name in timings:
+                            timings[name]["status"] = "failed"
+                        if failure is None:
+                            failure = (name, e)
+                if failure is not None:
+                    # 아직 시작 안 한 단계는 취소, 이미 실행 중인 단계는 끝날 때까지 대기
+                    for fut in list(running):
+                        if fut.cancel():
+                            timings[running.pop(fut)] = {"start": None, "end": None,
+                                                         "seconds": None, "status": "cancelled"}
+                    for name in pending:
+                        timings[name] = {"start": None, "end": None, "seconds": None, "status": "cancelled"}
+                    pending.clear()
+        finally:
+            if own:
+                executor.shutdown(wait=True)
+
+        if failure is not None:
+            raise StageFailed(failure[0], failure[1], timings) from failure[1]
+        return results, timings
+
+
+def critical_path(graph, timings):
+    """
+    단계별 소요 시간 기준 가장 긴 의존 경로
+    출력: (단계 이름 리스트, 합계 초) — 병렬 실행 시 전체 시간의 하한
+    """
+    best = {}
+    for name, (_, deps) in graph.stages.items():   # 추가 순서 = 위상 정렬 순서
+        own = (timings.get(name) or {}).get("seconds") or 0.0
+        prev = max((best[d] for d in deps), key=lambda x: x[1], default=([], 0.0))
+        best[name] = (prev[0] + [name], prev[1] + own)
+    if not best:
+        return [], 0.0
+    path, total = max(best.values(), key=lambda x: x[1])
+    return path, round(total, 3)
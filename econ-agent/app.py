@@ -5,16 +5,85 @@ import streamlit as st
 from agents.news_crawler import NewsCrawlerAgent
 from agents.news_ranker import NewsRankerAgent
 from agents.news_analyst import NewsAnalystAgent
-from agents.pdf_rag import ingest_pdfs, query_pdf_knowledge, collection  # collection.count() 사용
+from agents.pdf_rag import ingest_pdfs, query_pdf_knowledge, get_collection, RAG_MODES  # 첫 사용 시 Chroma/모델 로드
 from agents.portfolio_agent import PortfolioAgent
 from agents.orchestrator import OrchestratorAgent
 from agents.econ_reporter import EconReporterAgent
 
+# Streamlit 캐시 TTL(초) — 위젯 조작(재실행) 때마다 네트워크/모델 작업을 반복하지 않도록
+CRAWL_TTL = int(os.getenv("APP_CRAWL_TTL", "600"))
+PRICE_TTL = int(os.getenv("APP_PRICE_TTL", "60"))
+RAG_TTL = int(os.getenv("APP_RAG_TTL", "3600"))
 
 
 st.set_page_config(page_title="경제 뉴스 에이전트 (All-in-One)", layout="wide")
 st.title("🧠 경제 뉴스 에이전트 ")
 
+
+# ---------------------------
+# 캐시: 오래 사는 객체(resource) / 결과(data)
+# ---------------------------
+@st.cache_resource(show_spinner=False)
+def get_analyst():
+    return NewsAnalystAgent()   # OpenAI 클라이언트 재사용
+
+
+@st.cache_resource(show_spinner=False)
+def get_reporter():
+    return EconReporterAgent()
+
+
+@st.cache_resource(show_spinner=False)
+def get_article_store():
+    from agents.article_store import ArticleStore
+    return ArticleStore()       # SQLite 연결 하나를 rerun 간 재사용 (스레드 간 공유 가능)
+
+
+@st.cache_resource(show_spinner=False)
+def get_portfolio_agent(tickers):
+    return PortfolioAgent(tickers=list(tickers))   # 티커 조합별로 재사용 (시세 캐시/매처 포함)
+
+
+@st.cache_resource(show_spinner=False)
+def get_ranker(topk):
+    return NewsRankerAgent(topk=topk)
+
+
+@st.cache_resource(show_spinner=False)
+def get_orchestrator(tickers, topk, horizon_hours):
+    return OrchestratorAgent(tickers=list(tickers), topk=topk, horizon_hours=horizon_hours,
+                             store=get_article_store())
+
+
+@st.cache_resource(show_spinner="임베딩 모델/Chroma 로드 중...")
+def get_rag_collection():
+    return get_collection()     # 임베딩 모델 + Chroma 컬렉션
+
+
+@st.cache_data(show_spinner=False)
+def load_portfolio(path, mtime):
+    """portfolio.json 읽기 (파일 수정 시각이 바뀔 때만 다시 읽음)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("tickers")
+
+
+@st.cache_data(ttl=CRAWL_TTL, show_spinner=False)
+def crawl_news(horizon_hours):
+    crawler = NewsCrawlerAgent(horizon_hours=horizon_hours)
+    return crawler.collect_items(), crawler.errors
+
+
+@st.cache_data(ttl=PRICE_TTL, show_spinner=False)
+def fetch_prices(tickers):
+    return get_portfolio_agent(tuple(tickers)).get_prices()
+
+
+@st.cache_data(ttl=RAG_TTL, show_spinner=False)
+def rag_search(query, n_results, mode=None):
+    get_rag_collection()
+    return query_pdf_knowledge(query, n_results=n_results, mode=mode)
+
+
 # ---------------------------
 # 사이드바: 설정
 # ---------------------------
@@ -30,9 +99,7 @@ default_tickers = ["AAPL", "TSLA", "MSFT"]
 existing = default_tickers
 if os.path.exists("portfolio.json"):
     try:
-        with open("portfolio.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            existing = data.get("tickers", default_tickers)
+        existing = load_portfolio("portfolio.json", os.path.getmtime("portfolio.json")) or default_tickers
     except Exception:
         existing = default_tickers
 seed = ",".join(existing)
@@ -41,19 +108,26 @@ if st.sidebar.button("포트폴리오 저장"):
     tickers = [t.strip() for t in user_input.split(",") if t.strip()]
     with open("portfolio.json", "w", encoding="utf-8") as f:
         json.dump({"tickers": tickers}, f, ensure_ascii=False, indent=2)
-    st.sidebar.success("저장 완료! 페이지 새로고침(F5) 시 반영됩니다.")
+    st.sidebar.success("저장 완료! (다음 화면 갱신부터 반영됩니다)")
 
 # PDF RAG 인덱싱 실행
 st.sidebar.subheader("📚 PDF RAG")
+force_reindex = st.sidebar.checkbox("변경 없는 파일도 전체 재인덱싱", value=False)
 if st.sidebar.button("data/pdfs 폴더 인덱싱 실행"):
-    with st.spinner("PDF 인덱싱 중... (용량/페이지 수에 따라 시간이 걸립니다)"):
-        ingest_pdfs()
-    st.sidebar.success("PDF 인덱싱 완료!")
+    with st.spinner("PDF 인덱싱 중... (변경된 파일만 처리합니다)"):
+        stats = ingest_pdfs(force=force_reindex)
+    rag_search.clear()   # 인덱스가 바뀌었으므로 이전 검색 결과 무효화
+    if stats:
+        st.sidebar.success(f"PDF 인덱싱 완료! 변경 {stats['files']}개 / 건너뜀 {stats['skipped']}개 / 삭제 {stats['removed']}개 · "
+                           f"{stats['pages']} pages / {stats['chunks']} chunks "
+                           f"({stats['pages_per_s']} pages/s, {stats['chunks_per_s']} chunks/s)")
+    else:
+        st.sidebar.warning("data/pdfs 폴더가 없습니다.")
 
 # RAG 빠른 검색
 quick_query = st.sidebar.text_input("RAG 빠른 검색 (예: 인플레이션)")
 if st.sidebar.button("검색"):
-    r = query_pdf_knowledge(quick_query, n_results=3)
+    r = rag_search(quick_query, 3)
     st.sidebar.write("검색 결과:")
     if not r:
         st.sidebar.info("관련 문서 없음")
@@ -92,6 +166,11 @@ with tab_news:
         format_func=lambda x: {"news":"뉴스", "blog":"블로그", "both":"둘 다"}[x]
     )
 
+    only_new = st.checkbox("지난 실행 이후 새 기사만 분석", value=False,
+                           help="저장소(data/articles.db)에 없던 기사만 랭킹/분석합니다. 이미 분석한 기사는 저장된 결과를 재사용합니다.")
+    stream_run = st.checkbox("결과를 도착하는 대로 표시 (스트리밍)", value=True,
+                             help="먼저 도착한 피드부터 랭킹/분석을 시작하고, 분석된 기사를 바로 보여줍니다.")
+
     col1, col2, col3 = st.columns(3)
     with col1:
         do_fetch = st.button("1) 뉴스/블로그 크롤링")
@@ -103,25 +182,51 @@ with tab_news:
     # 🚀 전체 파이프라인 실행
     if do_run_all:
         tickers = [t.strip() for t in user_input.split(",") if t.strip()]
-        orch = OrchestratorAgent(tickers=tickers, topk=news_count, horizon_hours=horizon_hours)
-        with st.spinner(f"{mode} 파이프라인 실행 중..."):
-            res = orch.run(source=mode)
+        orch = get_orchestrator(tuple(tickers), news_count, horizon_hours)
+        if stream_run:
+            status = st.status(f"{mode} 파이프라인 실행 중...", expanded=True)
+            live = st.container()
+            res = None
+            for ev in orch.run_stream(source=mode, only_new=only_new):
+                stage, item, sec = ev["stage"], ev["item"], ev["elapsed"]
+                if stage == "collect":
+                    status.write(f"[{sec:.1f}s] 피드 수집: {item['url'][:60]} → "
+                                 + (f"실패 ({item['error']})" if item["error"] else f"{item['count']}개"))
+                elif stage == "analyze":
+                    art, an = item["article"], item["analysis"]
+                    live.markdown(f"- [{sec:.1f}s] **{an.get('headline', art['title'])}** — {an.get('summary', '')[:120]}")
+                elif stage in ("prices", "signals", "report"):
+                    status.write(f"[{sec:.1f}s] {stage} 완료")
+                elif stage == "done":
+                    res = item
+            status.update(label=f"{mode} 파이프라인 완료", state="complete", expanded=False)
+        else:
+            with st.spinner(f"{mode} 파이프라인 실행 중..."):
+                res = orch.run(source=mode, only_new=only_new)
         st.session_state.latest_news = res["articles"]
         st.session_state.ranked_news = res["ranked"]
         st.session_state.analyzed = res["analyzed"]
         st.session_state.portfolio_prices = res.get("portfolio_prices", {})
+        st.session_state.signals = res.get("signals", [])
         st.success(f"✅ 완료! ({mode}) 수집 {len(res['articles'])}개 / 분석 {len(res['analyzed'])}건")
+        st.caption(f"새 기사 {res['new_articles']}개 · 저장된 분석 재사용 {res['reused_analyses']}건")
+        if res.get("timings"):
+            st.caption("단계별 시간: " + " · ".join(f"{n} {t['seconds']}s" for n, t in res["timings"].items())
+                       + f" (전체 {res['wall_seconds']}s, 임계 경로 {res['critical_path_seconds']}s)")
+        for url, err in res.get("feed_errors", {}).items():
+            st.warning(f"피드 수집 실패: {url} ({err})")
 
     # 1) 크롤링 + 랭킹 (기존 로직 유지)
     if do_fetch:
         with st.spinner("뉴스 크롤링 중..."):
-            crawler = NewsCrawlerAgent(horizon_hours=horizon_hours)
-            articles = crawler.collect_items()
+            articles, feed_errors = crawl_news(horizon_hours)
             st.session_state.latest_news = articles
         st.success(f"크롤링 완료: 총 {len(st.session_state.latest_news)}개 기사")
+        for url, err in feed_errors.items():
+            st.warning(f"피드 수집 실패: {url} ({err})")
 
         with st.spinner("랭킹/중복제거 중..."):
-            ranker = NewsRankerAgent(topk=news_count)
+            ranker = get_ranker(news_count)
             ranked = ranker.rank_items(st.session_state.latest_news)
             st.session_state.ranked_news = ranked
         st.info(f"상위 {len(st.session_state.ranked_news)}개 기사 선정")
@@ -139,12 +244,11 @@ with tab_news:
         if not st.session_state.ranked_news:
             st.warning("먼저 '뉴스 크롤링'을 실행하세요.")
         else:
-            st.session_state.analyzed = []
-            analyst = NewsAnalystAgent()
+            analyst = get_analyst()
             with st.spinner("Analyst가 상위 기사 분석 중..."):
-                for _, art in st.session_state.ranked_news:
-                    result = analyst.analyze(art)
-                    st.session_state.analyzed.append({"article": art, "analysis": result})
+                arts = [art for _, art in st.session_state.ranked_news]
+                results = analyst.analyze_many(arts)
+                st.session_state.analyzed = [{"article": a, "analysis": r} for a, r in zip(arts, results)]
             st.success("분석 완료!")
 
     # 분석 결과 표시 (기존)
@@ -167,14 +271,18 @@ with tab_news:
                         st.markdown(f"- {ctx}")
         st.markdown("---")
         if st.button("📝 오늘 리포트(MD) 생성/저장"):
-            rep = EconReporterAgent()
-            md = rep.build_report(st.session_state.analyzed)
-            path = rep.save_report(md)
-            st.success(f"리포트 생성 완료: {path}")
-
-            # 바로 화면에서 보기
-            with st.expander("리포트 미리보기 (Markdown)"):
-                st.markdown(md)
+            rep = get_reporter()
+            # 토큰이 도착하는 대로 화면에 그리면서 파일에도 이어 쓰기
+            with st.expander("리포트 미리보기 (Markdown)", expanded=True):
+                view = st.empty()
+                md, last = "", 0.0
+                for chunk in rep.save_report_stream(rep.build_report_stream(st.session_state.analyzed)):
+                    md += chunk
+                    if time.time() - last > 0.1:   # 너무 잦은 재렌더링 방지
+                        view.markdown(md + " ▌")
+                        last = time.time()
+                view.markdown(md)
+            st.success(f"리포트 생성 완료: {rep.report_path()}")
 # ---------------------------
 # 탭 2: RAG 검색 (인터랙티브)
 # ---------------------------
@@ -182,12 +290,15 @@ with tab_rag:
     st.subheader("PDF RAG 검색")
     q = st.text_input("검색어를 입력하세요 (예: 인플레이션, 금리, GDP 등)", value=quick_query or "")
     nres = st.slider("검색 결과 개수", 1, 10, 3)
+    rag_mode = st.radio("검색 방식", RAG_MODES, horizontal=True,
+                        help="auto: 짧은 키워드는 BM25만, 긴 질문은 BM25+벡터 혼합 · lexical: BM25만 · "
+                             "vector: 임베딩만 · hybrid: 두 순위를 RRF로 합침")
     if st.button("RAG 검색 실행"):
         if not q.strip():
             st.warning("검색어를 입력하세요.")
         else:
             with st.spinner("검색 중..."):
-                r = query_pdf_knowledge(q.strip(), n_results=nres)
+                r = rag_search(q.strip(), nres, rag_mode)
             if not r:
                 st.info("관련 문서를 찾지 못했습니다.")
             else:
@@ -207,9 +318,9 @@ with tab_rag:
 with tab_port:
     st.subheader("내 포트폴리오 시세")
     tickers = [t.strip() for t in user_input.split(",") if t.strip()]
-    pagent = PortfolioAgent(tickers=tickers)
+    pagent = get_portfolio_agent(tuple(tickers))
     with st.spinner("시세 조회 중..."):
-        prices = pagent.get_prices()
+        prices = fetch_prices(tuple(tickers))
     if not prices:
         st.info("포트폴리오가 비어 있습니다.")
     else:
@@ -230,10 +341,9 @@ with tab_port:
         st.info("상단 '뉴스/분석' 탭에서 분석을 먼저 실행하면, 관련 종목 매칭을 보여줍니다.")
     else:
         linked_rows = []
-        for item in st.session_state.analyzed:
-            art = item["article"]
-            txt = (art["title"] + " " + art["summary"]).lower()
-            related = [t for t in tickers if t.lower() in txt]
+        linked = pagent.link_with_news([item["article"] for item in st.session_state.analyzed])
+        for item in linked:
+            art, related = item["article"], item["related"]
             linked_rows.append({
                 "제목": art["title"][:90] + ("…" if len(art["title"])>90 else ""),
                 "링크": art["link"],
@@ -248,11 +358,44 @@ with tab_status:
     st.subheader("상태/진단")
     # PDF DB 상태
     try:
-        cnt = collection.count()
+        cnt = get_rag_collection().count()
     except Exception:
         cnt = "N/A"
     st.write(f"PDF RAG chunks: **{cnt}**")
 
+    # 공용 임베딩 서버 (python -m agents.embed_server) — 없으면 앱 프로세스 안에서 모델 로드
+    # (새로 확인하지 않고 이 프로세스가 실제로 쓰고 있는 경로를 표시)
+    from agents.embed_server import EMBED_SERVER
+    from agents.pdf_rag import get_embedding_function
+    es = get_embedding_function().state()
+    if EMBED_SERVER == "0":
+        st.write("임베딩: **프로세스 안** (EMBED_SERVER=0)")
+    elif es["mode"] == "server":
+        st.write(f"임베딩: **공용 서버 사용 중** ({es['url']})")
+    elif es["mode"] == "local":
+        st.write(f"임베딩: **프로세스 안** (서버 {es['url']} 없음, {es['checked_at']}s 전 확인)")
+    else:
+        st.write("임베딩: **아직 사용 전** (첫 임베딩 때 서버 확인)")
+
+    # RAG 검색 캐시 (검색어 임베딩 LRU + 검색 결과, 컬렉션 버전이 바뀌면 결과 자동 무효화)
+    from agents.pdf_rag import query_cache_stats, clear_query_cache
+    qs = query_cache_stats()
+    st.write(f"RAG 검색 캐시 (컬렉션 버전 {qs['version']}): "
+             f"결과 hit **{qs['results']['hits']}** / miss **{qs['results']['misses']}** "
+             f"(적중률 {qs['results']['hit_rate']:.0%}, {qs['results']['entries']}/{qs['results']['maxsize']}건) · "
+             f"임베딩 hit **{qs['embeddings']['hits']}** / miss **{qs['embeddings']['misses']}** "
+             f"(적중률 {qs['embeddings']['hit_rate']:.0%}, {qs['embeddings']['entries']}/{qs['embeddings']['maxsize']}건)")
+    if st.button("RAG 검색 캐시 비우기"):
+        clear_query_cache()
+        rag_search.clear()
+        st.success("RAG 검색 캐시를 비웠습니다.")
+
+    # 기사 저장소 상태
+    try:
+        st.write("기사 저장소: **{articles}건** (분석 보관 {analyzed}건)".format(**get_article_store().stats()))
+    except Exception:
+        st.write("기사 저장소: **N/A**")
+
     # 환경 변수/모델
     from dotenv import load_dotenv
     load_dotenv()
@@ -261,6 +404,61 @@ with tab_status:
     st.write(f"OpenAI API Key 설정됨: **{'Yes' if api_key else 'No'}**")
     st.write(f"모델: **{model}**")
 
+    # LLM 응답 캐시 상태
+    from agents.llm_cache import get_llm_cache
+    llm_cache = get_llm_cache()
+    if llm_cache:
+        cs = llm_cache.stats()
+        st.write(f"LLM 캐시: hit **{cs['hits']}** / miss **{cs['misses']}** (적중률 {cs['hit_rate']:.0%}) · "
+                 f"{cs['entries']}건, {cs['bytes'] / 1024:.0f} KB")
+        if st.button("LLM 캐시 비우기"):
+            llm_cache.clear()
+            st.success("LLM 캐시를 비웠습니다.")
+    else:
+        st.write("LLM 캐시: **비활성화** (LLM_CACHE=0)")
+
+    # 시세 캐시 상태 (장중 짧은 TTL, 장 마감 후 다음 개장까지 재사용)
+    from agents.price_cache import get_price_cache
+    price_cache = get_price_cache()
+    ps = price_cache.stats()
+    st.write(f"시세 캐시: hit **{ps['hits']}** / miss **{ps['misses']}** (적중률 {ps['hit_rate']:.0%}) · "
+             f"이번 세션 hit {ps['session_hits']} / miss {ps['session_misses']} · {ps['entries']}종목")
+    if st.button("시세 캐시 비우기"):
+        price_cache.clear()
+        fetch_prices.clear()
+        st.success("시세 캐시를 비웠습니다.")
+
+    # 마지막 파이프라인 실행 트레이스 (out/*.trace.json)
+    from agents.metrics import latest_trace
+    trace = latest_trace()
+    if trace:
+        st.markdown(f"**마지막 실행** ({trace.get('started_at')}, {trace.get('mode', '')}) — 전체 {trace['wall_seconds']}s"
+                    + (f" · 임계 경로 {' → '.join(trace['critical_path'])} {trace['critical_path_seconds']}s"
+                       if trace.get("critical_path") else ""))
+        if trace.get("stages"):
+            st.dataframe([{"단계": n, "시작(s)": t["start"], "소요(s)": t["seconds"], "상태": t["status"]}
+                          for n, t in trace["stages"].items()], use_container_width=True)
+        st.dataframe([{"구간": n, "횟수": v["count"], "합계(s)": v["total"], "최대(s)": v["max"]}
+                      for n, v in trace["span_summary"].items()], use_container_width=True)
+        if trace.get("counters"):
+            st.write(" · ".join(f"{k} **{v}**" for k, v in sorted(trace["counters"].items())))
+    else:
+        st.write("마지막 실행 트레이스: **없음** (전체 파이프라인 실행 후 표시)")
+
+    # Streamlit 결과 캐시 (TTL 만료 전에 강제로 새로 받기)
+    st.markdown("**화면 캐시** "
+                f"(크롤링 {CRAWL_TTL}s · 시세 {PRICE_TTL}s · RAG 검색 {RAG_TTL}s)")
+    c1, c2, c3 = st.columns(3)
+    if c1.button("크롤링 결과 새로고침"):
+        crawl_news.clear()
+        st.success("다음 크롤링 때 피드를 다시 받습니다.")
+    if c2.button("시세 새로고침"):
+        fetch_prices.clear()
+        st.success("다음 조회 때 시세를 다시 계산합니다.")
+    if c3.button("RAG 검색 결과 비우기"):
+        rag_search.clear()
+        st.success("RAG 검색 캐시를 비웠습니다.")
+
     st.caption("※ 투자 자문 아님. 데이터는 야후 파이낸스 무료 소스(지연 가능). PDF는 로컬 VectorDB(Chroma)에 저장되어 RAG로 검색됩니다.")
 
 with tab_signal:
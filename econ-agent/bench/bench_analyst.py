@@ -0,0 +1,51 @@
+# bench/bench_analyst.py
+"""
+NewsAnalystAgent.analyze (순차) vs analyze_many (동시) — 가짜 OpenAI 서버 대상
+실행: python -m bench.bench_analyst --n 12 --latency 0.5 --fail-rate 0.1
+"""
+import os
+import time
+import argparse
+from bench.fake_openai import start_server
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=12)
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--fail-rate", type=float, default=0.1, help="429 응답 비율")
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    server, url = start_server(latency=args.latency, fail_rate=args.fail_rate)
+    # 에이전트 모듈은 import 시점에 클라이언트를 만들기 때문에 먼저 환경변수 설정
+    os.environ["OPENAI_BASE_URL"] = url
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ.setdefault("LLM_BACKOFF_BASE", "0.05")
+    os.environ["LLM_CACHE"] = "0"   # 순차/동시 비교가 캐시에 가려지지 않도록
+
+    import agents.news_analyst as na
+    na.query_pdf_knowledge_many = lambda qs, **k: [[] for _ in qs]   # LLM 경로만 측정 (RAG 제외)
+
+    articles = [{"title": f"기사 {i}", "summary": f"요약 {i}", "link": f"https://example.com/{i}",
+                 "published": "", "source": "bench"} for i in range(args.n)]
+    analyst = na.NewsAnalystAgent(max_workers=args.workers)
+
+    t0 = time.perf_counter()
+    serial = [analyst.analyze(a) for a in articles]
+    t_serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = analyst.analyze_many(articles)
+    t_many = time.perf_counter() - t0
+
+    failed = sum(1 for r in batched if not r.get("keywords"))
+    print(f"기사 {args.n}건 / 지연 {args.latency}s / 429 비율 {args.fail_rate}")
+    print(f"순차 analyze: {t_serial:.2f}s (실패 {sum(1 for r in serial if not r.get('keywords'))}건)")
+    print(f"analyze_many(workers={args.workers}): {t_many:.2f}s (실패 {failed}건)")
+    print(f"서버 통계: {server.stats}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# bench/bench_analyst_pack.py
+"""
+analyze_many: 기사별 요청 vs 묶음 요청(K건씩) — 가짜 OpenAI 서버 대상
+비교 항목: 전체 시간, 요청 수, 프롬프트/응답 토큰(서버 추정치), 폴백 수
+주의: 가짜 서버 지연은 요청당 고정이라 응답 길이에 따른 생성 시간 증가는 반영되지 않음
+실행: python -m bench.bench_analyst_pack --n 20 --k 1,5,10 --latency 0.5 --bad-rate 0.05
+"""
+import os
+import time
+import argparse
+from bench.fake_openai import start_server
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=20)
+    ap.add_argument("--k", default="1,5,10", help="쉼표 구분 묶음 크기 (1 = 기사별 요청)")
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--bad-rate", type=float, default=0.05, help="묶음 응답에서 깨진 원소 비율")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--pack-tokens", type=int, default=3000, help="묶음 요청 하나의 기사 입력 토큰 상한")
+    args = ap.parse_args()
+
+    server, url = start_server(latency=args.latency, bad_rate=args.bad_rate)
+    # 에이전트 모듈은 import 시점에 클라이언트를 만들기 때문에 먼저 환경변수 설정
+    os.environ["OPENAI_BASE_URL"] = url
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ.setdefault("LLM_BACKOFF_BASE", "0.05")
+    os.environ["LLM_CACHE"] = "0"   # 묶음 크기별 비교가 캐시에 가려지지 않도록
+
+    import agents.news_analyst as na
+    na.query_pdf_knowledge_many = lambda qs, **k: [[] for _ in qs]   # LLM 경로만 측정 (RAG 제외)
+
+    articles = [{"title": f"기사 {i} 금리 물가 환율 전망", "summary": f"요약 {i} " + "시장 지표 발표 " * 40,
+                 "link": f"https://example.com/{i}", "published": "", "source": "bench"} for i in range(args.n)]
+    analyst = na.NewsAnalystAgent(max_workers=args.workers, pack_tokens=args.pack_tokens)
+
+    print(f"기사 {args.n}건 / 지연 {args.latency}s / 깨진 원소 비율 {args.bad_rate} / workers {args.workers}")
+    print(f"{'K':>4} {'시간(s)':>8} {'요청':>5} {'프롬프트 토큰':>12} {'응답 토큰':>9} {'폴백':>5}")
+    base = None
+    for k in [int(x) for x in args.k.split(",") if x]:
+        before = dict(server.stats)
+        t0 = time.perf_counter()
+        results = analyst.analyze_many(articles, pack_size=k)
+        elapsed = time.perf_counter() - t0
+        d = {key: server.stats[key] - before[key] for key in ("requests", "prompt_tokens", "completion_tokens")}
+        fallbacks = sum(1 for r in results if not r.get("keywords"))
+        base = base or (elapsed, d["prompt_tokens"] + d["completion_tokens"])
+        tokens = d["prompt_tokens"] + d["completion_tokens"]
+        print(f"{k:>4} {elapsed:>8.2f} {d['requests']:>5} {d['prompt_tokens']:>12} {d['completion_tokens']:>9} "
+              f"{fallbacks:>5}   (시간 x{base[0] / elapsed:.2f}, 토큰 x{base[1] / tokens if tokens else 0:.2f})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench/bench_import.py
+"""
+콜드 스타트(import 시간) 벤치마크
+- 오케스트레이터 CLI: import agents.orchestrator
+- Streamlit 앱: app.py가 import하는 모듈 묶음 (streamlit 실행 없이)
+--ref로 다른 커밋과 비교 (git worktree로 임시 체크아웃)
+실행: python -m bench.bench_import --runs 3 --ref HEAD~1
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+TARGETS = {
+    "orchestrator": "import agents.orchestrator",
+    "app": ("import streamlit; import agents.news_crawler, agents.news_ranker, agents.news_analyst, "
+            "agents.pdf_rag, agents.portfolio_agent, agents.orchestrator, agents.econ_reporter"),
+}
+
+
+def time_import(code, cwd, runs):
+    """새 파이썬 프로세스에서 import에 걸린 시간(초) 중앙값"""
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], cwd=cwd,
+                              capture_output=True, text=True)
+        elapsed = time.perf_counter() - t0
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+        samples.append(elapsed)
+    return statistics.median(samples), None
+
+
+def bench_tree(cwd, runs):
+    out = {}
+    for name, code in TARGETS.items():
+        out[name] = time_import(code, cwd, runs)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--ref", help="비교할 git 커밋 (예: HEAD~1)")
+    args = ap.parse_args()
+
+    here = os.getcwd()
+    results = {"현재": bench_tree(here, args.runs)}
+
+    if args.ref:
+        root = subprocess.check_output(["git", "rev-parse", "--show-toplevel"], text=True).strip()
+        sub = os.path.relpath(here, root)
+        tmp = tempfile.mkdtemp(prefix="bench-import-")
+        try:
+            subprocess.run(["git", "worktree", "add", "--detach", tmp, args.ref],
+                           check=True, capture_output=True)
+            results[args.ref] = bench_tree(os.path.join(tmp, sub), args.runs)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", tmp], capture_output=True)
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    for label, res in results.items():
+        print(f"[{label}]")
+        for name, (sec, err) in res.items():
+            print(f"  {name:13s} " + (f"{sec:.2f}s" if sec is not None else f"실패: {err}"))
+
+
+if __name__ == "__main__":
+    main()
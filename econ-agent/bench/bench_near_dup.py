@@ -0,0 +1,114 @@
+# bench/bench_near_dup.py
+"""
+유사 중복 제거 벤치마크 (합성 기사 수천 건)
+실행: python -m bench.bench_near_dup --n 5000 --threshold 0.85
+"""
+import time
+import random
+import argparse
+from agents.near_dup import dedupe, simhash, item_text, BITS
+
+EN_WORDS = ("fed rate cut inflation market stocks bonds yields dollar oil china exports chip "
+            "earnings profit guidance tariff jobs payrolls growth recession bank credit tech ai "
+            "semiconductor demand supply shares investors rally slump record quarter outlook").split()
+KO_SYLLABLES = "금리물가환율실적수출반도체원유고용중국미국연준증시코스피외국인매수하락상승전망정책시장기업투자"
+
+
+def _vocab(rng, size=6000):
+    """실제 기사처럼 어휘가 넓도록 합성 단어 생성 (영문 + 한글 음절 조합)"""
+    words = list(EN_WORDS)
+    while len(words) < size:
+        if rng.random() < 0.6:
+            words.append("".join(rng.choice("abcdefghijklmnoprstuvwy") for _ in range(rng.randint(3, 9))))
+        else:
+            words.append("".join(rng.choice(KO_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return words
+
+
+def _story(rng, vocab):
+    # 자주 쓰는 단어가 더 많이 나오도록 앞쪽 어휘에 가중치
+    pick = lambda: vocab[min(int(rng.paretovariate(1.1)) - 1, len(vocab) - 1) if rng.random() < 0.4
+                         else rng.randrange(len(vocab))]
+    title = " ".join(pick() for _ in range(rng.randint(7, 12)))
+    summary = " ".join(pick() for _ in range(rng.randint(35, 60)))
+    return title, summary
+
+
+def _variant(rng, title, summary):
+    """재배포 기사 흉내: 접두어 추가, 단어 하나 교체/삭제, 요약 끝 일부 잘림"""
+    t = title.split()
+    op = rng.random()
+    if op < 0.3:
+        t.insert(0, rng.choice(["UPDATE 1-", "Exclusive:", "[속보]", "Analysis:"]))
+    elif op < 0.6 and len(t) > 4:
+        del t[rng.randrange(len(t))]
+    else:
+        t[rng.randrange(len(t))] = rng.choice(EN_WORDS)
+    s = summary.split()
+    s = s[:max(10, len(s) - rng.randint(0, 4))]
+    return " ".join(t), " ".join(s)
+
+
+def make_corpus(n, dup_ratio=0.3, seed=7):
+    """n건 생성, 약 dup_ratio 비율이 기존 기사의 변형. 정답 묶음 id 포함"""
+    rng = random.Random(seed)
+    vocab = _vocab(rng)
+    items, bases = [], []
+    for i in range(n):
+        if bases and rng.random() < dup_ratio:
+            cid, title, summary = rng.choice(bases)
+            title, summary = _variant(rng, title, summary)
+        else:
+            title, summary = _story(rng, vocab)
+            cid = len(bases)
+            bases.append((cid, title, summary))
+        items.append({"title": title, "summary": summary, "link": f"https://example.com/{i}",
+                      "source": f"feed{i % 7}", "cluster": cid})
+    return items
+
+
+def naive_pairs(items, threshold):
+    """비교용: 전체 쌍 해밍거리 비교 (O(n²))"""
+    sigs = [simhash(item_text(it)) for it in items]
+    max_d = int((1.0 - threshold) * BITS)
+    hits = 0
+    for i in range(len(sigs)):
+        for j in range(i):
+            if bin(sigs[i] ^ sigs[j]).count("1") <= max_d:
+                hits += 1
+                break
+    return hits
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--threshold", type=float, default=0.85)
+    ap.add_argument("--naive", action="store_true", help="O(n²) 전체 비교 시간도 측정")
+    args = ap.parse_args()
+
+    items = make_corpus(args.n)
+    true_dups = args.n - len({it["cluster"] for it in items})
+
+    t0 = time.perf_counter()
+    reps, dropped = dedupe(items, args.threshold)
+    elapsed = time.perf_counter() - t0
+
+    # 대표 기사와 다른 묶음이 합쳐졌는지 확인 (정밀도), 놓친 중복 (재현율)
+    by_link = {it["link"]: it["cluster"] for it in items}
+    wrong = sum(1 for r in reps for alt in r.get("alternates", []) if by_link[alt["link"]] != r["cluster"])
+    precision = (dropped - wrong) / dropped if dropped else 1.0
+    recall = (dropped - wrong) / true_dups if true_dups else 1.0
+
+    print(f"기사 {args.n}건 / 실제 중복 {true_dups}건 / threshold={args.threshold}")
+    print(f"SimHash+LSH: {elapsed:.2f}s ({args.n / elapsed:.0f} 건/s), 제거 {dropped}건")
+    print(f"정밀도 {precision:.3f} / 재현율 {recall:.3f}")
+
+    if args.naive:
+        t0 = time.perf_counter()
+        naive_pairs(items, args.threshold)
+        print(f"전체 쌍 비교: {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
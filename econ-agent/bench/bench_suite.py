@@ -0,0 +1,267 @@
+# bench/bench_suite.py
+"""
+오프라인 성능 벤치마크 모음 (네트워크/실제 API 없이 재현 가능)
+- RSS: bench.rss_server 픽스처 서버 (녹화본 또는 합성 피드)
+- LLM: bench.fake_openai 가짜 서버 (지연 조정)
+- 시세: bench/fixtures/prices_5d.csv 녹화 데이터 (PRICE_CSV)
+- PDF: bench.pdf_corpus 합성 코퍼스 (PyMuPDF/Chroma/sentence-transformers가 없으면 해당 항목 skip)
+측정: crawl / rank / analyze / ingest / query / orchestrator / orchestrator_stream × 규모(s, m, l)
+결과: bench/results/<커밋>.json (커밋 간 비교: --compare 이전결과.json)
+실행: python -m bench.bench_suite --scales s,m --repeat 3 --compare bench/results/abc1234.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+PRICE_FIXTURE = os.path.join(ROOT, "bench", "fixtures", "prices_5d.csv")
+TICKERS = ["AAPL", "TSLA", "MSFT", "NVDA", "005930.KS", "000660.KS"]
+
+# 규모별 파라미터
+SCALES = {
+    "s": {"feeds": 4, "items": 20, "topk": 6, "pdfs": 2, "pages": 5, "queries": 20},
+    "m": {"feeds": 8, "items": 50, "topk": 10, "pdfs": 5, "pages": 20, "queries": 50},
+    "l": {"feeds": 16, "items": 100, "topk": 15, "pdfs": 10, "pages": 50, "queries": 100},
+}
+BENCHES = ["crawl", "rank", "analyze", "ingest", "query", "orchestrator", "orchestrator_stream"]
+HORIZON_HOURS = 24 * 365 * 20   # 녹화 픽스처의 오래된 기사도 포함
+
+
+def git_rev():
+    try:
+        rev = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "."], cwd=ROOT).returncode != 0
+        return rev + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def summarize(samples):
+    return {"median": round(statistics.median(samples), 4), "min": round(min(samples), 4),
+            "max": round(max(samples), 4), "samples": [round(s, 4) for s in samples]}
+
+
+def timed(fn, repeat):
+    """fn()을 repeat번 실행 → (초 리스트, 마지막 반환값)"""
+    samples, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t0)
+    return samples, out
+
+
+class Suite:
+    def __init__(self, args):
+        self.args = args
+        self.rss = None
+        self._articles = {}
+
+    # --- 공용 준비 ---
+    def feeds_for(self, scale, p):
+        """규모별 RSS 픽스처 서버를 띄우고 크롤러 FEEDS를 로컬 URL로 교체"""
+        from bench.rss_server import start_rss_server, bench_feeds
+        import agents.news_crawler as nc
+
+        if self.rss is not None:
+            self.rss.shutdown()
+        self.rss, urls = start_rss_server(bench_feeds(p["feeds"], p["items"]), latency=self.args.feed_latency)
+        nc.FEEDS[:] = urls
+
+    def articles(self, scale):
+        if scale not in self._articles:
+            from agents.news_crawler import NewsCrawlerAgent
+            self._articles[scale] = NewsCrawlerAgent(HORIZON_HOURS, use_cache=False).collect_items()
+        return self._articles[scale]
+
+    # --- 개별 벤치 (출력: (초 리스트, 추가 정보)) ---
+    def bench_crawl(self, scale, p):
+        from agents.news_crawler import NewsCrawlerAgent
+        crawler = NewsCrawlerAgent(HORIZON_HOURS, use_cache=False)
+        samples, items = timed(crawler.collect_items, self.args.repeat)
+        self._articles[scale] = items
+        return samples, {"articles": len(items), "errors": len(crawler.errors)}
+
+    def bench_rank(self, scale, p):
+        from agents.news_ranker import NewsRankerAgent
+        items = self.articles(scale)
+        ranker = NewsRankerAgent(topk=p["topk"])
+        samples, _ = timed(lambda: ranker.rank_items(items), self.args.repeat)
+        return samples, {"articles": len(items), "dup_drops": ranker.dup_drops}
+
+    def bench_analyze(self, scale, p):
+        """analyze 기사 1건 호출 시간 분포 + analyze_many(topk) 전체 시간"""
+        from agents.news_analyst import NewsAnalystAgent
+        arts = self.articles(scale)[:p["topk"]]
+        analyst = NewsAnalystAgent()
+        samples = []
+        for a in arts:
+            t0 = time.perf_counter()
+            analyst.analyze(a)
+            samples.append(time.perf_counter() - t0)
+        many, _ = timed(lambda: analyst.analyze_many(arts), self.args.repeat)
+        return samples, {"articles": len(arts), "analyze_many_median": round(statistics.median(many), 4)}
+
+    def bench_ingest(self, scale, p):
+        from bench.pdf_corpus import make_corpus
+        from agents.pdf_rag import ingest_pdfs
+        pdf_dir = os.path.abspath(f"pdfs_{scale}")
+        make_corpus(pdf_dir, p["pdfs"], p["pages"])
+        samples, stats = timed(lambda: ingest_pdfs(pdf_dir, force=True), self.args.repeat)
+        return samples, {k: stats[k] for k in ("files", "pages", "chunks", "pages_per_s", "chunks_per_s")}
+
+    def bench_query(self, scale, p):
+        from bench.pdf_corpus import queries
+        from agents.pdf_rag import query_pdf_knowledge, get_collection, clear_query_cache
+        get_collection().count()   # 모델/DB 로드는 측정에서 제외
+        qs = queries(p["queries"])
+        by_mode = {}
+        for mode in ("auto", "vector", "hybrid"):
+            clear_query_cache()   # 방식별 비교가 결과 캐시에 가려지지 않도록
+            by_mode[mode] = []
+            for q in qs:
+                t0 = time.perf_counter()
+                query_pdf_knowledge(q, n_results=3, mode=mode)
+                by_mode[mode].append(time.perf_counter() - t0)
+        return by_mode["auto"], {"queries": len(qs),
+                                 **{f"{m}_median": round(statistics.median(v), 4) for m, v in by_mode.items()}}
+
+    def bench_orchestrator(self, scale, p):
+        from agents.orchestrator import OrchestratorAgent
+        orch = OrchestratorAgent(tickers=TICKERS, topk=p["topk"], horizon_hours=HORIZON_HOURS, use_store=False)
+        samples, res = timed(lambda: orch.run(source="news"), self.args.repeat)
+        return samples, {"articles": len(res["articles"]), "analyzed": len(res["analyzed"]),
+                         "critical_path_seconds": res["critical_path_seconds"],
+                         "stages": {n: t["seconds"] for n, t in res["timings"].items()}}
+
+    def bench_orchestrator_stream(self, scale, p):
+        """스트리밍 모드: 전체 시간 + 첫 분석 결과까지의 시간"""
+        from agents.orchestrator import OrchestratorAgent
+        orch = OrchestratorAgent(tickers=TICKERS, topk=p["topk"], horizon_hours=HORIZON_HOURS, use_store=False)
+        samples, firsts = [], []
+        for _ in range(self.args.repeat):
+            t0, first = time.perf_counter(), None
+            for ev in orch.run_stream(source="news"):
+                if ev["stage"] == "analyze" and first is None:
+                    first = ev["elapsed"]
+            samples.append(time.perf_counter() - t0)
+            if first is not None:
+                firsts.append(first)
+        return samples, {"first_analysis_median": round(statistics.median(firsts), 4) if firsts else None}
+
+    def run(self):
+        results = []
+        for scale in self.args.scales:
+            p = SCALES[scale]
+            self.feeds_for(scale, p)
+            for name in self.args.only:
+                entry = {"bench": name, "scale": scale, "params": p}
+                try:
+                    samples, extra = getattr(self, f"bench_{name}")(scale, p)
+                    entry.update(seconds=summarize(samples), extra=extra)
+                    print(f"[{scale}] {name:20s} median {entry['seconds']['median']:.4f}s  {extra}")
+                except ImportError as e:
+                    entry["skipped"] = f"{type(e).__name__}: {e}"
+                    print(f"[{scale}] {name:20s} skip ({entry['skipped']})")
+                except Exception as e:
+                    entry["error"] = f"{type(e).__name__}: {e}"
+                    print(f"[{scale}] {name:20s} error ({entry['error']})")
+                results.append(entry)
+        if self.rss is not None:
+            self.rss.shutdown()
+        return results
+
+
+def compare(base, current):
+    """이전 결과 대비 중앙값 비교표 출력"""
+    old = {(r["bench"], r["scale"]): r for r in base["results"] if "seconds" in r}
+    print(f"\n비교: {base['meta']['commit']} → {current['meta']['commit']}")
+    for r in current["results"]:
+        o = old.get((r["bench"], r["scale"]))
+        if "seconds" not in r or o is None:
+            continue
+        a, b = o["seconds"]["median"], r["seconds"]["median"]
+        print(f"  [{r['scale']}] {r['bench']:20s} {a:9.4f}s → {b:9.4f}s  (x{(a / b) if b else float('inf'):.2f})")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="s,m", help="쉼표 구분: " + ",".join(SCALES))
+    ap.add_argument("--only", default=",".join(BENCHES), help="쉼표 구분: " + ",".join(BENCHES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="가짜 OpenAI 응답 지연(초)")
+    ap.add_argument("--feed-latency", type=float, default=0.05, help="RSS 픽스처 응답 지연(초)")
+    ap.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/<커밋>.json)")
+    ap.add_argument("--compare", help="비교할 이전 결과 JSON")
+    ap.add_argument("--keep", action="store_true", help="임시 작업 폴더 유지")
+    args = ap.parse_args()
+    args.scales = [s for s in args.scales.split(",") if s]
+    args.only = [b for b in args.only.split(",") if b]
+    unknown = [s for s in args.scales if s not in SCALES] + [b for b in args.only if b not in BENCHES]
+    if unknown:
+        ap.error(f"알 수 없는 항목: {', '.join(unknown)}")
+
+    commit = git_rev()
+    out_path = os.path.abspath(args.out or os.path.join(RESULTS_DIR, f"{commit}.json"))
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    # 에이전트 모듈은 import 시점에 환경변수/상대경로(data/, out/)를 읽으므로 먼저 격리 환경 구성
+    from bench.fake_openai import start_server
+    llm, llm_url = start_server(latency=args.llm_latency)
+    work = tempfile.mkdtemp(prefix="econ-bench-")
+    os.environ.update({
+        "OPENAI_BASE_URL": llm_url,
+        "OPENAI_API_KEY": "fake",
+        "LLM_CACHE": "0",
+        "LLM_BACKOFF_BASE": "0.05",
+        "PRICE_CSV": PRICE_FIXTURE,
+        "PRICE_CACHE_PATH": os.path.join(work, "price_cache.json"),
+        "METRICS_PROM": "0",
+    })
+    sys.path.insert(0, ROOT)
+    os.chdir(work)
+
+    started = time.perf_counter()
+    try:
+        results = Suite(args).run()
+    finally:
+        llm.shutdown()
+        os.chdir(ROOT)
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+    data = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "llm_latency": args.llm_latency,
+            "feed_latency": args.feed_latency,
+            "seconds": round(time.perf_counter() - started, 2),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {out_path}")
+
+    if compare_path:
+        with open(compare_path, "r", encoding="utf-8") as f:
+            compare(json.load(f), data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# bench/fake_openai.py
+"""
+로컬 가짜 OpenAI 호환 서버 (/v1/chat/completions)
+- 지연(latency), 429/5xx 실패 비율을 조정해 동시성/백오프 동작을 재현
+- stream=True 요청은 SSE 조각으로 응답 (latency = 첫 토큰까지, token_delay = 조각 간격)
+- 묶음 분석 요청([기사 id] 블록)은 id별 JSON 배열로 응답 (bad_rate = 깨진 원소 비율)
+실행: python -m bench.fake_openai --port 8901 --latency 0.5 --fail-rate 0.1
+사용: OPENAI_BASE_URL=http://127.0.0.1:8901/v1 OPENAI_API_KEY=fake python -m agents.orchestrator
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ANALYSIS = {
+    "headline": "가짜 분석 요약",
+    "summary": "로컬 가짜 서버가 만든 요약입니다.",
+    "impact": "금리·환율 경로를 통해 증시에 영향을 줄 수 있음.",
+    "keywords": ["FOMC", "CPI", "금리"],
+}
+REPORT = "# 📊 일일 경제 리포트 (fake)\n\n## 주요 이슈\n- 가짜 서버 응답\n\n## 오늘의 한 줄 결론\n- 테스트용"
+
+
+def _approx_tokens(text):
+    return max(1, len(text) // 3)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/0.1"
+
+    def log_message(self, *args):   # 조용히
+        pass
+
+    def _send(self, code, body, headers=None):
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        cfg = self.server.cfg
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": "not found"}})
+
+        r = random.random()
+        if r < cfg["fail_rate"]:
+            with self.server.lock:
+                self.server.stats["429"] += 1
+            return self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                              {"retry-after": "0"})
+        if r < cfg["fail_rate"] + cfg["error_rate"]:
+            with self.server.lock:
+                self.server.stats["5xx"] += 1
+            return self._send(503, {"error": {"message": "overloaded"}})
+
+        time.sleep(cfg["latency"])
+        messages = req.get("messages", [])
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        content = self.server.respond(messages, cfg)
+        with self.server.lock:
+            self.server.stats["prompt_tokens"] += _approx_tokens(prompt)
+            self.server.stats["completion_tokens"] += _approx_tokens(content)
+        if req.get("stream"):
+            return self._stream(req, content)
+        self._send(200, {
+            "id": f"chatcmpl-fake-{self.server.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": req.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": _approx_tokens(prompt),
+                      "completion_tokens": _approx_tokens(content),
+                      "total_tokens": _approx_tokens(prompt) + _approx_tokens(content)},
+        })
+
+
+    def _stream(self, req, content, piece=8):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        base = {"id": f"chatcmpl-fake-{self.server.stats['requests']}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": req.get("model", "fake")}
+        try:
+            for i in range(0, len(content), piece):
+                chunk = dict(base, choices=[{"index": 0, "finish_reason": None,
+                                             "delta": {"content": content[i:i + piece]}}])
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.server.cfg["token_delay"])
+            done = dict(base, choices=[{"index": 0, "finish_reason": "stop", "delta": {}}])
+            self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # 클라이언트가 타임아웃 등으로 먼저 끊음
+
+
+def default_respond(messages, cfg=None):
+    """
+    시스템 프롬프트가 JSON을 요구하면 분석 JSON, 아니면 Markdown 리포트
+    - 사용자 프롬프트에 [기사 id] 블록이 있으면 id별 분석 JSON 배열 (bad_rate 비율만큼 원소를 깨뜨림)
+    """
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    if "JSON" not in system:
+        return REPORT
+    user = " ".join(m.get("content", "") for m in messages if m.get("role") == "user")
+    ids = re.findall(r"\[기사 (\w+)\]", user)
+    if not ids:
+        return json.dumps(ANALYSIS, ensure_ascii=False)
+    bad_rate = (cfg or {}).get("bad_rate", 0.0)
+    parts = []
+    for aid in ids:
+        if random.random() < bad_rate:
+            parts.append('{"id": "%s", "headline": "잘린 응답' % aid)
+        else:
+            parts.append(json.dumps(dict(ANALYSIS, id=aid), ensure_ascii=False))
+    return "[" + ",\n".join(parts) + "]"
+
+
+def start_server(port=0, latency=0.3, fail_rate=0.0, error_rate=0.0, token_delay=0.01, bad_rate=0.0):
+    """백그라운드 스레드로 서버 시작 → (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.cfg = {"latency": latency, "fail_rate": fail_rate, "error_rate": error_rate,
+                  "token_delay": token_delay, "bad_rate": bad_rate}
+    server.stats = {"requests": 0, "429": 0, "5xx": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    server.lock = threading.Lock()
+    server.respond = default_respond
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8901)
+    ap.add_argument("--latency", type=float, default=0.3)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="429 응답 비율")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율")
+    ap.add_argument("--token-delay", type=float, default=0.01, help="스트리밍 조각 간격(초)")
+    ap.add_argument("--bad-rate", type=float, default=0.0, help="묶음 분석 응답에서 깨진 원소 비율")
+    args = ap.parse_args()
+    server, url = start_server(args.port, args.latency, args.fail_rate, args.error_rate, args.token_delay,
+                               args.bad_rate)
+    print(f"가짜 OpenAI 서버: {url} (Ctrl+C 종료)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
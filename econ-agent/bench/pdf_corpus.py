@@ -0,0 +1,64 @@
+# bench/pdf_corpus.py
+"""
+합성 PDF 코퍼스 생성 (ingest_pdfs / query_pdf_knowledge 벤치마크용, PyMuPDF 필요)
+실행: python -m bench.pdf_corpus --dir /tmp/bench_pdfs --files 5 --pages 20
+"""
+import os
+import random
+import argparse
+
+TERMS = ["인플레이션", "기준금리", "환율", "경상수지", "국내총생산", "실업률", "통화정책", "재정정책",
+         "국채금리", "소비자물가", "수출", "반도체", "유가", "연준", "경기침체", "유동성"]
+WORDS = ("경제 성장 둔화 회복 압력 상승 하락 전망 정책 효과 분석 지표 변화 시장 기대 위험 "
+         "가계 기업 정부 투자 소비 생산 고용 임금 가격 수요 공급 금융 자산 부채").split()
+LINES_PER_PAGE = 40
+
+
+def _sentence(rng):
+    term = rng.choice(TERMS)
+    return f"{term} " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))) + "."
+
+
+def make_corpus(out_dir, n_files=5, pages=20, seed=0):
+    """
+    out_dir에 합성 PDF n_files개 생성 (파일당 pages쪽, 쪽당 LINES_PER_PAGE줄)
+    출력: 생성한 파일 경로 리스트
+    """
+    import fitz  # PyMuPDF
+
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for f in range(n_files):
+        doc = fitz.open()
+        for _ in range(pages):
+            page = doc.new_page()
+            text = "\n".join(_sentence(rng) for _ in range(LINES_PER_PAGE))
+            # 한글 출력을 위해 내장 CJK 폰트 사용
+            page.insert_textbox(fitz.Rect(36, 36, page.rect.width - 36, page.rect.height - 36),
+                                text, fontsize=8, fontname="korea")
+        path = os.path.join(out_dir, f"bench_{f:03d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def queries(n, seed=0):
+    """검색어 n개 (코퍼스 용어 + 일반 단어 조합)"""
+    rng = random.Random(seed)
+    return [f"{rng.choice(TERMS)} {rng.choice(WORDS)}" for _ in range(n)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default="data/bench_pdfs")
+    ap.add_argument("--files", type=int, default=5)
+    ap.add_argument("--pages", type=int, default=20)
+    args = ap.parse_args()
+    for p in make_corpus(args.dir, args.files, args.pages):
+        print(f"- {p}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# bench/rss_server.py
+"""
+로컬 RSS 픽스처 서버 (실제 피드 대신 벤치마크/오프라인 테스트용)
+- bench/fixtures/rss/*.xml 녹화본이 있으면 그대로 제공, 없으면 합성 피드 생성
+- 요청마다 lastBuildDate를 바꿔서 피드 캐시(본문 해시)가 매번 새로 파싱하도록 함
+녹화: python -m bench.rss_server --record   (agents.news_crawler.FEEDS 를 내려받아 저장)
+실행: python -m bench.rss_server --port 8902 --feeds 4 --items 30 --latency 0.2
+"""
+import os
+import re
+import glob
+import time
+import random
+import argparse
+import threading
+import urllib.request
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from xml.sax.saxutils import escape
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "rss")
+
+TOPICS = ["금리", "물가", "환율", "실적", "수출", "반도체", "원유", "AI", "고용", "중국",
+          "미국", "ECB", "FOMC", "CPI", "PPI", "GDP", "연준", "코스피", "나스닥", "채권"]
+FILLER = ("시장 투자자 전망 발표 기업 정책 상승 하락 우려 기대 분기 발표 지표 발언 "
+          "market investors outlook shares yields growth demand supply quarter guidance").split()
+
+
+def synthetic_feed(tag, n_items, seed=0, now=None):
+    """
+    합성 RSS 2.0 피드 (기사마다 주제 키워드 1~3개, 발행 시각은 최근 24시간 안)
+    실제 피드에서 흔한 모양도 섞음: HTML 요약(링크/엔티티), 발행 시각 누락, ISO 8601 발행 시각,
+    제목의 HTML 엔티티, 추적 파라미터가 붙은 링크
+    """
+    rng = random.Random(f"{tag}-{seed}")
+    now = now or datetime.now(timezone.utc)
+    items = []
+    for i in range(n_items):
+        topics = rng.sample(TOPICS, rng.randint(1, 3))
+        title = f"[{tag}] {' '.join(topics)} {' '.join(rng.choice(FILLER) for _ in range(6))} #{i}"
+        if i % 4 == 0:
+            title = title.replace(" ", " & ", 1)
+        summary = " ".join(rng.choice(FILLER + topics) for _ in range(rng.randint(30, 60)))
+        if i % 5 == 1:
+            summary = (f'<p><b>{topics[0]}</b> {summary}&nbsp;&hellip;</p>'
+                       f'<a href="https://bench.local/{tag}/{i}?utm_source=rss">원문 보기</a>')
+        link = f"https://bench.local/{tag}/{i}" + ("?utm_source=rss&amp;utm_medium=feed" if i % 3 == 2 else "")
+        pub = now - timedelta(minutes=rng.randint(0, 24 * 60))
+        if i % 7 == 3:
+            date = ""
+        elif i % 6 == 2:
+            date = f"<pubDate>{pub.isoformat(timespec='seconds')}</pubDate>"
+        else:
+            date = f"<pubDate>{format_datetime(pub)}</pubDate>"
+        items.append(
+            f"<item><title>{escape(title)}</title><link>{link}</link>"
+            f"<description>{escape(summary)}</description>{date}</item>")
+    return ("<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel>"
+            f"<title>bench {tag}</title><link>https://bench.local/{tag}</link>"
+            f"<lastBuildDate>{format_datetime(now)}</lastBuildDate>{''.join(items)}</channel></rss>")
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    """녹화된 피드 {이름: xml 문자열}"""
+    out = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.xml"))):
+        with open(path, "r", encoding="utf-8") as f:
+            out[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return out
+
+
+def record_feeds(urls, fixture_dir=FIXTURE_DIR, timeout=10):
+    """실제 피드를 내려받아 픽스처로 저장 → 저장한 파일 경로 리스트"""
+    os.makedirs(fixture_dir, exist_ok=True)
+    saved = []
+    for i, url in enumerate(urls):
+        try:
+            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (econ-agent bench)"})
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                raw = resp.read().decode("utf-8", errors="replace")
+        except Exception as e:
+            print(f"[!] 녹화 실패: {url} ({type(e).__name__}: {e})")
+            continue
+        name = f"{i:02d}_" + re.sub(r"[^a-zA-Z0-9]+", "_", url.split("//", 1)[-1])[:60]
+        path = os.path.join(fixture_dir, f"{name}.xml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(raw)
+        saved.append(path)
+    return saved
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        name = self.path.strip("/").split("?")[0]
+        if name not in srv.feeds:
+            self.send_error(404)
+            return
+        time.sleep(srv.latency.get(name, srv.default_latency))
+        body = srv.feeds[name]
+        # 요청마다 빌드 시각을 바꿔 본문 해시가 달라지도록 (캐시 재사용 없이 매번 파싱)
+        body = re.sub(r"<lastBuildDate>.*?</lastBuildDate>",
+                      f"<lastBuildDate>{format_datetime(datetime.now(timezone.utc))}</lastBuildDate>",
+                      body, count=1)
+        raw = body.encode("utf-8")
+        with srv.lock:
+            srv.stats["requests"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+def start_rss_server(feeds, port=0, latency=0.0):
+    """
+    feeds: {이름: xml 문자열} → http://127.0.0.1:<port>/<이름> 으로 제공
+    latency: 모든 피드 공통 지연(초) 또는 {이름: 지연}
+    출력: (server, [피드 URL, ...])
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.feeds = dict(feeds)
+    server.latency = latency if isinstance(latency, dict) else {}
+    server.default_latency = 0.0 if isinstance(latency, dict) else latency
+    server.stats = {"requests": 0}
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, [f"{base}/{name}" for name in server.feeds]
+
+
+def bench_feeds(n_feeds, n_items, seed=0):
+    """
+    녹화 픽스처 우선, 모자라면 합성 피드로 채움
+    (bench/fixtures/rss 는 --record 로 직접 만들어야 함 — 저장소에는 녹화본이 없음)
+    """
+    feeds = dict(list(load_fixtures().items())[:n_feeds])
+    for i in range(len(feeds), n_feeds):
+        feeds[f"synthetic_{i:02d}"] = synthetic_feed(f"f{i}", n_items, seed)
+    return feeds
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--record", action="store_true", help="실제 피드를 bench/fixtures/rss 에 녹화")
+    ap.add_argument("--port", type=int, default=8902)
+    ap.add_argument("--feeds", type=int, default=4)
+    ap.add_argument("--items", type=int, default=30)
+    ap.add_argument("--latency", type=float, default=0.0)
+    args = ap.parse_args()
+
+    if args.record:
+        from agents.news_crawler import FEEDS
+        from agents.blog_crawler import BlogCrawlerAgent
+        for path in record_feeds(FEEDS + BlogCrawlerAgent().sources):
+            print(f"- {path}")
+        return
+
+    server, urls = start_rss_server(bench_feeds(args.feeds, args.items), args.port, args.latency)
+    print("RSS 픽스처 서버 (Ctrl+C 종료)")
+    for u in urls:
+        print(f"- {u}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
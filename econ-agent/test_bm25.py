@@ -0,0 +1,102 @@
+import os
+import tempfile
+import agents.pdf_rag as pdf_rag
+from agents.bm25_index import BM25Index, tokenize, rrf
+
+
+def _index(path=None):
+    index = BM25Index(path)
+    index.add(["a-0", "a-1"], ["기준금리 인상 전망", "FOMC 회의 결과 발표"], "a.pdf")
+    index.add(["b-0"], ["반도체 수출 증가와 금리 동결"], "b.pdf")
+    return index
+
+
+def test_tokenize():
+    """영문/숫자는 소문자 단어, 한글은 어절별 2-gram (한 글자 어절은 그대로)"""
+    assert tokenize("FOMC, CPI 2024!") == ["fomc", "cpi", "2024"]
+    assert tokenize("기준금리 인상") == ["기준", "준금", "금리", "인상"]
+    assert tokenize("금 값") == ["금", "값"]
+    assert tokenize("") == []
+
+
+def test_add_remove_search():
+    index = _index()
+    # 짧은 문서(a-0)가 길이 정규화로 먼저
+    assert [doc_id for doc_id, _ in index.search("금리", 3)] == ["a-0", "b-0"]
+    assert index.search("fomc")[0][0] == "a-1"
+    assert index.search("환율") == []
+    assert index.sources() == {"a.pdf", "b.pdf"}
+
+    # 같은 id로 다시 넣으면 교체 (예전 본문 토큰은 빠짐)
+    index.add(["a-1"], ["환율 급등"], "a.pdf")
+    assert index.search("fomc") == []
+    assert index.search("환율")[0][0] == "a-1"
+
+    index.remove(["a-0"])
+    assert [doc_id for doc_id, _ in index.search("금리")] == ["b-0"]
+    index.remove_source("b.pdf")
+    assert index.search("금리") == []
+    assert index.sources() == {"a.pdf"} and len(index) == 1
+
+
+def test_save_load():
+    path = os.path.join(tempfile.mkdtemp(), "bm25_index.json")
+    index = _index(path)
+    index.save()
+    loaded = BM25Index.load(path)
+    assert loaded.sources() == index.sources() and len(loaded) == len(index)
+    assert loaded.search("금리 동결") == index.search("금리 동결")
+    assert loaded.text("a-1") == "FOMC 회의 결과 발표"
+
+    # 깨진 파일 / 없는 파일 → 빈 색인
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    assert len(BM25Index.load(path)) == 0
+    assert len(BM25Index.load(path + ".missing")) == 0
+
+
+def test_rrf():
+    # b: 1/62 + 1/61 > a: 1/61 + 1/63 > c: 1/63 + 1/62 > d (한쪽 순위에만 있음)
+    assert rrf([["a", "b", "c"], ["b", "c", "a", "d"]]) == ["b", "a", "c", "d"]
+    assert rrf([]) == []
+
+
+class _StubCollection:
+    """Chroma 컬렉션 대신: query 호출 수만 세고 고정 결과 반환"""
+    def __init__(self):
+        self.calls = 0
+
+    def query(self, query_embeddings, n_results):
+        self.calls += 1
+        return {"ids": [["v-0"] for _ in query_embeddings],
+                "documents": [["벡터 검색 결과"] for _ in query_embeddings]}
+
+
+def test_auto_falls_back_to_vector():
+    """auto: 짧은 키워드는 BM25만, 겹치는 토큰이 없으면 벡터 검색으로 (lexical 모드는 그대로 빈 결과)"""
+    stub = _StubCollection()
+    saved = pdf_rag._collection, pdf_rag._embedding_func, pdf_rag.get_bm25_index
+    pdf_rag._collection = stub
+    pdf_rag._embedding_func = lambda texts: [[0.0, 0.0, 0.0] for _ in texts]
+    index = _index()
+    pdf_rag.get_bm25_index = lambda: index
+    pdf_rag.clear_query_cache()
+    try:
+        assert pdf_rag.query_pdf_knowledge("FOMC", n_results=1, mode="auto") == ["FOMC 회의 결과 발표"]
+        assert stub.calls == 0
+        assert pdf_rag.query_pdf_knowledge("환율", n_results=1, mode="auto") == ["벡터 검색 결과"]
+        assert stub.calls == 1
+        assert pdf_rag.query_pdf_knowledge("원자재", n_results=1, mode="lexical") == []
+        assert stub.calls == 1
+    finally:
+        pdf_rag._collection, pdf_rag._embedding_func, pdf_rag.get_bm25_index = saved
+        pdf_rag.clear_query_cache()
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_add_remove_search()
+    test_save_load()
+    test_rrf()
+    test_auto_falls_back_to_vector()
+    print("✅ BM25 색인 / 검색 방식 선택 확인 완료")
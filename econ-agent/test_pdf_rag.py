@@ -1,7 +1,7 @@
-from agents.pdf_rag import query_pdf_knowledge, collection
+from agents.pdf_rag import query_pdf_knowledge, get_collection
 
 def main():
-    print(f"📚 현재 저장된 chunk 수: {collection.count()}")
+    print(f"📚 현재 저장된 chunk 수: {get_collection().count()}")
 
     while True:
         query = input("\n🔎 검색할 키워드 입력 (종료하려면 'exit'): ").strip()
@@ -0,0 +1,26 @@
+import os
+from agents.portfolio_agent import csv_price_source, compute_changes
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench", "fixtures", "prices_5d.csv")
+
+
+def test_fixture_changes():
+    """녹화 종가(bench/fixtures/prices_5d.csv)로 계산한 값이 손으로 계산한 값과 같은지 확인"""
+    tickers = ["AAPL", "005930.KS", "NEWLIST", "ZZZZ"]
+    close, errors = csv_price_source(FIXTURE)(tickers)
+    data = compute_changes(close, tickers)
+    assert errors == {}
+
+    # AAPL: 254.43 (09-29) → 254.63 (09-30) = +0.0786%
+    assert data["AAPL"] == {"price": 254.63, "change": 0.08}
+    # 005930.KS: 84700 → 83900 = -0.9445%
+    assert data["005930.KS"] == {"price": 83900.0, "change": -0.94}
+    # NEWLIST: 마지막 날 하루만 값이 있음
+    assert data["NEWLIST"] == {"price": 12.5, "change": None, "note": "only 1 day available"}
+    # CSV에 없는 티커
+    assert data["ZZZZ"] == {"price": None, "change": None, "error": "no data"}
+
+
+if __name__ == "__main__":
+    test_fixture_changes()
+    print("✅ 녹화 종가 변화율 계산 확인 완료")
@@ -0,0 +1,45 @@
+import os
+import json
+import tempfile
+from bench.rss_server import start_rss_server, synthetic_feed
+import agents.news_crawler as news_crawler
+import agents.blog_crawler as blog_crawler
+import agents.news_analyst as news_analyst
+from agents.scheduler import Scheduler
+
+
+def test_once_both():
+    """
+    스케줄러 --once-report 스모크 체크 (source="both")
+    로컬 합성 RSS 서버 + LLM 끔 → 뉴스/블로그가 섞여도 크롤링/리포트 주기가 오류 없이 끝나는지 확인
+    """
+    server, urls = start_rss_server({f"{kind}{i}": synthetic_feed(f"{kind}{i}", 10)
+                                     for kind in ("news", "blog") for i in range(2)})
+    cwd = os.getcwd()
+    feeds, sources, use_llm = list(news_crawler.FEEDS), list(blog_crawler.SOURCES), news_analyst.use_llm
+    news_crawler.FEEDS[:] = [u for u in urls if "/news" in u]
+    blog_crawler.SOURCES[:] = [u for u in urls if "/blog" in u]
+    news_analyst.use_llm = False
+    os.chdir(tempfile.mkdtemp())   # 저장소/캐시/리포트는 임시 폴더에
+    try:
+        sched = Scheduler(tickers=[], source="both", log_path="scheduler.jsonl")
+        sched.run_once(report=True)
+        with open("scheduler.jsonl", "r", encoding="utf-8") as f:
+            crawl, report = [json.loads(line) for line in f]
+    finally:
+        os.chdir(cwd)
+        news_crawler.FEEDS[:] = feeds
+        blog_crawler.SOURCES[:] = sources
+        news_analyst.use_llm = use_llm
+        server.shutdown()
+
+    assert "error" not in crawl, crawl.get("error")
+    assert "error" not in report, report.get("error")
+    assert crawl["new_articles"] > 0 and crawl["feed_errors"] == 0
+    assert crawl["analyzed"] > 0
+    assert report["report_path"].endswith(".md")
+
+
+if __name__ == "__main__":
+    test_once_both()
+    print("✅ 스케줄러 1회 실행(뉴스+블로그) 확인 완료")